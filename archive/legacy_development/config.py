@@ -10,6 +10,9 @@ class Config:
     # Target reading level (Flesch-Kincaid grade level)
     TARGET_READING_LEVEL = 3.0  # Appropriate for ages 6-10
     
+    # Persistent cache of simplified articles (re-runs only simplify new articles)
+    SIMPLIFICATION_CACHE_PATH = os.getenv('SIMPLIFICATION_CACHE_PATH', 'simplification_cache.db')
+    
     # Kid-friendly news sources
     NEWS_SOURCES = [
         'https://www.newsround.co.uk/news',  # BBC Newsround (already kid-focused)
@@ -4,25 +4,133 @@ import re
 from typing import List, Dict
 from .config import Config
 from .news_scraper import NewsArticle
+from .simplification_cache import SimplificationCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Common complex words and their simple replacements, applied in a single regex pass
+COMPLEX_WORD_REPLACEMENTS = {
+    'approximately': 'about',
+    'significant': 'big',
+    'magnificent': 'amazing',
+    'tremendous': 'huge',
+    'extraordinary': 'amazing',
+    'investigate': 'look into',
+    'demonstrate': 'show',
+    'participate': 'take part',
+    'communicate': 'talk',
+    'construct': 'build',
+    'discover': 'find',
+    'examine': 'look at',
+    'observe': 'watch',
+    'recognize': 'know',
+    'understand': 'know',
+    'receive': 'get',
+    'require': 'need',
+    'attempt': 'try',
+    'achieve': 'do',
+    'provide': 'give',
+    'consider': 'think about',
+    'determine': 'find out',
+    'indicate': 'show',
+    'suggest': 'say',
+    'reveal': 'show',
+    'establish': 'make',
+    'maintain': 'keep',
+    'obtain': 'get',
+    'purchase': 'buy',
+    'utilize': 'use',
+    'assistance': 'help',
+    'opportunity': 'chance',
+    'environment': 'place',
+    'individual': 'person',
+    'location': 'place',
+    'temperature': 'how hot or cold',
+    'transportation': 'ways to travel',
+    'information': 'facts',
+    'organization': 'group',
+    'community': 'neighborhood',
+    'government': 'people who run the country',
+    'definitely': 'for sure',
+    'obviously': 'clearly',
+    'particularly': 'especially',
+    'generally': 'usually',
+    'specifically': 'exactly',
+    'essentially': 'basically',
+    'immediately': 'right away',
+    'eventually': 'later',
+    'frequently': 'often',
+    'occasionally': 'sometimes',
+    'numerous': 'many',
+    'various': 'different',
+    'several': 'some',
+    'multiple': 'many',
+    'additional': 'more',
+    'enormous': 'huge',
+    'tiny': 'very small',
+    'gigantic': 'huge',
+    'microscopic': 'very tiny'
+}
+
+TITLE_WORD_REPLACEMENTS = {
+    'scientists': 'smart people',
+    'researchers': 'smart people',
+    'investigation': 'looking into',
+    'authorities': 'people in charge',
+    'approximately': 'about',
+    'significant': 'big',
+    'additional': 'more',
+    'numerous': 'many',
+    'extensive': 'big',
+    'demonstrate': 'show',
+    'utilize': 'use',
+    'purchase': 'buy',
+    'assistance': 'help'
+}
+
+def _compile_word_pattern(words) -> re.Pattern:
+    """Compile one word-bounded alternation, longest words first"""
+    alternation = '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+
+COMPLEX_WORD_PATTERN = _compile_word_pattern(COMPLEX_WORD_REPLACEMENTS)
+TITLE_WORD_PATTERN = _compile_word_pattern(TITLE_WORD_REPLACEMENTS)
+
+def _simple_word(match: re.Match) -> str:
+    return COMPLEX_WORD_REPLACEMENTS[match.group(0).lower()]
+
+def _simple_title_word(match: re.Match) -> str:
+    return TITLE_WORD_REPLACEMENTS[match.group(0).lower()]
+
 class ContentProcessor:
     def __init__(self):
         self.config = Config()
         if self.config.OPENAI_API_KEY:
             openai.api_key = self.config.OPENAI_API_KEY
+        self.cache = SimplificationCache(self.config.SIMPLIFICATION_CACHE_PATH)
 
     def simplify_for_kids(self, article: NewsArticle) -> NewsArticle:
         """Simplify article content for kids aged 6-10"""
         
+        # Reuse an earlier rewrite of the same article at the same target level
+        target_level = self.config.TARGET_READING_LEVEL
+        method = 'ai' if self.config.OPENAI_API_KEY else 'basic'
+        content_hash = SimplificationCache.content_hash(article.title, article.content)
+        cached = self.cache.get(content_hash, target_level, method)
+        if cached:
+            article.reading_level = cached['original_level']
+            return self._build_simplified_article(
+                article, cached['simplified_title'],
+                cached['simplified_content'], cached['reading_level']
+            )
+        
         # First, calculate current reading level
         original_level = textstat.flesch_kincaid_grade(article.content)
         article.reading_level = original_level
         
         # If already at appropriate level, minimal processing
-        if original_level <= self.config.TARGET_READING_LEVEL:
+        if original_level <= target_level:
             simplified_content = self._basic_simplification(article.content)
         else:
             # Use AI to simplify if available
@@ -31,17 +139,26 @@ class ContentProcessor:
             else:
                 simplified_content = self._basic_simplification(article.content)
         
-        # Create new article with simplified content
+        simplified_title = self._simplify_title(article.title)
+        reading_level = textstat.flesch_kincaid_grade(simplified_content)
+        self.cache.put(content_hash, target_level, method, original_level,
+                       simplified_title, simplified_content, reading_level)
+        
+        return self._build_simplified_article(article, simplified_title, simplified_content, reading_level)
+
+    def _build_simplified_article(self, article: NewsArticle, title: str,
+                                  content: str, reading_level: float) -> NewsArticle:
+        """Create new article with simplified content"""
         simplified_article = NewsArticle(
-            title=self._simplify_title(article.title),
-            content=simplified_content,
+            title=title,
+            content=content,
             url=article.url,
             source=article.source,
             published_date=article.published_date
         )
         
         simplified_article.is_kid_friendly = True
-        simplified_article.reading_level = textstat.flesch_kincaid_grade(simplified_content)
+        simplified_article.reading_level = reading_level
         
         return simplified_article
 
@@ -56,24 +173,7 @@ class ContentProcessor:
         })
         
         # Basic word replacements
-        replacements = {
-            'scientists': 'smart people',
-            'researchers': 'smart people',
-            'investigation': 'looking into',
-            'authorities': 'people in charge',
-            'approximately': 'about',
-            'significant': 'big',
-            'additional': 'more',
-            'numerous': 'many',
-            'extensive': 'big',
-            'demonstrate': 'show',
-            'utilize': 'use',
-            'purchase': 'buy',
-            'assistance': 'help'
-        }
-        
-        for complex_word, simple_word in replacements.items():
-            title = re.sub(r'\b' + complex_word + r'\b', simple_word, title, flags=re.IGNORECASE)
+        title = TITLE_WORD_PATTERN.sub(_simple_title_word, title)
         
         return title
 
@@ -106,76 +206,8 @@ class ContentProcessor:
 
     def _replace_complex_words(self, text: str) -> str:
         """Replace complex words with simpler alternatives"""
-        replacements = {
-            # Common complex words and their simple replacements
-            'approximately': 'about',
-            'significant': 'big',
-            'magnificent': 'amazing',
-            'tremendous': 'huge',
-            'extraordinary': 'amazing',
-            'investigate': 'look into',
-            'demonstrate': 'show',
-            'participate': 'take part',
-            'communicate': 'talk',
-            'construct': 'build',
-            'discover': 'find',
-            'examine': 'look at',
-            'observe': 'watch',
-            'recognize': 'know',
-            'understand': 'know',
-            'receive': 'get',
-            'require': 'need',
-            'attempt': 'try',
-            'achieve': 'do',
-            'provide': 'give',
-            'consider': 'think about',
-            'determine': 'find out',
-            'indicate': 'show',
-            'suggest': 'say',
-            'reveal': 'show',
-            'establish': 'make',
-            'maintain': 'keep',
-            'obtain': 'get',
-            'purchase': 'buy',
-            'utilize': 'use',
-            'assistance': 'help',
-            'opportunity': 'chance',
-            'environment': 'place',
-            'individual': 'person',
-            'location': 'place',
-            'temperature': 'how hot or cold',
-            'transportation': 'ways to travel',
-            'information': 'facts',
-            'organization': 'group',
-            'community': 'neighborhood',
-            'government': 'people who run the country',
-            'definitely': 'for sure',
-            'obviously': 'clearly',
-            'particularly': 'especially',
-            'generally': 'usually',
-            'specifically': 'exactly',
-            'essentially': 'basically',
-            'immediately': 'right away',
-            'eventually': 'later',
-            'frequently': 'often',
-            'occasionally': 'sometimes',
-            'numerous': 'many',
-            'various': 'different',
-            'several': 'some',
-            'multiple': 'many',
-            'additional': 'more',
-            'enormous': 'huge',
-            'tiny': 'very small',
-            'gigantic': 'huge',
-            'microscopic': 'very tiny'
-        }
-        
-        for complex_word, simple_word in replacements.items():
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(complex_word) + r'\b'
-            text = re.sub(pattern, simple_word, text, flags=re.IGNORECASE)
         
-        return text
+        return COMPLEX_WORD_PATTERN.sub(_simple_word, text)
 
     def _simplify_sentence_structure(self, sentence: str) -> str:
         """Simplify sentence structure"""
@@ -7,23 +7,27 @@ Handles email subscriptions and automatic newsletter sending
 from flask import Flask, request, jsonify, render_template_string, send_from_directory, make_response
 from flask_cors import CORS
 import sqlite3
-import smtplib
+import sys
+import hashlib
 import schedule
 import time
 import threading
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 import os
 import logging
-from typing import List
+from typing import List, Optional
 
 from .config import Config
 from .news_scraper import NewsScraper, NewsArticle
 from .content_processor import ContentProcessor
 from .web_newsletter_generator import WebNewsletterGenerator
 
+# Shared modules (pooled SMTP delivery) live in the backend folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+from smtp_delivery import PreparedMessage, SMTPDeliveryPool, deliver
+from podcast_feed import get_feed
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -136,8 +140,8 @@ class NewsletterBackend:
             logger.error(f"Error getting subscribers: {e}")
             return []
 
-    def generate_daily_newsletter(self) -> str:
-        """Generate today's newsletter"""
+    def generate_daily_newsletter(self) -> Optional[str]:
+        """Generate today's newsletter and return the path it was written to"""
         try:
             # Scrape news
             logger.info("Generating daily newsletter...")
@@ -157,21 +161,26 @@ class NewsletterBackend:
                         logger.error(f"Error processing article: {e}")
                         continue
             
-            # Generate newsletter HTML
-            html_content = self.generator.create_web_newsletter(processed_articles)
-            
-            # Save newsletter
-            date_str = datetime.now().strftime("%Y%m%d")
-            filename = f"daily_newsletter_{date_str}.html"
-            filepath = self.generator.save_newsletter(html_content, filename)
+            # Stream the newsletter HTML straight to today's file
+            filepath = self.generator.write_web_newsletter(processed_articles, self.todays_newsletter_filename())
             
             logger.info(f"Daily newsletter generated: {filepath}")
-            return html_content
+            return filepath
             
         except Exception as e:
             logger.error(f"Error generating newsletter: {e}")
             return None
 
+    def todays_newsletter_filename(self) -> str:
+        return f"daily_newsletter_{datetime.now().strftime('%Y%m%d')}.html"
+
+    def todays_newsletter(self) -> Optional[str]:
+        """Path of today's newsletter, generating it only if it doesn't exist yet"""
+        filepath = os.path.join('newsletters', self.todays_newsletter_filename())
+        if os.path.exists(filepath):
+            return filepath
+        return self.generate_daily_newsletter()
+
     def send_newsletter_emails(self):
         """Send newsletter to all subscribers"""
         try:
@@ -179,11 +188,12 @@ class NewsletterBackend:
                 logger.warning("Email credentials not configured. Skipping email sending.")
                 return False
 
-            # Generate newsletter
-            html_content = self.generate_daily_newsletter()
-            if not html_content:
+            # Reuse today's issue rather than scraping and rendering it again
+            filepath = self.todays_newsletter()
+            if not filepath:
                 logger.error("Failed to generate newsletter")
                 return False
+            html_content = Path(filepath).read_text(encoding='utf-8')
 
             # Get subscribers
             subscribers = self.get_all_subscribers()
@@ -191,35 +201,26 @@ class NewsletterBackend:
                 logger.info("No subscribers found")
                 return True
 
-            # Set up email server
-            server = smtplib.SMTP(self.config.SMTP_SERVER, self.config.SMTP_PORT)
-            server.starttls()
-            server.login(self.config.EMAIL_USER, self.config.EMAIL_PASSWORD)
-
-            # Send to each subscriber
-            sent_count = 0
-            for email in subscribers:
-                try:
-                    msg = MIMEMultipart('alternative')
-                    msg['From'] = self.config.EMAIL_USER
-                    msg['To'] = email
-                    msg['Subject'] = f"{self.config.NEWSLETTER_TITLE} - {datetime.now().strftime('%B %d, %Y')}"
-
-                    # Create HTML part
-                    html_part = MIMEText(html_content, 'html')
-                    msg.attach(html_part)
-
-                    # Send email
-                    server.send_message(msg)
-                    sent_count += 1
-                    logger.info(f"Newsletter sent to: {email}")
-
-                except Exception as e:
-                    logger.error(f"Failed to send to {email}: {e}")
-
-            server.quit()
-            logger.info(f"Newsletter sent to {sent_count} subscribers")
-            return True
+            message = PreparedMessage(
+                self.config.EMAIL_USER,
+                f"{self.config.NEWSLETTER_TITLE} - {datetime.now().strftime('%B %d, %Y')}",
+                html_content
+            )
+            pool = SMTPDeliveryPool(self.config.SMTP_SERVER, self.config.SMTP_PORT,
+                                    self.config.EMAIL_USER, self.config.EMAIL_PASSWORD)
+
+            # Resumable: a re-run today only sends to subscribers the ledger hasn't marked sent
+            conn = sqlite3.connect('newsletter_subscribers.db')
+            try:
+                counts = deliver(conn, f"newsletter-{datetime.now().strftime('%Y-%m-%d')}",
+                                 message, subscribers, pool)
+            finally:
+                conn.close()
+
+            logger.info(f"Newsletter sent to {counts['sent']} subscribers "
+                        f"({counts['skipped']} earlier, {counts['rejected']} rejected, "
+                        f"{counts['failed']} failed, {counts['pending']} pending)")
+            return counts['pending'] == 0
 
         except Exception as e:
             logger.error(f"Error sending newsletters: {e}")
@@ -232,10 +233,9 @@ backend = NewsletterBackend()
 def index():
     """Serve the latest newsletter"""
     try:
-        # Generate fresh newsletter
-        html_content = backend.generate_daily_newsletter()
-        if html_content:
-            return html_content
+        filepath = backend.todays_newsletter()
+        if filepath:
+            return send_from_directory(os.path.abspath(os.path.dirname(filepath)), os.path.basename(filepath))
         else:
             return "Newsletter temporarily unavailable", 500
     except Exception as e:
@@ -416,104 +416,123 @@ def serve_sample_audio(label: str, filename: str):
         return jsonify({'error': 'unknown label'}), 404
     return send_from_directory(base, filename)
 
+def _write_scanned_feed(feed_path: Path):
+    """Minimal feed from a folder scan, for installs whose episode index is still empty."""
+    feed_path.parent.mkdir(parents=True, exist_ok=True)
+
+    site_url = os.getenv('PODCAST_SITE_URL', request.host_url.rstrip('/'))
+    title = os.getenv('PODCAST_TITLE') or getattr(backend.config, 'NEWSLETTER_TITLE', 'Kids Daily News')
+    description = os.getenv('PODCAST_DESCRIPTION') or (
+        'Junior News Digest is a kid‑safe news show with short, positive stories '
+        'about science, animals, space, technology, sports, and kindness.'
+    )
+    author = os.getenv('PODCAST_AUTHOR', 'Junior News Digest')
+    contact_email = os.getenv('PODCAST_CONTACT_EMAIL', os.getenv('EMAIL_USER', 'podcast@example.com'))
+
+    # Discover recent audio files under kids_news_content/*_week/generated_audio/*.mp3
+    items_xml = []
+    root = Path('kids_news_content')
+    audio_files = []
+    for week_dir in sorted(root.glob('*_week'), reverse=True):
+        audio_dir = week_dir / 'generated_audio'
+        if audio_dir.exists():
+            for mp3 in sorted(audio_dir.glob('*.mp3'), key=lambda p: p.stat().st_mtime, reverse=True):
+                audio_files.append((week_dir.name, mp3))
+        if len(audio_files) >= 12:
+            break
+
+    for week_name, mp3 in audio_files[:12]:
+        pub_ts = mp3.stat().st_mtime
+        pub_date = datetime.utcfromtimestamp(pub_ts).strftime('%a, %d %b %Y %H:%M:%S GMT')
+        audio_url = f"{site_url}/audio/{week_name}/{mp3.name}"
+        item = f"""
+        <item>
+          <title>{mp3.stem}</title>
+          <description>Kids Daily News episode</description>
+          <enclosure url="{audio_url}" type="audio/mpeg"/>
+          <guid isPermaLink="false">{week_name}-{mp3.name}</guid>
+          <pubDate>{pub_date}</pubDate>
+        </item>
+        """
+        items_xml.append(item)
+
+    # Fallback to sample audio paths in repo if no weekly audio exists
+    if not items_xml:
+        sample_map = {
+            'current_batch': Path('legacy_development/fully_automatic_videos/current_batch/audio'),
+            'current_week': Path('legacy_development/story_based_videos/current_week/audio'),
+        }
+        for label, dir_path in sample_map.items():
+            if dir_path.exists():
+                for mp3 in sorted(dir_path.glob('*.mp3'), key=lambda p: p.stat().st_mtime, reverse=True)[:3]:
+                    pub_ts = mp3.stat().st_mtime
+                    pub_date = datetime.utcfromtimestamp(pub_ts).strftime('%a, %d %b %Y %H:%M:%S GMT')
+                    # Expose via static file server using send_from_directory route below
+                    audio_url = f"{site_url}/sample-audio/{label}/{mp3.name}"
+                    item = f"""
+                    <item>
+                      <title>{mp3.stem}</title>
+                      <description>Sample episode</description>
+                      <enclosure url=\"{audio_url}\" type=\"audio/mpeg\"/>
+                      <guid isPermaLink=\"false\">sample-{label}-{mp3.name}</guid>
+                      <pubDate>{pub_date}</pubDate>
+                      <itunes:explicit>false</itunes:explicit>
+                    </item>
+                    """
+                    items_xml.append(item)
+
+    # iTunes/Apple tags for Spotify validation
+    rss_xml = f"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
+    <rss version=\"2.0\" xmlns:itunes=\"http://www.itunes.com/dtds/podcast-1.0.dtd\" xmlns:atom=\"http://www.w3.org/2005/Atom\">
+      <channel>
+        <title>{title}</title>
+        <link>{site_url}</link>
+        <description>{description}</description>
+        <language>en</language>
+        <atom:link href=\"{site_url}/podcast/feed.xml\" rel=\"self\" type=\"application/rss+xml\" />
+        <itunes:author>{author}</itunes:author>
+        <itunes:owner>
+          <itunes:name>{author}</itunes:name>
+          <itunes:email>{contact_email}</itunes:email>
+        </itunes:owner>
+        <itunes:explicit>false</itunes:explicit>
+        <itunes:image href=\"{site_url}/podcast/cover.png\" />
+        <itunes:category text=\"Kids &amp; Family\" />
+        {''.join(items_xml)}
+      </channel>
+    </rss>"""
+
+    feed_path.write_text(rss_xml, encoding='utf-8')
+
 @app.route('/podcast/feed.xml')
 def serve_podcast_feed():
-    """Serve the podcast RSS feed. If missing, generate a minimal feed on the fly."""
-    base = Path('kids_news_content') / 'podcast'
-    feed_path = base / 'feed.xml'
+    """Serve the podcast RSS feed from the episode index, with ETag/If-None-Match support."""
     try:
-        if not feed_path.exists():
-            base.mkdir(parents=True, exist_ok=True)
-
-            site_url = os.getenv('PODCAST_SITE_URL', request.host_url.rstrip('/'))
-            title = os.getenv('PODCAST_TITLE') or getattr(backend.config, 'NEWSLETTER_TITLE', 'Kids Daily News')
-            description = os.getenv('PODCAST_DESCRIPTION') or (
-                'Junior News Digest is a kid‑safe news show with short, positive stories '
-                'about science, animals, space, technology, sports, and kindness.'
-            )
-            author = os.getenv('PODCAST_AUTHOR', 'Junior News Digest')
-            contact_email = os.getenv('PODCAST_CONTACT_EMAIL', os.getenv('EMAIL_USER', 'podcast@example.com'))
-
-            # Discover recent audio files under kids_news_content/*_week/generated_audio/*.mp3
-            items_xml = []
-            root = Path('kids_news_content')
-            audio_files = []
-            for week_dir in sorted(root.glob('*_week'), reverse=True):
-                audio_dir = week_dir / 'generated_audio'
-                if audio_dir.exists():
-                    for mp3 in sorted(audio_dir.glob('*.mp3'), key=lambda p: p.stat().st_mtime, reverse=True):
-                        audio_files.append((week_dir.name, mp3))
-                if len(audio_files) >= 12:
-                    break
-
-            for week_name, mp3 in audio_files[:12]:
-                pub_ts = mp3.stat().st_mtime
-                pub_date = datetime.utcfromtimestamp(pub_ts).strftime('%a, %d %b %Y %H:%M:%S GMT')
-                audio_url = f"{site_url}/audio/{week_name}/{mp3.name}"
-                item = f"""
-                <item>
-                  <title>{mp3.stem}</title>
-                  <description>Kids Daily News episode</description>
-                  <enclosure url="{audio_url}" type="audio/mpeg"/>
-                  <guid isPermaLink="false">{week_name}-{mp3.name}</guid>
-                  <pubDate>{pub_date}</pubDate>
-                </item>
-                """
-                items_xml.append(item)
-
-            # Fallback to sample audio paths in repo if no weekly audio exists
-            if not items_xml:
-                sample_map = {
-                    'current_batch': Path('legacy_development/fully_automatic_videos/current_batch/audio'),
-                    'current_week': Path('legacy_development/story_based_videos/current_week/audio'),
-                }
-                for label, dir_path in sample_map.items():
-                    if dir_path.exists():
-                        for mp3 in sorted(dir_path.glob('*.mp3'), key=lambda p: p.stat().st_mtime, reverse=True)[:3]:
-                            pub_ts = mp3.stat().st_mtime
-                            pub_date = datetime.utcfromtimestamp(pub_ts).strftime('%a, %d %b %Y %H:%M:%S GMT')
-                            # Expose via static file server using send_from_directory route below
-                            audio_url = f"{site_url}/sample-audio/{label}/{mp3.name}"
-                            item = f"""
-                            <item>
-                              <title>{mp3.stem}</title>
-                              <description>Sample episode</description>
-                              <enclosure url=\"{audio_url}\" type=\"audio/mpeg\"/>
-                              <guid isPermaLink=\"false\">sample-{label}-{mp3.name}</guid>
-                              <pubDate>{pub_date}</pubDate>
-                              <itunes:explicit>false</itunes:explicit>
-                            </item>
-                            """
-                            items_xml.append(item)
-
-            # iTunes/Apple tags for Spotify validation
-            rss_xml = f"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
-            <rss version=\"2.0\" xmlns:itunes=\"http://www.itunes.com/dtds/podcast-1.0.dtd\" xmlns:atom=\"http://www.w3.org/2005/Atom\">
-              <channel>
-                <title>{title}</title>
-                <link>{site_url}</link>
-                <description>{description}</description>
-                <language>en</language>
-                <atom:link href=\"{site_url}/podcast/feed.xml\" rel=\"self\" type=\"application/rss+xml\" />
-                <itunes:author>{author}</itunes:author>
-                <itunes:owner>
-                  <itunes:name>{author}</itunes:name>
-                  <itunes:email>{contact_email}</itunes:email>
-                </itunes:owner>
-                <itunes:explicit>false</itunes:explicit>
-                <itunes:image href=\"{site_url}/podcast/cover.png\" />
-                <itunes:category text=\"Kids &amp; Family\" />
-                {''.join(items_xml)}
-              </channel>
-            </rss>"""
-
-            feed_path.write_text(rss_xml, encoding='utf-8')
-
-        # Serve the (now existing) file
-        with open(feed_path, 'rb') as f:
-            resp = make_response(f.read())
-            resp.headers['Content-Type'] = 'application/rss+xml; charset=utf-8'
-            return resp
+        conn = sqlite3.connect(backend.content_db_path)
+        try:
+            feed = get_feed(conn, os.getenv('PODCAST_SITE_URL', request.host_url.rstrip('/')))
+        finally:
+            conn.close()
+
+        if feed:
+            rss_xml, etag, built_at = feed
+            last_modified = datetime.fromisoformat(built_at)
+        else:
+            # Nothing indexed yet: fall back to a one-off scan of the week folders
+            feed_path = Path('kids_news_content') / 'podcast' / 'feed.xml'
+            if not feed_path.exists():
+                _write_scanned_feed(feed_path)
+            rss_xml = feed_path.read_bytes()
+            etag = hashlib.sha256(rss_xml).hexdigest()[:32]
+            last_modified = datetime.fromtimestamp(feed_path.stat().st_mtime, timezone.utc)
+
+        resp = make_response(rss_xml)
+        resp.headers['Content-Type'] = 'application/rss+xml; charset=utf-8'
+        resp.headers['Cache-Control'] = 'public, max-age=300'
+        resp.set_etag(etag)
+        resp.last_modified = last_modified
+        # Podcast apps poll this; unchanged feeds get an empty 304
+        return resp.make_conditional(request)
     except Exception as e:
         logger.error(f"Podcast feed error: {e}")
         return jsonify({'error': 'Podcast feed unavailable'}), 500
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator
+from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+# Rendered fragments kept per renderer; a daily issue has tens of articles
+FRAGMENT_CACHE_SIZE = 1024
+
+def article_hash(article: Any) -> str:
+    """Stable hash of the parts of an article that end up on the page"""
+    fields = [getattr(article, 'title', ''), getattr(article, 'content', ''),
+              getattr(article, 'source', ''), getattr(article, 'reading_level', None)]
+    return hashlib.sha256(json.dumps(fields, default=str).encode('utf-8')).hexdigest()
+
+class NewsletterRenderer:
+    """Compiled newsletter shell plus memoized per-article fragments.
+
+    Every template is compiled once, when the renderer is built. The shell
+    holds the static page and receives article fragments already rendered;
+    fragments are memoized by key, so an article seen in an earlier build
+    (the web page, then the email send) is rendered only once.
+    """
+
+    def __init__(self, shell_source: str, fragment_sources: Dict[str, str],
+                 cache_size: int = FRAGMENT_CACHE_SIZE):
+        # Same defaults as jinja2.Template, so output is unchanged
+        self.environment = Environment()
+        self.shell = self.environment.from_string(shell_source)
+        self.fragments = {name: self.environment.from_string(source)
+                          for name, source in fragment_sources.items()}
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def memoize(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, building it on first use"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        value = build()
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def fragment(self, name: str, key: Hashable, **context) -> str:
+        """Render fragment ``name``, reusing an earlier render for the same key"""
+        return self.memoize((name, key), lambda: self.fragments[name].render(**context))
+
+    def stream(self, **context) -> Iterator[str]:
+        """The page as a stream of chunks, without building it in memory"""
+        return self.shell.generate(**context)
+
+    def render(self, **context) -> str:
+        return ''.join(self.stream(**context))
+
+    def write(self, filepath: str, **context) -> str:
+        """Stream the page to ``filepath``; readers never see a half-written file"""
+        directory = os.path.dirname(filepath) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for chunk in self.stream(**context):
+                    f.write(chunk)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return filepath
+
+    def clear(self):
+        self._cache.clear()
+
+def benchmark(article_count: int = 50, issues: int = 20, changed: int = 5) -> Dict[str, float]:
+    """Time issue builds of ``article_count`` articles, in milliseconds.
+
+    ``cold`` is a fresh generator (templates compiled, every fragment
+    rendered), ``warm`` rebuilds the same issue, and ``partial`` an issue in
+    which ``changed`` articles are new.
+    """
+    from .news_scraper import NewsArticle
+    from .web_newsletter_generator import WebNewsletterGenerator
+
+    def make_articles(prefix):
+        articles = []
+        for i in range(article_count):
+            topic = ('a robot on Mars', 'ocean plastic clean-up', 'a town library')[i % 3]
+            article = NewsArticle(f"{prefix} story {i}", f"Kids learn about {topic}. " * 12,
+                                  f"http://example.com/{prefix}/{i}", f"Source {i % 7}")
+            article.reading_level = 2.0 + (i % 10) / 10
+            articles.append(article)
+        return articles
+
+    articles = make_articles('weekly')
+    results = {}
+
+    start = time.perf_counter()
+    generator = WebNewsletterGenerator()
+    html = generator.create_web_newsletter(articles)
+    results['cold'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(issues):
+        generator.create_web_newsletter(articles)
+    results['warm'] = (time.perf_counter() - start) * 1000 / issues
+
+    fresh = make_articles('breaking')
+    timings = []
+    for issue in range(issues):
+        mixed = articles[:]
+        for i in range(changed):
+            position = (issue * changed + i) % article_count
+            mixed[position] = fresh[(issue * changed + i) % article_count]
+        generator.renderer.clear()
+        generator.create_web_newsletter(articles)
+        start = time.perf_counter()
+        generator.create_web_newsletter(mixed)
+        timings.append(time.perf_counter() - start)
+    results['partial'] = sum(timings) * 1000 / issues
+
+    results['size_kb'] = len(html.encode('utf-8')) / 1024
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark newsletter rendering')
+    parser.add_argument('--articles', type=int, default=50, help='Articles per issue')
+    parser.add_argument('--issues', type=int, default=20, help='Issues to average over')
+    parser.add_argument('--changed', type=int, default=5, help='New articles per partial issue')
+    args = parser.parse_args()
+
+    results = benchmark(args.articles, args.issues, args.changed)
+    print(f"{args.articles}-article issue ({results['size_kb']:.0f} KB)")
+    print(f"  cold build:      {results['cold']:8.2f} ms")
+    print(f"  warm rebuild:    {results['warm']:8.2f} ms")
+    print(f"  {args.changed} new articles: {results['partial']:8.2f} ms")
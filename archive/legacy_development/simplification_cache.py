@@ -0,0 +1,73 @@
+import hashlib
+import sqlite3
+import logging
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+class SimplificationCache:
+    """Persistent store of kid-friendly rewrites keyed by content hash and reading level"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_database()
+
+    def _init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS simplified_articles (
+                content_hash TEXT NOT NULL,
+                target_level REAL NOT NULL,
+                method TEXT NOT NULL,
+                original_level REAL NOT NULL,
+                simplified_title TEXT NOT NULL,
+                simplified_content TEXT NOT NULL,
+                reading_level REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (content_hash, target_level, method)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def content_hash(title: str, content: str) -> str:
+        """Stable hash of an article's title and body"""
+        digest = hashlib.sha256()
+        digest.update(title.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, content_hash: str, target_level: float, method: str) -> Optional[Dict]:
+        """Return a cached rewrite, or None if this article has not been simplified yet"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('''
+                SELECT original_level, simplified_title, simplified_content, reading_level
+                FROM simplified_articles
+                WHERE content_hash = ? AND target_level = ? AND method = ?
+            ''', (content_hash, target_level, method)).fetchone()
+            conn.close()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Simplification cache read failed: {e}")
+            return None
+
+    def put(self, content_hash: str, target_level: float, method: str, original_level: float,
+            simplified_title: str, simplified_content: str, reading_level: float):
+        """Store a rewrite so later newsletter builds can reuse it"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                INSERT OR REPLACE INTO simplified_articles
+                (content_hash, target_level, method, original_level,
+                 simplified_title, simplified_content, reading_level)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (content_hash, target_level, method, original_level,
+                  simplified_title, simplified_content, reading_level))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Simplification cache write failed: {e}")
@@ -1,27 +1,18 @@
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 import os
-from jinja2 import Template
 from .news_scraper import NewsArticle
 from .config import Config
 from .kids_activities import KidsActivitiesGenerator
+from .newsletter_renderer import NewsletterRenderer, article_hash
 import logging
 
 logger = logging.getLogger(__name__)
 
-class WebNewsletterGenerator:
-    def __init__(self):
-        self.config = Config()
-        self.activities_gen = KidsActivitiesGenerator()
-
-    def create_web_newsletter(self, articles: List[NewsArticle], date: datetime = None) -> str:
-        """Create a web-ready newsletter with email signup and softer colors"""
-        
-        if date is None:
-            date = datetime.now()
-        
-        # Web-ready HTML template with email signup and softer colors
-        html_template = """
+# Static page: styles, scripts and the page chrome. Article cards and the
+# articleData entries are rendered separately (see ARTICLE_*_TEMPLATE) and
+# dropped in pre-rendered, so the shell itself never loops over articles.
+WEB_NEWSLETTER_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -774,7 +765,7 @@ class WebNewsletterGenerator:
             </div>
         </div>
         
-        {% if articles %}
+        {% if article_cards %}
         <!-- Category Filter (Clean & Simple) -->
         <div class="category-filter">
             <button class="category-btn active" onclick="filterByCategory('all')">🌟 All Stories</button>
@@ -785,51 +776,7 @@ class WebNewsletterGenerator:
             <button class="category-btn" onclick="filterByCategory('Community')">🏘️ Community</button>
         </div>
         
-            {% for article in articles %}
-            <div class="article-card" id="article-{{ loop.index }}" data-category="{{ article.category|default('News') }}">
-                <div class="article-preview">
-                    <div class="article-meta">
-                        <span class="category-tag">{{ article.category|default('📰 News') }}</span>
-                        <span class="source">📰 {{ article.source }}</span>
-                        <span class="reading-time">⏱️ {{ article.reading_time }} min read</span>
-                        {% if article.reading_level %}
-                        <div class="reading-level">
-                            📚 Level: {{ "%.1f"|format(article.reading_level) }}
-                        </div>
-                        {% endif %}
-                    </div>
-                    <div class="article-title">
-                        <span class="emoji">✨</span>
-                        {{ article.title }}
-                    </div>
-                    <div class="article-summary">
-                        {{ article.content }}
-                    </div>
-                    <div class="article-meta">
-                        <div class="article-source">
-                            📰 {{ article.source }}
-                        </div>
-                        {% if article.reading_level %}
-                        <div class="reading-level">
-                            📚 Level: {{ "%.1f"|format(article.reading_level) }}
-                        </div>
-                        {% endif %}
-                    </div>
-                    <div class="article-buttons">
-                        <button class="kids-read-btn" onclick="event.stopPropagation(); openKidsArticle({{ loop.index }})">
-                            <span class="btn-icon">🚀</span>
-                            <span class="btn-text">Kids Adventure!</span>
-                            <span class="btn-subtitle">Fun story & activities</span>
-                        </button>
-                        <button class="parent-guide-btn" onclick="event.stopPropagation(); openParentGuide({{ loop.index }})">
-                            <span class="btn-icon">👨‍👩‍👧‍👦</span>
-                            <span class="btn-text">Parent Guide</span>
-                            <span class="btn-subtitle">Discussion & context</span>
-                        </button>
-                    </div>
-                </div>
-            </div>
-            {% endfor %}
+            {% for card in article_cards %}{{ card }}{% endfor %}
         {% else %}
             <div class="fun-section">
                 <h3>🌟 No News Today!</h3>
@@ -867,18 +814,7 @@ class WebNewsletterGenerator:
         
         // Article data for new tab functionality
         const articleData = [
-            {% for article in articles %}
-            {
-                title: {{ article.title|tojson }},
-                content: {{ article.content|tojson }},
-                expandedContent: {{ article.expanded_content|tojson }},
-                funFacts: {{ article.fun_facts|tojson }},
-                activities: {{ article.activities|tojson }},
-                source: {{ article.source|tojson }},
-                readingLevel: {{ "%.1f"|format(article.reading_level) }},
-                category: {{ article.category|default('News')|tojson }},
-                educationalContext: "This story helps children develop understanding of the world around them and encourages curiosity about {{ article.category|default('current events') }}."
-            }{% if not loop.last %},{% endif %}
+            {% for entry in article_data %}{{ entry }}{% if not loop.last %},{% endif %}
                          {% endfor %}
         ];
         
@@ -1495,32 +1431,126 @@ class WebNewsletterGenerator:
 </body>
 </html>
         """
+
+# One article card; ``index`` is its 1-based position in the issue
+ARTICLE_CARD_TEMPLATE = """
+            <div class="article-card" id="article-{{ index }}" data-category="{{ article.category|default('News') }}">
+                <div class="article-preview">
+                    <div class="article-meta">
+                        <span class="category-tag">{{ article.category|default('📰 News') }}</span>
+                        <span class="source">📰 {{ article.source }}</span>
+                        <span class="reading-time">⏱️ {{ article.reading_time }} min read</span>
+                        {% if article.reading_level %}
+                        <div class="reading-level">
+                            📚 Level: {{ "%.1f"|format(article.reading_level) }}
+                        </div>
+                        {% endif %}
+                    </div>
+                    <div class="article-title">
+                        <span class="emoji">✨</span>
+                        {{ article.title }}
+                    </div>
+                    <div class="article-summary">
+                        {{ article.content }}
+                    </div>
+                    <div class="article-meta">
+                        <div class="article-source">
+                            📰 {{ article.source }}
+                        </div>
+                        {% if article.reading_level %}
+                        <div class="reading-level">
+                            📚 Level: {{ "%.1f"|format(article.reading_level) }}
+                        </div>
+                        {% endif %}
+                    </div>
+                    <div class="article-buttons">
+                        <button class="kids-read-btn" onclick="event.stopPropagation(); openKidsArticle({{ index }})">
+                            <span class="btn-icon">🚀</span>
+                            <span class="btn-text">Kids Adventure!</span>
+                            <span class="btn-subtitle">Fun story & activities</span>
+                        </button>
+                        <button class="parent-guide-btn" onclick="event.stopPropagation(); openParentGuide({{ index }})">
+                            <span class="btn-icon">👨‍👩‍👧‍👦</span>
+                            <span class="btn-text">Parent Guide</span>
+                            <span class="btn-subtitle">Discussion & context</span>
+                        </button>
+                    </div>
+                </div>
+            </div>
+            """
+
+# One entry of the page's articleData array
+ARTICLE_DATA_TEMPLATE = """
+            {
+                title: {{ article.title|tojson }},
+                content: {{ article.content|tojson }},
+                expandedContent: {{ article.expanded_content|tojson }},
+                funFacts: {{ article.fun_facts|tojson }},
+                activities: {{ article.activities|tojson }},
+                source: {{ article.source|tojson }},
+                readingLevel: {{ "%.1f"|format(article.reading_level) }},
+                category: {{ article.category|default('News')|tojson }},
+                educationalContext: "This story helps children develop understanding of the world around them and encourages curiosity about {{ article.category|default('current events') }}."
+            }"""
+
+class WebNewsletterGenerator:
+    def __init__(self):
+        self.config = Config()
+        self.activities_gen = KidsActivitiesGenerator()
+        self.renderer = NewsletterRenderer(WEB_NEWSLETTER_TEMPLATE, {
+            'card': ARTICLE_CARD_TEMPLATE,
+            'data': ARTICLE_DATA_TEMPLATE
+        })
+
+    def _newsletter_context(self, articles: List[NewsArticle], date: datetime = None) -> dict:
+        """Template variables for one issue, with article fragments pre-rendered"""
         
-        template = Template(html_template)
-        
-        # Format date
-        formatted_date = date.strftime("%A, %B %d, %Y")
+        if date is None:
+            date = datetime.now()
         
-        # Get fun content
         fun_fact = self.activities_gen.get_fun_fact()
         positive_message = self.activities_gen.get_positive_message()
         
-        # Enhance articles with expanded content
-        enhanced_articles = []
-        for article in articles:
-            enhanced_article = self._enhance_article_content(article)
-            enhanced_articles.append(enhanced_article)
-        
-        html_content = template.render(
-            title=self.config.NEWSLETTER_TITLE,
-            subtitle=self.config.NEWSLETTER_SUBTITLE,
-            formatted_date=formatted_date,
-            articles=enhanced_articles,
-            fun_fact=fun_fact,
-            positive_message=positive_message
-        )
+        article_cards = []
+        article_data = []
+        for index, article in enumerate(articles, 1):
+            key = article_hash(article)
+            # Memoized too, so the page and the email of an issue pick the same activities
+            enhanced_article = self.renderer.memoize(
+                ('article', key), lambda: self._enhance_article_content(article))
+            article_cards.append(self.renderer.fragment('card', (key, index),
+                                                        article=enhanced_article, index=index))
+            article_data.append(self.renderer.fragment('data', key, article=enhanced_article))
         
-        return html_content
+        return {
+            'title': self.config.NEWSLETTER_TITLE,
+            'subtitle': self.config.NEWSLETTER_SUBTITLE,
+            'formatted_date': date.strftime("%A, %B %d, %Y"),
+            'article_cards': article_cards,
+            'article_data': article_data,
+            'fun_fact': fun_fact,
+            'positive_message': positive_message
+        }
+
+    def stream_web_newsletter(self, articles: List[NewsArticle], date: datetime = None) -> Iterator[str]:
+        """Web-ready newsletter as a stream of HTML chunks"""
+        return self.renderer.stream(**self._newsletter_context(articles, date))
+
+    def create_web_newsletter(self, articles: List[NewsArticle], date: datetime = None) -> str:
+        """Create a web-ready newsletter with email signup and softer colors"""
+        return ''.join(self.stream_web_newsletter(articles, date))
+
+    def write_web_newsletter(self, articles: List[NewsArticle], filename: str = None,
+                             date: datetime = None) -> str:
+        """Stream a web-ready newsletter straight to the newsletters folder"""
+        filepath = self._newsletter_path(filename)
+        try:
+            self.renderer.write(filepath, **self._newsletter_context(articles, date))
+            logger.info(f"Web newsletter saved to {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"Error saving newsletter: {e}")
+            return None
 
     def create_netlify_newsletter(self, articles: List[NewsArticle], date: datetime = None) -> str:
         """Create a Netlify-specific newsletter with fixed forms"""
@@ -1617,15 +1647,18 @@ class WebNewsletterGenerator:
             'activities': activities
         }
 
-    def save_newsletter(self, content: str, filename: str = None) -> str:
-        """Save newsletter to file"""
-        
+    def _newsletter_path(self, filename: str = None) -> str:
         if filename is None:
             date_str = datetime.now().strftime("%Y%m%d")
             filename = f"web_newsletter_{date_str}.html"
         
         os.makedirs("newsletters", exist_ok=True)
-        filepath = os.path.join("newsletters", filename)
+        return os.path.join("newsletters", filename)
+
+    def save_newsletter(self, content: str, filename: str = None) -> str:
+        """Save newsletter to file"""
+        
+        filepath = self._newsletter_path(filename)
         
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
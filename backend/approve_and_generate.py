@@ -3,24 +3,29 @@
 Script to approve stories and generate videos/quizzes for testing
 """
 
-import sqlite3
-import json
 from datetime import datetime
-import uuid
+
+from data_layer import UnifiedDatabase, DATABASE_FILES
 
 def approve_stories_and_generate():
     """Approve stories and generate videos/quizzes"""
     
-    # Connect to editorial database
-    conn = sqlite3.connect('automated_editorial.db')
-    cursor = conn.cursor()
+    # One connection: the app database with the editorial database attached
+    udb = UnifiedDatabase()
+    if not udb.has_table('editorial', 'automated_stories'):
+        print(f"❌ Editorial database {DATABASE_FILES['editorial']} not found!")
+        udb.close()
+        return
+    
+    cursor = udb.cursor()
     
     # Get pending stories
-    cursor.execute('SELECT id, title, headline, content, script, category FROM automated_stories WHERE is_approved = 0')
+    cursor.execute('SELECT id, title FROM editorial.automated_stories WHERE is_approved = 0')
     pending_stories = cursor.fetchall()
     
     if not pending_stories:
         print("❌ No pending stories found!")
+        udb.close()
         return
     
     print(f"📋 Found {len(pending_stories)} pending stories")
@@ -29,43 +34,42 @@ def approve_stories_and_generate():
     publishing_days = ['monday', 'wednesday', 'friday']
     
     # Approve first 3 stories
-    approved_count = 0
-    for i, (story_id, title, headline, content, script, category) in enumerate(pending_stories[:3]):
-        publishing_day = publishing_days[i % 3]
-        
-        # Approve the story
-        cursor.execute('''
-            UPDATE automated_stories 
+    approvals = [(story_id, title, publishing_days[i % 3])
+                 for i, (story_id, title) in enumerate(pending_stories[:3])]
+    story_ids = [story_id for story_id, _, _ in approvals]
+    
+    # Approval, article and video land together or not at all
+    with udb.transaction() as cursor:
+        cursor.executemany('''
+            UPDATE editorial.automated_stories 
             SET is_approved = 1, approved_date = ?, publishing_day = ?, video_generated = 1, quiz_generated = 1
             WHERE id = ?
-        ''', (datetime.now().isoformat(), publishing_day, story_id))
-        
-        # Add to main articles database
-        add_to_main_database(story_id, title, headline, content, category)
+        ''', [(datetime.now().isoformat(), publishing_day, story_id)
+              for story_id, _, publishing_day in approvals])
         
-        # Create a mock video entry
-        create_mock_video(story_id, title, category)
+        add_to_main_database(cursor, story_ids)
         
-        print(f"✅ Approved: {title} (scheduled for {publishing_day})")
-        approved_count += 1
+        # Create mock video entries
+        create_mock_videos(cursor, story_ids)
+    
+    udb.close()
     
-    conn.commit()
-    conn.close()
+    for story_id, title, publishing_day in approvals:
+        print(f"✅ Approved: {title} (scheduled for {publishing_day})")
     
-    print(f"\n🎉 Successfully approved {approved_count} stories!")
+    print(f"\n🎉 Successfully approved {len(approvals)} stories!")
     print("📺 Mock videos created and ready for the app!")
     print("🎯 Articles added to main database!")
 
-def add_to_main_database(story_id, title, headline, content, category):
-    """Add approved story to main articles database"""
-    
-    # Connect to main database
-    conn = sqlite3.connect('junior_news_integrated.db')
-    cursor = conn.cursor()
+def _id_placeholders(story_ids):
+    return ', '.join('?' * len(story_ids))
+
+def add_to_main_database(cursor, story_ids):
+    """Copy approved stories from the attached editorial database into articles"""
     
     # Create articles table if it doesn't exist
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS articles (
+        CREATE TABLE IF NOT EXISTS main.articles (
             id TEXT PRIMARY KEY,
             title TEXT NOT NULL,
             headline TEXT NOT NULL,
@@ -84,66 +88,30 @@ def add_to_main_database(story_id, title, headline, content, category):
         )
     ''')
     
-    # Create summary from first 150 characters of content
-    summary = content[:150] + "..." if len(content) > 150 else content
-    
-    # Insert article
-    cursor.execute('''
-        INSERT OR REPLACE INTO articles 
+    # Summary is the first 150 characters of content
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO main.articles 
         (id, title, headline, summary, content, category, author, published_date, read_time, is_breaking, is_trending, is_hot, views, likes, comments)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        story_id,
-        title,
-        headline,
-        summary,
-        content,
-        category,
-        'Junior News Team',
-        datetime.now().isoformat(),
-        '3 min read',
-        0,  # is_breaking
-        1,  # is_trending
-        0,  # is_hot
-        0,  # views
-        0,  # likes
-        0   # comments
-    ))
-    
-    conn.commit()
-    conn.close()
+        SELECT id, title, headline,
+               CASE WHEN length(content) > 150 THEN substr(content, 1, 150) || '...' ELSE content END,
+               content, category, 'Junior News Team', ?, '3 min read', 0, 1, 0, 0, 0, 0
+        FROM editorial.automated_stories
+        WHERE id IN ({_id_placeholders(story_ids)})
+    ''', (datetime.now().isoformat(), *story_ids))
 
-def create_mock_video(story_id, title, category):
-    """Create a mock video entry"""
-    
-    # Connect to main database
-    conn = sqlite3.connect('junior_news_integrated.db')
-    cursor = conn.cursor()
+def create_mock_videos(cursor, story_ids):
+    """Create mock video entries for the approved stories"""
     
     # Videos table already exists with correct schema
-    
-    video_id = f"video_{story_id}"
-    description = f"Watch the amazing story: {title}. Perfect for young learners!"
-    
-    # Insert video using existing schema
-    cursor.execute('''
-        INSERT OR REPLACE INTO videos 
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO main.videos 
         (id, article_id, title, description, file_path, thumbnail_path, duration, status, upload_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        video_id,
-        story_id,
-        title,
-        description,
-        f"/videos/{story_id}.mp4",
-        f"/thumbnails/{story_id}.jpg",
-        "5:30",
-        "ready",
-        datetime.now().isoformat()
-    ))
-    
-    conn.commit()
-    conn.close()
+        SELECT 'video_' || id, id, title,
+               'Watch the amazing story: ' || title || '. Perfect for young learners!',
+               '/videos/' || id || '.mp4', '/thumbnails/' || id || '.jpg', '5:30', 'ready', ?
+        FROM editorial.automated_stories
+        WHERE id IN ({_id_placeholders(story_ids)})
+    ''', (datetime.now().isoformat(), *story_ids))
 
 if __name__ == "__main__":
     approve_stories_and_generate()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Podcast Audio Mastering
+============================================
+
+Brings narration to a consistent loudness before it is published.
+
+Mastering is the usual two-pass EBU R128 ``loudnorm``: the first ffmpeg
+pass only measures the source (integrated loudness, true peak, loudness
+range, threshold), the second applies a linear gain computed from those
+measurements and encodes the MP3. Linear mode keeps the voice's dynamics
+intact instead of compressing it the way single-pass loudnorm does.
+
+Both passes are cached in SQLite, keyed by the SHA-256 of the source audio
+and the mastering settings:
+
+- ``audio_loudness`` keeps the measured stats, so a source is analysed at
+  most once per target;
+- ``mastered_audio`` points at the encoded file in the cache folder, so
+  re-publishing unchanged audio returns the existing file without running
+  ffmpeg at all.
+
+Run this file directly to master a file and print its loudness stats:
+    python audio_mastering.py narration.aiff --cache-dir kids_news_content/mastered
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+
+@dataclass(frozen=True)
+class MasteringSettings:
+    # Apple/Spotify podcast targets
+    integrated_lufs: float = -16.0
+    true_peak_db: float = -1.5
+    loudness_range: float = 11.0
+    sample_rate: int = 44100
+    bitrate: str = '192k'
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def loudnorm(self, **measured) -> str:
+        params = {'I': self.integrated_lufs, 'TP': self.true_peak_db, 'LRA': self.loudness_range, **measured}
+        return 'loudnorm=' + ':'.join(f"{name}={value}" for name, value in params.items())
+
+def file_hash(path: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class AudioMastering:
+    """Two-pass loudness normalisation with cached measurements and outputs"""
+
+    def __init__(self, cache_dir: Union[str, Path], db_path: Optional[Union[str, Path]] = None,
+                 settings: Optional[MasteringSettings] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(db_path or self.cache_dir / 'mastering.db')
+        self.settings = settings or MasteringSettings()
+        self._init_database()
+
+    def _init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS audio_loudness (
+                source_hash TEXT NOT NULL,
+                settings_key TEXT NOT NULL,
+                input_i REAL,
+                input_tp REAL,
+                input_lra REAL,
+                input_thresh REAL,
+                target_offset REAL,
+                measured_at TEXT NOT NULL,
+                PRIMARY KEY (source_hash, settings_key)
+            );
+
+            CREATE TABLE IF NOT EXISTS mastered_audio (
+                source_hash TEXT NOT NULL,
+                settings_key TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                output_i REAL,
+                output_tp REAL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (source_hash, settings_key)
+            );
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _run_loudnorm(self, args: list) -> Dict[str, str]:
+        """Run ffmpeg with a loudnorm filter and return its JSON report"""
+        result = subprocess.run([FFMPEG, '-hide_banner', '-nostats', *args],
+                                capture_output=True, text=True, check=True)
+        report = result.stderr[result.stderr.rindex('{'):result.stderr.rindex('}') + 1]
+        return json.loads(report)
+
+    def measure(self, source: Path, source_hash: str) -> Dict[str, float]:
+        """Loudness stats of ``source``, measured only the first time it is seen"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT input_i, input_tp, input_lra, input_thresh, target_offset FROM audio_loudness
+                WHERE source_hash = ? AND settings_key = ?
+            ''', (source_hash, self.settings.key)).fetchone()
+            if row:
+                return dict(zip(('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset'), row))
+
+            report = self._run_loudnorm(['-i', str(source), '-af', self.settings.loudnorm(print_format='json'),
+                                         '-f', 'null', '-'])
+            stats = {name: float(report[name])
+                     for name in ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset')}
+            conn.execute('''
+                INSERT OR REPLACE INTO audio_loudness
+                (source_hash, settings_key, input_i, input_tp, input_lra, input_thresh, target_offset, measured_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (source_hash, self.settings.key, *stats.values(), datetime.now().isoformat()))
+            conn.commit()
+            logger.info(f"🔊 Measured {source.name}: {stats['input_i']:.1f} LUFS, {stats['input_tp']:.1f} dBTP")
+            return stats
+        finally:
+            conn.close()
+
+    def master(self, source: Union[str, Path]) -> Path:
+        """Path of the mastered MP3 for ``source``, encoding it only if not cached"""
+        source = Path(source)
+        source_hash = file_hash(source)
+        settings = self.settings
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute('''
+                SELECT output_path FROM mastered_audio WHERE source_hash = ? AND settings_key = ?
+            ''', (source_hash, settings.key)).fetchone()
+        finally:
+            conn.close()
+        if row and Path(row[0]).exists():
+            logger.info(f"♻️  Reusing mastered audio for {source.name}")
+            return Path(row[0])
+
+        stats = self.measure(source, source_hash)
+        output_path = self.cache_dir / f"{source_hash[:24]}-{settings.key}.mp3"
+        tmp_path = output_path.with_suffix('.tmp.mp3')
+        encode = ['-ar', str(settings.sample_rate), '-c:a', 'libmp3lame', '-b:a', settings.bitrate,
+                  '-y', str(tmp_path)]
+
+        if stats['input_i'] == float('-inf'):
+            # Silence: there is no loudness to normalise
+            subprocess.run([FFMPEG, '-hide_banner', '-nostats', '-i', str(source), *encode],
+                           capture_output=True, check=True)
+            output = {'output_i': None, 'output_tp': None}
+        else:
+            loudnorm = settings.loudnorm(
+                measured_I=stats['input_i'], measured_TP=stats['input_tp'],
+                measured_LRA=stats['input_lra'], measured_thresh=stats['input_thresh'],
+                offset=stats['target_offset'], linear='true', print_format='json')
+            report = self._run_loudnorm(['-i', str(source), '-af', loudnorm, *encode])
+            output = {'output_i': float(report['output_i']), 'output_tp': float(report['output_tp'])}
+        os.replace(tmp_path, output_path)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO mastered_audio
+                (source_hash, settings_key, output_path, output_i, output_tp, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (source_hash, settings.key, str(output_path), output['output_i'], output['output_tp'],
+                  datetime.now().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
+
+        logger.info(f"🎚️  Mastered {source.name} to {settings.integrated_lufs} LUFS: {output_path.name}")
+        return output_path
+
+    def master_to(self, source: Union[str, Path], destination: Union[str, Path]) -> Path:
+        """Master ``source`` and copy the result to ``destination``"""
+        destination = Path(destination)
+        mastered = self.master(source)
+        if mastered.resolve() != destination.resolve():
+            shutil.copyfile(mastered, destination)
+        return destination
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Master narration audio to podcast loudness')
+    parser.add_argument('source', help='Audio file to master')
+    parser.add_argument('--cache-dir', default='kids_news_content/mastered', help='Mastered output cache')
+    parser.add_argument('--lufs', type=float, default=MasteringSettings.integrated_lufs, help='Target loudness')
+    parser.add_argument('--true-peak', type=float, default=MasteringSettings.true_peak_db, help='True peak ceiling')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    mastering = AudioMastering(args.cache_dir, settings=MasteringSettings(args.lufs, args.true_peak))
+    output = mastering.master(args.source)
+    stats = mastering.measure(Path(args.source), file_hash(args.source))
+    print(f"{args.source}: {stats['input_i']:.1f} LUFS, {stats['input_tp']:.1f} dBTP, "
+          f"LRA {stats['input_lra']:.1f} -> {output}")
@@ -10,20 +10,24 @@ Complete automation system that:
 4. Runs 24/7 in the background
 """
 
-import os
 import sys
 import json
 import uuid
 import random
 import threading
-import time
-import schedule
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import sqlite3
 import logging
 from pathlib import Path
 
+from migrate_database import apply_index_migrations
+from data_layer import database_path
+from generate_quiz import QUIZZES_TABLE_SQL
+from pregeneration import (ensure_pregeneration_queue, prepared_artifacts, skip_unfinished_jobs,
+                           PregenerationWorker)
+from scheduler_engine import JobScheduler, WeeklyJob
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -96,6 +100,12 @@ class AutomatedEditorialSystem:
             )
         ''')
         
+        # Secondary indexes for the hot status/category/date filters
+        apply_index_migrations(conn)
+        
+        # Media builds are queued as soon as a story is scheduled
+        ensure_pregeneration_queue(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Automated editorial database initialized")
@@ -276,7 +286,7 @@ class AutomatedEditorialSystem:
             
             cursor.execute('''
                 SELECT s.id, s.title, s.content, s.summary, s.script, s.category, s.author,
-                       s.is_breaking, s.is_trending, s.is_hot, ps.story_order
+                       s.is_breaking, s.is_trending, s.is_hot, ps.story_order, ps.id
                 FROM automated_stories s
                 JOIN publishing_schedule ps ON s.id = ps.story_id
                 WHERE s.scheduled_publish_date = ? AND s.status = 'scheduled' 
@@ -292,27 +302,45 @@ class AutomatedEditorialSystem:
             
             published_count = 0
             
-            # Connect to main app database
-            app_db_path = "junior_news_integrated.db"
-            app_conn = sqlite3.connect(app_db_path)
-            app_cursor = app_conn.cursor()
+            # Media was built ahead of time by the pre-generation queue
+            prepared = prepared_artifacts(cursor, 'publishing_schedule', [story[11] for story in stories])
+            
+            # Attach the main app database so articles and story statuses
+            # commit together
+            cursor.execute("ATTACH DATABASE ? AS app", (str(database_path('main')),))
+            cursor.execute(QUIZZES_TABLE_SQL.replace('EXISTS quizzes', 'EXISTS app.quizzes'))
+            cursor.execute("BEGIN IMMEDIATE")
             
             for i, story in enumerate(stories):
+                # A story that fails leaves nothing behind; the others still publish
+                cursor.execute("SAVEPOINT publish_story")
                 try:
                     # Create unique article ID
                     article_id = f"{story[1].lower().replace(' ', '-').replace(',', '').replace('.', '')}-{datetime.now().strftime('%Y%m%d')}-{i+1:02d}"
                     
+                    artifacts = prepared[story[11]]
+                    quiz_id = f"quiz_{article_id}" if artifacts.get('quiz') else None
+                    
                     # Insert into main app articles table
-                    app_cursor.execute('''
-                        INSERT INTO articles (id, title, headline, content, summary, category, author, 
+                    cursor.execute('''
+                        INSERT INTO app.articles (id, title, headline, content, summary, category, author, 
                                             published_date, read_time, likes, views, comments,
-                                            is_breaking, is_trending, is_hot)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                            is_breaking, is_trending, is_hot,
+                                            video_url, thumbnail_url, quiz_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         article_id, story[1], story[1], story[2], story[3], story[5], story[6],
                         datetime.now().isoformat(), f"{max(1, len(story[2].split()) // 200)} min read",
-                        0, 0, 0, story[7], story[8], story[9]
+                        0, 0, 0, story[7], story[8], story[9],
+                        artifacts.get('video'), artifacts.get('thumbnail'), quiz_id
                     ))
+                    if quiz_id:
+                        cursor.execute('''
+                            INSERT OR REPLACE INTO app.quizzes
+                            (id, article_id, title, questions, total_questions, created_date)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        ''', (quiz_id, article_id, f"Quiz: {story[1]}", artifacts['quiz'],
+                              len(json.loads(artifacts['quiz'])), datetime.now().isoformat()))
                     
                     # Update story status to published
                     cursor.execute('''
@@ -321,14 +349,22 @@ class AutomatedEditorialSystem:
                         WHERE id = ?
                     ''', (datetime.now().isoformat(), story[0]))
                     
+                    cursor.execute("RELEASE publish_story")
                     published_count += 1
                     logger.info(f"✅ Published story {i+1}: {story[1]}")
                     
                 except Exception as e:
+                    cursor.execute("ROLLBACK TO publish_story")
+                    cursor.execute("RELEASE publish_story")
                     logger.error(f"Error publishing story {story[1]}: {e}")
             
-            app_conn.commit()
-            app_conn.close()
+            cursor.execute('''
+                UPDATE publishing_schedule SET status = 'published'
+                WHERE publish_day = ? AND status = 'scheduled'
+                  AND story_id IN (SELECT id FROM automated_stories WHERE status = 'published')
+            ''', (day_name,))
+            skip_unfinished_jobs(cursor, 'publishing_schedule', [story[11] for story in stories])
+            
             conn.commit()
             conn.close()
             
@@ -544,50 +580,38 @@ def run_automation_system():
     system = AutomatedEditorialSystem()
     
     # Schedule the automation tasks
+    scheduler = JobScheduler(system.db_path, [
+        # Sunday 9:00 AM - Generate stories
+        WeeklyJob('generate_weekly_stories', ('sunday',), '09:00', system.generate_weekly_stories),
+        
+        # Sunday 10:00 PM - Process approved stories (after editor review at 8:00 PM)
+        WeeklyJob('process_approved_stories', ('sunday',), '22:00', system.process_approved_stories),
+        
+        # Monday 8:00 AM - Publish Monday story
+        WeeklyJob('publish_monday', ('monday',), '08:00', system.publish_scheduled_story, ('Monday',)),
+        
+        # Wednesday 8:00 AM - Publish Wednesday story
+        WeeklyJob('publish_wednesday', ('wednesday',), '08:00', system.publish_scheduled_story, ('Wednesday',)),
+        
+        # Friday 8:00 AM - Publish Friday story
+        WeeklyJob('publish_friday', ('friday',), '08:00', system.publish_scheduled_story, ('Friday',)),
+    ])
     
-    # Sunday 9:00 AM - Generate stories
-    schedule.every().sunday.at("09:00").do(system.generate_weekly_stories)
-    
-    # Sunday 10:00 PM - Process approved stories (after editor review at 8:00 PM)
-    schedule.every().sunday.at("22:00").do(system.process_approved_stories)
-    
-    # Monday 8:00 AM - Publish Monday story
-    schedule.every().monday.at("08:00").do(system.publish_scheduled_story, "Monday")
-    
-    # Wednesday 8:00 AM - Publish Wednesday story
-    schedule.every().wednesday.at("08:00").do(system.publish_scheduled_story, "Wednesday")
-    
-    # Friday 8:00 AM - Publish Friday story
-    schedule.every().friday.at("08:00").do(system.publish_scheduled_story, "Friday")
+    # Thumbnails, quizzes, audio and video are built ahead of publish day
+    pregeneration_worker = PregenerationWorker(system.db_path)
+    pregeneration_worker.start()
     
     logger.info("📅 Scheduled tasks:")
-    logger.info("   • Sunday 9:00 AM - Generate candidate stories")
-    logger.info("   • Sunday 10:00 PM - Process approved stories")
-    logger.info("   • Monday 8:00 AM - Publish Monday story")
-    logger.info("   • Wednesday 8:00 AM - Publish Wednesday story")
-    logger.info("   • Friday 8:00 AM - Publish Friday story")
     logger.info("🔄 System running 24/7...")
     
-    # Run the scheduler
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-        except KeyboardInterrupt:
-            logger.info("Automation system stopped by user")
-            break
-        except Exception as e:
-            logger.error(f"Automation system error: {e}")
-            time.sleep(60)  # Continue running even if there's an error
+    # Run the scheduler; sleeps until the next task is due
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Automation system stopped by user")
+    finally:
+        pregeneration_worker.stop()
 
 if __name__ == '__main__':
-    # Install required packages
-    try:
-        import schedule
-    except ImportError:
-        logger.info("Installing required packages...")
-        os.system("pip install schedule")
-        import schedule
-    
     # Run the automation system
     run_automation_system()
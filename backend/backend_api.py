@@ -15,12 +15,15 @@ from typing import List, Dict, Optional, Any
 import sqlite3
 import logging
 from dataclasses import dataclass, asdict
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import jwt
 from dotenv import load_dotenv
 
+from migrate_database import apply_index_migrations
+from quiz_payloads import QuizPayloadCache, ensure_quiz_payloads, NOT_FOUND_PAYLOAD
+
 # Load environment variables
 load_dotenv()
 
@@ -187,6 +190,12 @@ class DatabaseManager:
             )
         ''')
         
+        # Quiz responses are pre-serialized when quizzes are written
+        ensure_quiz_payloads(conn)
+        
+        # Secondary indexes for the hot status/category/date filters
+        apply_index_migrations(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Database initialized successfully")
@@ -228,6 +237,7 @@ class DatabaseManager:
 
 # Initialize database
 db = DatabaseManager()
+quiz_payloads = QuizPayloadCache(db.db_path)
 
 # Helper functions
 def generate_jwt_token(user_id: str) -> str:
@@ -323,16 +333,11 @@ def get_article(article_id: str):
 def get_article_quiz(article_id: str):
     """Get quiz for a specific article"""
     try:
-        query = "SELECT * FROM quizzes WHERE article_id = ?"
-        quizzes = db.execute_query(query, (article_id,))
-        
-        if not quizzes:
-            return jsonify({'success': False, 'error': 'Quiz not found'}), 404
-        
-        quiz = quizzes[0]
-        quiz['questions'] = json.loads(quiz['questions'])
-        
-        return jsonify({'success': True, 'quiz': quiz})
+        # Serialized when the quiz was written; a hit is a dict lookup
+        payload = quiz_payloads.get(article_id)
+        if payload is None:
+            return Response(NOT_FOUND_PAYLOAD, status=404, mimetype='application/json')
+        return Response(payload, mimetype='application/json')
     
     except Exception as e:
         logger.error(f"Error fetching quiz for article {article_id}: {e}")
@@ -596,6 +601,7 @@ def generate_quiz():
         # Update article with quiz_id
         update_query = "UPDATE articles SET quiz_id = ? WHERE id = ?"
         db.execute_query(update_query, (quiz_id, article_id))
+        quiz_payloads.forget(article_id)
         
         return jsonify({'success': True, 'quiz': asdict(quiz)})
     
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Batch Story Selection Engine
+Scores large pools of ingested feed entries and picks a category-diverse top-k
+"""
+
+import heapq
+import logging
+from itertools import count as _counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Blocked keywords - any hit makes a story unsuitable for children
+BLOCKED_WORDS = [
+    'violence', 'death', 'kill', 'murder', 'war', 'terrorism',
+    'drug', 'alcohol', 'crime', 'prison', 'arrest', 'gun',
+    'disaster', 'tragedy', 'accident', 'crash', 'fire'
+]
+
+# Positive keywords boost score
+POSITIVE_WORDS = [
+    'discovery', 'invention', 'amazing', 'incredible', 'hero',
+    'save', 'help', 'protect', 'learn', 'explore', 'adventure',
+    'fun', 'exciting', 'wonderful', 'brilliant', 'creative'
+]
+
+EDUCATIONAL_WORDS = [
+    'scientist', 'researcher', 'student', 'school', 'university',
+    'experiment', 'study', 'research', 'innovation', 'breakthrough'
+]
+
+CATEGORY_BONUSES = {
+    'Science': 0.2,
+    'Technology': 0.15,
+    'Environment': 0.2,
+    'Space': 0.25,
+    'Education': 0.15
+}
+
+
+class KeywordMatcher:
+    """Count which keywords occur (as substrings) in an already-lowercased text.
+
+    CPython's substring search is faster than any single-regex alternation for
+    keyword lists this size, so matching stays a tuple scan of ``in`` checks;
+    the batch win comes from lowercasing and joining each story only once.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keywords))
+
+    def count(self, text: str) -> int:
+        return sum(1 for keyword in self.keywords if keyword in text)
+
+    def any_match(self, text: str) -> bool:
+        return any(keyword in text for keyword in self.keywords)
+
+
+class BatchStorySelector:
+    """Batch scoring and heap-based diverse selection for candidate stories.
+
+    Stories are duck-typed: anything with ``title``, ``content``, ``category``
+    and a writable ``kid_friendly_score`` (e.g. ``weekly_content_system.Story``).
+    """
+
+    def __init__(self):
+        self.blocked = KeywordMatcher(BLOCKED_WORDS)
+        self.positive = KeywordMatcher(POSITIVE_WORDS)
+        self.educational = KeywordMatcher(EDUCATIONAL_WORDS)
+
+    def is_kid_appropriate(self, content: str) -> bool:
+        """Check if content is appropriate for children"""
+        return not self.blocked.any_match(content.lower())
+
+    def extract_features(self, story) -> Tuple[int, int, float, int]:
+        """Compute (positive hits, educational hits, category bonus, word count)"""
+        # Title and content are matched together; the newline keeps keywords
+        # from spanning the boundary between them.
+        text = f"{story.content.lower()}\n{story.title.lower()}"
+        return (
+            self.positive.count(text),
+            self.educational.count(text),
+            CATEGORY_BONUSES.get(story.category, 0),
+            len(story.content.split())
+        )
+
+    @staticmethod
+    def score_features(features: Tuple[int, int, float, int]) -> float:
+        """Turn a feature row into a kid-friendly score capped at 1.0"""
+        positive_count, educational_count, category_bonus, word_count = features
+
+        score = 0.5
+        score += positive_count * 0.1
+        score += educational_count * 0.15
+        score += category_bonus
+
+        # Length penalty (too long or too short)
+        if 50 <= word_count <= 200:
+            score += 0.1
+        elif word_count < 20 or word_count > 500:
+            score -= 0.2
+
+        return min(1.0, score)
+
+    def score(self, story) -> float:
+        """Calculate how kid-friendly and engaging a story is"""
+        return self.score_features(self.extract_features(story))
+
+    def iter_scored(self, stories: Iterable) -> Iterator:
+        """Stream kid-appropriate stories with ``kid_friendly_score`` filled in"""
+        for story in stories:
+            if self.is_kid_appropriate(story.content):
+                story.kid_friendly_score = self.score(story)
+                yield story
+
+    def select_diverse(self, stories: Iterable, count: int) -> List:
+        """Pick the best story per category, then fill with the highest scorers.
+
+        Consumes ``stories`` as a stream using O(count + categories) memory:
+        it keeps the best story of every category plus a bounded min-heap of
+        the ``2 * count`` best stories overall, which always contains the fill
+        candidates once at most ``count`` category leaders are removed.
+        Ties keep arrival order, matching a stable descending sort.
+        """
+        if count <= 0:
+            return []
+
+        seq = _counter()
+        category_best: Dict[str, Tuple[float, int, object]] = {}
+        top_heap: List[Tuple[float, int, object]] = []
+        top_size = 2 * count
+
+        for story in stories:
+            entry = (story.kid_friendly_score, -next(seq), story)
+            best = category_best.get(story.category)
+            if best is None or entry[:2] > best[:2]:
+                category_best[story.category] = entry
+            if len(top_heap) < top_size:
+                heapq.heappush(top_heap, entry)
+            elif entry[:2] > top_heap[0][:2]:
+                heapq.heapreplace(top_heap, entry)
+
+        leaders = heapq.nlargest(count, category_best.values(), key=lambda e: e[:2])
+        selected_seq = {e[1] for e in leaders}
+
+        remaining = count - len(leaders)
+        fill = heapq.nlargest(
+            remaining,
+            (e for e in top_heap if e[1] not in selected_seq),
+            key=lambda e: e[:2]
+        ) if remaining > 0 else []
+
+        return [e[2] for e in leaders] + [e[2] for e in fill]
+
+    def select(self, stories: Iterable, count: int) -> List:
+        """Filter, score and select in a single streaming pass"""
+        return self.select_diverse(self.iter_scored(stories), count)
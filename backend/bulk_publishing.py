@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Bulk Publishing
+====================================
+
+Moves every approved candidate story into ``articles`` in one transaction.
+
+Approved rows are staged in a temporary table with a single executemany, then
+conflicts are flagged, articles are created with INSERT ... SELECT and the
+candidates are flipped to 'processed' with one UPDATE. Either the whole batch
+lands or nothing does, so candidates and articles never disagree.
+
+Run this file directly to benchmark it against the old per-story path:
+    python bulk_publishing.py --count 2000
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def article_slug(title: str, stamp: str) -> str:
+    """Article ID derived from the story title, as the editorial portal has always done"""
+    return title.lower().replace(' ', '-').replace(',', '').replace('.', '') + f"-{stamp}"
+
+def read_time(content: str) -> str:
+    return f"{max(1, len(content.split()) // 200)} min read"
+
+def publish_approved_candidates(conn: sqlite3.Connection,
+                                published_at: Optional[datetime] = None) -> Dict:
+    """Publish all approved candidates as articles in a single transaction.
+
+    Returns ``{'processed': int, 'conflicts': [...]}``; each conflict names the
+    candidate, the article ID it would have used and why it was skipped.
+    Conflicting candidates stay 'approved' so an editor can retitle and retry.
+    """
+    published_at = published_at or datetime.now()
+    published_date = published_at.isoformat()
+    stamp = published_at.strftime('%Y%m%d%H%M%S')
+
+    cursor = conn.cursor()
+    try:
+        # Take the write lock before reading so no approval can slip in between
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            SELECT id, COALESCE(final_title, title), COALESCE(final_content, content)
+            FROM candidate_stories
+            WHERE status = 'approved'
+            ORDER BY approved_date
+        ''')
+        approved = cursor.fetchall()
+        if not approved:
+            conn.rollback()
+            return {'processed': 0, 'conflicts': []}
+
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS approved_batch (
+                seq INTEGER PRIMARY KEY,
+                candidate_id TEXT NOT NULL,
+                article_id TEXT NOT NULL,
+                read_time TEXT NOT NULL,
+                conflict TEXT
+            )
+        ''')
+        cursor.execute("DELETE FROM approved_batch")
+        cursor.executemany('''
+            INSERT INTO approved_batch (candidate_id, article_id, read_time)
+            VALUES (?, ?, ?)
+        ''', [(candidate_id, article_slug(title, stamp), read_time(content))
+              for candidate_id, title, content in approved])
+
+        # Flag rows that would collide with an existing article or with an
+        # earlier row of this batch (two stories with the same title)
+        cursor.execute('''
+            UPDATE approved_batch SET conflict = 'article already exists'
+            WHERE article_id IN (SELECT id FROM articles)
+        ''')
+        cursor.execute('''
+            UPDATE approved_batch SET conflict = 'duplicate title in batch'
+            WHERE conflict IS NULL AND seq NOT IN (
+                SELECT MIN(seq) FROM approved_batch GROUP BY article_id
+            )
+        ''')
+
+        cursor.execute('''
+            INSERT INTO articles (id, title, headline, content, summary, category, author,
+                                  published_date, is_breaking, is_trending, is_hot,
+                                  views, likes, read_time)
+            SELECT b.article_id,
+                   COALESCE(cs.final_title, cs.title), COALESCE(cs.final_title, cs.title),
+                   COALESCE(cs.final_content, cs.content),
+                   COALESCE(cs.final_summary, cs.summary, ''),
+                   cs.category, cs.author, ?, cs.is_breaking, cs.is_trending, cs.is_hot,
+                   0, 0, b.read_time
+            FROM approved_batch b
+            JOIN candidate_stories cs ON cs.id = b.candidate_id
+            WHERE b.conflict IS NULL
+            ORDER BY b.seq
+        ''', (published_date,))
+        processed = cursor.rowcount
+
+        cursor.execute('''
+            UPDATE candidate_stories SET status = 'processed'
+            WHERE status = 'approved' AND id IN (
+                SELECT candidate_id FROM approved_batch WHERE conflict IS NULL
+            )
+        ''')
+
+        cursor.execute('''
+            SELECT b.candidate_id, b.article_id, b.conflict
+            FROM approved_batch b
+            WHERE b.conflict IS NOT NULL
+            ORDER BY b.seq
+        ''')
+        conflicts = [{'candidate_id': row[0], 'article_id': row[1], 'reason': row[2]}
+                     for row in cursor.fetchall()]
+
+        cursor.execute("DELETE FROM approved_batch")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    for conflict in conflicts:
+        logger.warning(f"Skipped {conflict['candidate_id']} ({conflict['article_id']}): {conflict['reason']}")
+
+    return {'processed': processed, 'conflicts': conflicts}
+
+def _create_benchmark_schema(conn: sqlite3.Connection):
+    conn.executescript('''
+        CREATE TABLE articles (
+            id TEXT PRIMARY KEY, title TEXT NOT NULL, headline TEXT NOT NULL,
+            content TEXT NOT NULL, summary TEXT NOT NULL, category TEXT NOT NULL,
+            author TEXT NOT NULL, published_date TEXT NOT NULL, read_time TEXT NOT NULL,
+            likes INTEGER DEFAULT 0, views INTEGER DEFAULT 0,
+            is_breaking BOOLEAN DEFAULT FALSE, is_trending BOOLEAN DEFAULT FALSE,
+            is_hot BOOLEAN DEFAULT FALSE
+        );
+        CREATE TABLE candidate_stories (
+            id TEXT PRIMARY KEY, title TEXT NOT NULL, content TEXT NOT NULL, summary TEXT,
+            category TEXT NOT NULL, author TEXT NOT NULL, status TEXT DEFAULT 'pending_review',
+            is_breaking BOOLEAN DEFAULT FALSE, is_trending BOOLEAN DEFAULT FALSE,
+            is_hot BOOLEAN DEFAULT FALSE, approved_date TEXT,
+            final_title TEXT, final_content TEXT, final_summary TEXT
+        );
+        CREATE INDEX idx_candidate_stories_status ON candidate_stories (status);
+    ''')
+
+def _seed_approved(db_path: str, count: int):
+    conn = sqlite3.connect(db_path)
+    _create_benchmark_schema(conn)
+    conn.executemany('''
+        INSERT INTO candidate_stories (id, title, content, summary, category, author,
+                                       status, approved_date)
+        VALUES (?, ?, ?, ?, 'science', 'Junior News Team', 'approved', ?)
+    ''', [(f"candidate_{i}", f"Story number {i}", "Kids discover something amazing. " * 40,
+           "A short summary.", datetime.now().isoformat()) for i in range(count)])
+    conn.commit()
+    conn.close()
+
+def _publish_one_by_one(db_path: str) -> int:
+    """The previous path: a connection and commit per article plus one per status update"""
+    conn = sqlite3.connect(db_path)
+    stories = conn.execute('''
+        SELECT id, title, content, summary, category, author, is_breaking, is_trending, is_hot
+        FROM candidate_stories WHERE status = 'approved' ORDER BY approved_date
+    ''').fetchall()
+    conn.close()
+
+    stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    for story in stories:
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            INSERT INTO articles (id, title, headline, content, summary, category, author,
+                                  published_date, is_breaking, is_trending, is_hot,
+                                  views, likes, read_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (article_slug(story[1], stamp), story[1], story[1], story[2], story[3], story[4],
+              story[5], datetime.now().isoformat(), story[6], story[7], story[8], 0, 0,
+              read_time(story[2])))
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE candidate_stories SET status = 'processed' WHERE id = ?", (story[0],))
+        conn.commit()
+        conn.close()
+    return len(stories)
+
+def run_benchmark(count: int) -> List[Dict]:
+    """Time per-story and bulk publishing of ``count`` approved candidates"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('per_story', 'bulk'):
+            db_path = os.path.join(tmp, f"{name}.db")
+            _seed_approved(db_path, count)
+
+            start = time.perf_counter()
+            if name == 'per_story':
+                processed = _publish_one_by_one(db_path)
+            else:
+                conn = sqlite3.connect(db_path)
+                processed = publish_approved_candidates(conn)['processed']
+                conn.close()
+            elapsed = time.perf_counter() - start
+
+            results.append({'method': name, 'processed': processed, 'seconds': elapsed})
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark bulk publishing of approved stories')
+    parser.add_argument('--count', type=int, default=1000, help='Approved candidates to publish')
+    args = parser.parse_args()
+
+    for result in run_benchmark(args.count):
+        rate = result['processed'] / result['seconds'] if result['seconds'] else 0
+        print(f"{result['method']:>10}: {result['processed']} stories in "
+              f"{result['seconds']:.3f}s ({rate:,.0f} stories/s)")
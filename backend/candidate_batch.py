@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Candidate Batch Upsert
+===========================================
+
+Saves a batch of generated candidate stories in one transaction.
+
+Candidates are written with a single ``executemany`` upsert keyed on the
+candidate id. Regenerating a batch refreshes the copy of candidates that are
+still pending review and have no editor notes. Ids only number a day's
+batch, so a regenerated candidate can be a different story; candidates an
+editor has reviewed or annotated are therefore left exactly as they are.
+Pending candidates from earlier batches are removed only if no editor has
+written notes on them yet.
+
+Combined with a seeded NewsStoryGenerator this makes candidate generation
+repeatable, so thousands of candidates can be loaded for portal and API load
+tests and reloaded without losing editors' work.
+"""
+
+import json
+import sqlite3
+import logging
+from typing import Dict, List
+
+from readability import analyze_batch
+
+logger = logging.getLogger(__name__)
+
+def upsert_candidates(conn: sqlite3.Connection, candidates: List[Dict]) -> Dict:
+    """Insert or refresh ``candidates`` and drop stale, un-annotated pending ones.
+
+    Returns ``{'inserted', 'refreshed', 'removed'}`` counts.
+    """
+    scores = analyze_batch(candidate['content'] for candidate in candidates)
+    ids = json.dumps([candidate['candidate_id'] for candidate in candidates])
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+
+        cursor.execute('''
+            SELECT COUNT(*) FROM candidate_stories WHERE id IN (SELECT value FROM json_each(?))
+        ''', (ids,))
+        existing = cursor.fetchone()[0]
+
+        cursor.execute('''
+            DELETE FROM candidate_stories
+            WHERE status = 'pending_review' AND COALESCE(editor_notes, '') = ''
+              AND id NOT IN (SELECT value FROM json_each(?))
+        ''', (ids,))
+        removed = cursor.rowcount
+
+        cursor.executemany('''
+            INSERT INTO candidate_stories
+            (id, title, content, summary, category, author, generated_date,
+             status, priority_score, is_breaking, is_trending, is_hot,
+             reading_grade, word_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title = excluded.title,
+                content = excluded.content,
+                summary = excluded.summary,
+                category = excluded.category,
+                author = excluded.author,
+                generated_date = excluded.generated_date,
+                priority_score = excluded.priority_score,
+                is_breaking = excluded.is_breaking,
+                is_trending = excluded.is_trending,
+                is_hot = excluded.is_hot,
+                reading_grade = excluded.reading_grade,
+                word_count = excluded.word_count
+            WHERE candidate_stories.status = 'pending_review'
+              AND COALESCE(candidate_stories.editor_notes, '') = ''
+        ''', [(
+            candidate['candidate_id'], candidate['title'], candidate['content'],
+            candidate['summary'], candidate['category'], candidate['author'],
+            candidate['generated_date'], candidate['status'], candidate['priority_score'],
+            candidate['is_breaking'], candidate['is_trending'], candidate['is_hot'],
+            score.reading_grade, score.word_count
+        ) for candidate, score in zip(candidates, scores)])
+        written = cursor.rowcount
+
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    result = {'inserted': len(candidates) - existing, 'refreshed': written - (len(candidates) - existing),
+              'removed': removed}
+    logger.info(f"Saved {len(candidates)} candidates: {result}")
+    return result
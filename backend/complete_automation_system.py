@@ -23,6 +23,9 @@ from dotenv import load_dotenv
 sys.path.append(str(Path(__file__).parent))
 from backend_api import DatabaseManager, NewsArticle, Quiz
 from weekly_content_system import WeeklyContentSystem, Story
+from batch_story_selector import BatchStorySelector
+from run_ledger import RunLedger
+from quiz_facts import FactIndex, as_lettered
 
 # Load environment variables
 load_dotenv()
@@ -54,6 +57,7 @@ class StorySelector:
     def __init__(self):
         self.content_system = WeeklyContentSystem()
         self.db = DatabaseManager()
+        self.batch_selector = BatchStorySelector()
     
     async def select_daily_stories(self, count: int = 10) -> List[Story]:
         """Select and curate daily stories for children"""
@@ -78,11 +82,8 @@ class StorySelector:
                 logger.warning(f"Failed to fetch from {source}: {e}")
                 continue
         
-        # Filter and score stories
-        filtered_stories = await self._filter_and_score_stories(all_stories)
-        
-        # Select top stories with diversity
-        selected_stories = await self._select_diverse_stories(filtered_stories, count)
+        # Filter, score and select top stories with diversity in one streaming pass
+        selected_stories = self.batch_selector.select(all_stories, count)
         
         logger.info(f"Selected {len(selected_stories)} stories successfully")
         return selected_stories
@@ -131,13 +132,7 @@ class StorySelector:
     
     async def _filter_and_score_stories(self, stories: List[Story]) -> List[Story]:
         """Filter stories for kid-appropriateness and score them"""
-        filtered_stories = []
-        
-        for story in stories:
-            # Basic content filtering
-            if self._is_kid_appropriate(story.content):
-                story.kid_friendly_score = self._calculate_kid_score(story)
-                filtered_stories.append(story)
+        filtered_stories = list(self.batch_selector.iter_scored(stories))
         
         # Sort by score
         filtered_stories.sort(key=lambda s: s.kid_friendly_score, reverse=True)
@@ -145,85 +140,15 @@ class StorySelector:
     
     def _is_kid_appropriate(self, content: str) -> bool:
         """Check if content is appropriate for children"""
-        content_lower = content.lower()
-        
-        # Blocked keywords
-        blocked_words = [
-            'violence', 'death', 'kill', 'murder', 'war', 'terrorism',
-            'drug', 'alcohol', 'crime', 'prison', 'arrest', 'gun',
-            'disaster', 'tragedy', 'accident', 'crash', 'fire'
-        ]
-        
-        return not any(word in content_lower for word in blocked_words)
+        return self.batch_selector.is_kid_appropriate(content)
     
     def _calculate_kid_score(self, story: Story) -> float:
         """Calculate how kid-friendly and engaging a story is"""
-        score = 0.5  # Base score
-        
-        content_lower = story.content.lower()
-        title_lower = story.title.lower()
-        
-        # Positive keywords boost score
-        positive_words = [
-            'discovery', 'invention', 'amazing', 'incredible', 'hero',
-            'save', 'help', 'protect', 'learn', 'explore', 'adventure',
-            'fun', 'exciting', 'wonderful', 'brilliant', 'creative'
-        ]
-        
-        educational_words = [
-            'scientist', 'researcher', 'student', 'school', 'university',
-            'experiment', 'study', 'research', 'innovation', 'breakthrough'
-        ]
-        
-        # Calculate score based on positive content
-        positive_count = sum(1 for word in positive_words if word in content_lower or word in title_lower)
-        educational_count = sum(1 for word in educational_words if word in content_lower or word in title_lower)
-        
-        score += positive_count * 0.1
-        score += educational_count * 0.15
-        
-        # Bonus for certain categories
-        category_bonuses = {
-            'Science': 0.2,
-            'Technology': 0.15,
-            'Environment': 0.2,
-            'Space': 0.25,
-            'Education': 0.15
-        }
-        
-        score += category_bonuses.get(story.category, 0)
-        
-        # Length penalty (too long or too short)
-        word_count = len(story.content.split())
-        if 50 <= word_count <= 200:
-            score += 0.1
-        elif word_count < 20 or word_count > 500:
-            score -= 0.2
-        
-        return min(1.0, score)  # Cap at 1.0
+        return self.batch_selector.score(story)
     
     async def _select_diverse_stories(self, stories: List[Story], count: int) -> List[Story]:
         """Select diverse stories across categories"""
-        selected = []
-        categories_used = set()
-        
-        # First pass: select best story from each category
-        for story in stories:
-            if len(selected) >= count:
-                break
-            
-            if story.category not in categories_used:
-                selected.append(story)
-                categories_used.add(story.category)
-        
-        # Second pass: fill remaining slots with highest scoring stories
-        remaining_count = count - len(selected)
-        remaining_stories = [s for s in stories if s not in selected]
-        
-        for story in remaining_stories[:remaining_count]:
-            selected.append(story)
-        
-        return selected
+        return self.batch_selector.select_diverse(stories, count)
 
 class ScriptGenerator:
     """Generate engaging scripts for children from news stories"""
@@ -618,49 +543,16 @@ class QuizGenerator:
         """Generate an educational quiz"""
         logger.info(f"Generating quiz for: {content.article.title}")
         
-        questions = []
-        
-        # Question 1: Main topic
-        questions.append({
-            "id": "q1",
-            "question": f"What is the main topic of this story?",
-            "options": {
-                "A": content.article.category,
-                "B": "Sports",
-                "C": "Weather", 
-                "D": "Entertainment"
-            },
-            "correct_answer": "A",
-            "explanation": f"This story is about {content.article.category.lower()}!"
-        })
-        
-        # Question 2: Key detail
-        questions.append({
-            "id": "q2", 
-            "question": "Why is this story important for kids to know?",
-            "options": {
-                "A": "It's just for fun",
-                "B": "It teaches us about our world",
-                "C": "It's not important",
-                "D": "Only adults need to know"
-            },
-            "correct_answer": "B",
-            "explanation": "Learning about our world helps us become smarter and more curious!"
-        })
-        
-        # Question 3: Application
-        questions.append({
-            "id": "q3",
-            "question": f"How can this {content.article.category.lower()} story inspire you?",
-            "options": {
-                "A": "It can't inspire me",
-                "B": "By showing me new possibilities",
-                "C": "It's too difficult to understand", 
-                "D": "Only scientists can be inspired"
-            },
-            "correct_answer": "B",
-            "explanation": "Every story can inspire us to learn more and dream bigger!"
-        })
+        # Facts are indexed once per article; wrong answers come from other stories
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            fact_index = FactIndex(conn)
+            article = content.article
+            fact_index.index_article(article.id, article.title, article.content, article.category)
+            conn.commit()
+            questions = as_lettered(fact_index.questions_for(article.id))
+        finally:
+            conn.close()
         
         quiz = Quiz(
             id=str(uuid.uuid4()),
@@ -686,70 +578,155 @@ class CompleteAutomationSystem:
         self.db = DatabaseManager()
     
     async def run_daily_automation(self) -> List[GeneratedContent]:
-        """Run the complete daily automation pipeline"""
+        """Run the complete daily automation pipeline.
+        
+        Every stage is checkpointed per story in the run ledger, so if a run
+        fails part-way, running it again the same day skips finished stages
+        (and their API calls) and picks up where it stopped.
+        """
         logger.info("🚀 Starting daily automation pipeline...")
+        ledger = RunLedger(self.db.db_path)
         
         try:
-            # Step 1: Select stories
-            stories = await self.story_selector.select_daily_stories(count=5)
-            logger.info(f"✅ Selected {len(stories)} stories")
+            # Step 1: Select stories (a resumed run keeps its original picks)
+            selected = ledger.selected_stories()
+            if selected:
+                logger.info(f"♻️ Resuming run {ledger.run_id} with {len(selected)} previously selected stories")
+            else:
+                stories = await self.story_selector.select_daily_stories(count=5)
+                for index, story in enumerate(stories):
+                    selection = {
+                        'story': asdict(story),
+                        'article_id': str(uuid.uuid4()),
+                        'video_id': str(uuid.uuid4()),
+                        'published_date': datetime.utcnow().isoformat()
+                    }
+                    ledger.checkpoint(story.id, 'selected', selection, story_index=index)
+                    selected.append(selection)
+            logger.info(f"✅ Selected {len(selected)} stories")
             
             # Step 2: Process each story
             generated_content = []
             
-            for story in stories:
-                logger.info(f"Processing story: {story.title}")
-                
-                content = GeneratedContent(story=story, article=None, script="")
-                
-                # Create article
-                content.article = NewsArticle(
-                    id=str(uuid.uuid4()),
-                    title=story.title,
-                    headline=story.title,
-                    content=story.content,
-                    summary=story.content[:200] + "...",
-                    category=story.category,
-                    author="Junior News Team",
-                    published_date=datetime.utcnow().isoformat(),
-                    read_time="3 min read",
-                    is_trending=story.kid_friendly_score > 0.8
-                )
-                
-                # Generate script
-                content.script = await self.script_generator.generate_script(story)
-                
-                # Generate video
-                video_path = await self.video_generator.generate_video(content)
-                content.article.video_url = video_path
-                
-                # Generate quiz
-                quiz = await self.quiz_generator.generate_quiz(content)
-                content.article.quiz_id = quiz.id
-                
-                # Save to database
-                self.db.insert_article(content.article)
-                
-                # Save quiz
-                query = '''
-                    INSERT INTO quizzes (id, article_id, title, questions, total_score, created_date)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                '''
-                self.db.execute_query(query, (
-                    quiz.id, quiz.article_id, quiz.title,
-                    json.dumps(quiz.questions), quiz.total_score, quiz.created_date
-                ))
-                
+            for index, selection in enumerate(selected):
+                content = await self._process_story(ledger, index, selection)
                 generated_content.append(content)
-                logger.info(f"✅ Completed processing: {story.title}")
+                logger.info(f"✅ Completed processing: {content.story.title}")
             
+            ledger.finish()
             logger.info(f"🎉 Daily automation completed! Generated {len(generated_content)} complete content packages")
             return generated_content
             
         except Exception as e:
-            logger.error(f"❌ Daily automation failed: {e}")
+            ledger.finish(error=str(e))
+            logger.error(f"❌ Daily automation failed: {e} (rerun today to resume run {ledger.run_id})")
             raise
     
+    async def _process_story(self, ledger: RunLedger, index: int, selection: Dict) -> GeneratedContent:
+        """Run the remaining stages for one story, checkpointing after each"""
+        story = Story(**selection['story'])
+        key = story.id
+        video_id = selection['video_id']
+        logger.info(f"Processing story: {story.title}")
+        
+        content = GeneratedContent(story=story, article=None, script="")
+        
+        # Create article
+        content.article = NewsArticle(
+            id=selection['article_id'],
+            title=story.title,
+            headline=story.title,
+            content=story.content,
+            summary=story.content[:200] + "...",
+            category=story.category,
+            author="Junior News Team",
+            published_date=selection['published_date'],
+            read_time="3 min read",
+            is_trending=story.kid_friendly_score > 0.8
+        )
+        
+        # Generate script
+        done = ledger.completed(key, 'scripted')
+        if done:
+            content.script = done['output']
+        else:
+            content.script = await self.script_generator.generate_script(story)
+            ledger.checkpoint(key, 'scripted', content.script, story_index=index)
+        
+        # Generate audio narration
+        done = ledger.completed(key, 'audio')
+        if done:
+            audio_path = ledger.restore_artifact(done['hashes']['audio'], done['output'])
+        else:
+            audio_path = await self.video_generator._generate_audio(content.script, video_id)
+            ledger.checkpoint(key, 'audio', audio_path, files={'audio': audio_path}, story_index=index)
+        
+        # Generate illustrations (FFmpeg reads them back by their numbered names)
+        done = ledger.completed(key, 'images')
+        if done:
+            image_paths = [ledger.restore_artifact(digest, path)
+                           for digest, path in zip(done['hashes']['images'], done['output'])]
+        else:
+            image_paths = await self.video_generator._generate_illustrations(story, video_id)
+            ledger.checkpoint(key, 'images', image_paths, files={'images': image_paths}, story_index=index)
+        
+        # Assemble and brand the video
+        done = ledger.completed(key, 'video')
+        if done:
+            video_path = ledger.restore_artifact(done['hashes']['video'], done['output'])
+        else:
+            temp_path = await self.video_generator._create_video(audio_path, image_paths, video_id)
+            video_path = await self.video_generator._add_branding(temp_path, video_id)
+            ledger.checkpoint(key, 'video', video_path, files={'video': video_path}, story_index=index)
+        content.video_path = video_path
+        content.article.video_url = video_path
+        
+        # Generate quiz
+        done = ledger.completed(key, 'quiz')
+        if done:
+            content.quiz = Quiz(**done['output'])
+        else:
+            await self.quiz_generator.generate_quiz(content)
+            ledger.checkpoint(key, 'quiz', asdict(content.quiz), story_index=index)
+        content.article.quiz_id = content.quiz.id
+        
+        # Save article and quiz together; replacing keeps a retried save idempotent
+        if not ledger.completed(key, 'saved'):
+            self._save_content(content)
+            ledger.checkpoint(key, 'saved', {'article_id': content.article.id}, story_index=index)
+        
+        return content
+    
+    def _save_content(self, content: GeneratedContent):
+        """Write the article and its quiz in one transaction"""
+        article, quiz = content.article, content.quiz
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO articles (
+                    id, title, headline, content, summary, category, author,
+                    published_date, read_time, likes, views, comments,
+                    is_breaking, is_trending, is_hot, video_url, thumbnail_url, quiz_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                article.id, article.title, article.headline, article.content,
+                article.summary, article.category, article.author,
+                article.published_date, article.read_time, article.likes,
+                article.views, article.comments, article.is_breaking,
+                article.is_trending, article.is_hot, article.video_url,
+                article.thumbnail_url, article.quiz_id
+            ))
+            conn.execute('''
+                INSERT OR REPLACE INTO quizzes (id, article_id, title, questions, total_score, created_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                quiz.id, quiz.article_id, quiz.title,
+                json.dumps(quiz.questions), quiz.total_score, quiz.created_date
+            ))
+            conn.commit()
+        finally:
+            conn.close()
+    
     async def upload_to_app(self, content_list: List[GeneratedContent]):
         """Upload generated content to the app backend"""
         logger.info("📱 Uploading content to app backend...")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Unified Data Layer
+=======================================
+
+Content is spread over five SQLite files. Instead of opening one connection
+per file and copying rows through Python, ``UnifiedDatabase`` opens the app
+database and ATTACHes the others under fixed schema names, so a cross-file
+move is a single ``INSERT ... SELECT`` inside one transaction (SQLite commits
+attached databases atomically in rollback-journal mode).
+
+``consolidate_databases`` is the migration that merges every table from the
+five files into a single database, so deployments can move to one file and
+point every DatabaseManager at it.
+
+Usage:
+    python data_layer.py --status                  # Tables and row counts per database
+    python data_layer.py --consolidate junior_news.db
+"""
+
+import os
+import sqlite3
+import logging
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Schema name -> database file. 'main' is the app database the API serves;
+# the others are attached next to it. Earlier entries win when the
+# consolidation migration meets the same row in two files.
+DATABASE_FILES = {
+    'main': 'junior_news_integrated.db',
+    'production': 'production.db',
+    'editorial': 'automated_editorial.db',
+    'automation': 'editorial_automation.db',
+    'tracking': 'kids_news_content/content_tracking.db',
+}
+
+CONSOLIDATION_MIGRATION = 'consolidate_databases'
+
+# Integer references that aren't declared as foreign keys:
+# table -> {column: column naming the table the id belongs to}
+ROW_REFERENCES = {
+    'pregeneration_jobs': {'schedule_id': 'source'},
+}
+
+def database_path(schema: str = 'main', data_dir: str = '.') -> Path:
+    """Where ``schema``'s file lives; JUNIOR_NEWS_DATA_DIR overrides ``data_dir``"""
+    return Path(os.getenv('JUNIOR_NEWS_DATA_DIR', data_dir)) / DATABASE_FILES[schema]
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+class UnifiedDatabase:
+    """One connection over all Junior News databases.
+
+    Files that don't exist yet are skipped rather than created, so a
+    deployment that never ran a subsystem doesn't grow empty database files.
+    """
+
+    def __init__(self, data_dir: str = '.', files: Optional[Dict[str, str]] = None,
+                 timeout: float = 30):
+        self.data_dir = Path(os.getenv('JUNIOR_NEWS_DATA_DIR', data_dir))
+        self.files = dict(files or DATABASE_FILES)
+        self.conn = sqlite3.connect(str(self.data_dir / self.files['main']), timeout=timeout)
+        self.attached = ['main']
+        for schema, filename in self.files.items():
+            if schema == 'main':
+                continue
+            path = self.data_dir / filename
+            if path.exists():
+                self.conn.execute("ATTACH DATABASE ? AS " + _quote(schema), (str(path),))
+                self.attached.append(schema)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def cursor(self) -> sqlite3.Cursor:
+        return self.conn.cursor()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction spanning every attached database"""
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def tables(self, schema: str = 'main') -> List[str]:
+        """Ordinary tables in a schema, without SQLite internals or FTS shadow tables"""
+        rows = self.conn.execute(
+            f"SELECT name, sql FROM {_quote(schema)}.sqlite_master WHERE type = 'table' ORDER BY rowid"
+        ).fetchall()
+        virtual = [name for name, sql in rows if (sql or '').upper().startswith('CREATE VIRTUAL TABLE')]
+        return [name for name, sql in rows
+                if not name.startswith('sqlite_') and name not in virtual
+                and not any(name.startswith(v + '_') for v in virtual)]
+
+    def columns(self, schema: str, table: str) -> List[str]:
+        rows = self.conn.execute(f"PRAGMA {_quote(schema)}.table_info({_quote(table)})").fetchall()
+        return [row[1] for row in rows]
+
+    def rowid_key(self, schema: str, table: str) -> Optional[str]:
+        """The INTEGER PRIMARY KEY column (a rowid alias), if the table has one"""
+        rows = self.conn.execute(f"PRAGMA {_quote(schema)}.table_info({_quote(table)})").fetchall()
+        keys = [row for row in rows if row[5]]
+        if len(keys) == 1 and keys[0][2].upper() == 'INTEGER':
+            return keys[0][1]
+        return None
+
+    def has_table(self, schema: str, table: str) -> bool:
+        return schema in self.attached and bool(self.columns(schema, table))
+
+    def copy_rows(self, cursor: sqlite3.Cursor, source: str, table: str, target: str,
+                  target_table: Optional[str] = None, where: str = '', params: Iterable = (),
+                  replace: bool = False, exclude: Iterable[str] = (),
+                  expressions: Optional[Dict[str, str]] = None) -> int:
+        """INSERT ... SELECT the shared columns of a table from one schema to another.
+
+        ``expressions`` maps target columns to SQL over the source row, for
+        columns that are renumbered, filled in or missing from the source.
+        """
+        target_table = target_table or table
+        target_columns = set(self.columns(target, target_table)) - set(exclude)
+        selected = {c: _quote(c) for c in self.columns(source, table) if c in target_columns}
+        selected.update({c: sql for c, sql in (expressions or {}).items() if c in target_columns})
+        if not selected:
+            return 0
+        column_list = ', '.join(_quote(c) for c in selected)
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        cursor.execute(f'''
+            {verb} INTO {_quote(target)}.{_quote(target_table)} ({column_list})
+            SELECT {', '.join(selected.values())} FROM {_quote(source)}.{_quote(table)} {f"WHERE {where}" if where else ''}
+        ''', tuple(params))
+        return cursor.rowcount
+
+    def foreign_keys(self, schema: str, table: str) -> List[Tuple[str, str, str]]:
+        """``(column, referenced table, referenced column)`` for each declared foreign key"""
+        rows = self.conn.execute(f"PRAGMA {_quote(schema)}.foreign_key_list({_quote(table)})").fetchall()
+        return [(row[3], row[2], row[4]) for row in rows]
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        """Row counts per table per attached database"""
+        counts = {}
+        for schema in self.attached:
+            counts[schema] = {
+                table: self.conn.execute(
+                    f"SELECT COUNT(*) FROM {_quote(schema)}.{_quote(table)}").fetchone()[0]
+                for table in self.tables(schema)
+            }
+        return counts
+
+def _create_table_like(udb: UnifiedDatabase, cursor, source: str, table: str, target: str):
+    sql = udb.conn.execute(
+        f"SELECT sql FROM {_quote(source)}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    # CREATE TABLE [IF NOT EXISTS] name (...) -> CREATE TABLE IF NOT EXISTS target.name (...)
+    definition = sql[sql.index('('):]
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {_quote(target)}.{_quote(table)} {definition}")
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def _not_null_fill(declared_type: str) -> str:
+    """Placeholder for a NOT NULL column without a default, by type affinity"""
+    declared_type = declared_type.upper()
+    return '0' if any(t in declared_type for t in ('INT', 'REAL', 'FLOA', 'DOUB', 'NUM', 'BOOL')) else "''"
+
+def _id_offsets(udb: UnifiedDatabase, schema: str) -> Dict[str, int]:
+    """How far to shift the integer keys of ``schema``'s tables to clear the merged rows.
+
+    Tables whose ids don't collide with rows already consolidated keep them.
+    """
+    offsets = {}
+    for table in udb.tables(schema):
+        key = udb.rowid_key(schema, table)
+        if not key or key not in udb.columns('consolidated', table):
+            continue
+        collides = udb.conn.execute(f'''
+            SELECT 1 FROM {_quote(schema)}.{_quote(table)} s
+            JOIN consolidated.{_quote(table)} c ON c.{_quote(key)} = s.{_quote(key)} LIMIT 1
+        ''').fetchone()
+        if collides:
+            offsets[table] = udb.conn.execute(
+                f"SELECT MAX({_quote(key)}) FROM consolidated.{_quote(table)}").fetchone()[0]
+    return offsets
+
+def _merge_expressions(udb: UnifiedDatabase, schema: str, table: str,
+                       offsets: Dict[str, int]) -> Dict[str, str]:
+    """Column expressions that renumber keys and references and fill NOT NULL gaps"""
+    expressions = {}
+    key = udb.rowid_key(schema, table)
+    if offsets.get(table):
+        expressions[key] = f"{_quote(key)} + {offsets[table]}"
+    for column, referenced, referenced_column in udb.foreign_keys(schema, table):
+        if offsets.get(referenced) and referenced_column in (None, udb.rowid_key(schema, referenced)):
+            expressions[column] = f"{_quote(column)} + {offsets[referenced]}"
+    for column, table_column in ROW_REFERENCES.get(table, {}).items():
+        shifts = ' '.join(f"WHEN {_literal(name)} THEN {offset}" for name, offset in offsets.items())
+        if shifts:
+            expressions[column] = f"{_quote(column)} + CASE {_quote(table_column)} {shifts} ELSE 0 END"
+
+    source_columns = set(udb.columns(schema, table))
+    for _, column, declared_type, not_null, default, pk in udb.conn.execute(
+            f"PRAGMA consolidated.table_info({_quote(table)})").fetchall():
+        if not_null and default is None and not pk:
+            fill = _not_null_fill(declared_type)
+            if column in source_columns:
+                expressions[column] = f"COALESCE({expressions.get(column, _quote(column))}, {fill})"
+            else:
+                expressions[column] = fill
+                logger.warning(f"{schema}.{table} has no {column}; filling the NOT NULL column with {fill}")
+    return expressions
+
+def consolidate_databases(target_path: str, data_dir: str = '.',
+                          files: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, int]]:
+    """Merge every table of the five databases into ``target_path``.
+
+    Tables with the same name are merged: the first file in DATABASE_FILES
+    that has a table defines it and columns only other files have are added.
+    NOT NULL columns a later file lacks (or leaves NULL) are filled with 0 or
+    an empty string. Integer keys that collide with rows already merged are
+    shifted past them, together with the declared foreign keys (and
+    ``ROW_REFERENCES``) pointing at them from the same file. Rows that still
+    conflict, such as a text key an earlier file already has, are skipped so
+    earlier files win, and counted as dropped.
+
+    The whole merge is one transaction; indexes and the search index are
+    rebuilt afterwards. Returns ``{'copied': n, 'dropped': n}`` per table.
+    """
+    from migrate_database import apply_index_migrations
+    from search_index import ensure_search_index
+
+    udb = UnifiedDatabase(data_dir, files)
+    sources = {(udb.data_dir / filename).resolve() for filename in udb.files.values()}
+    if Path(target_path).resolve() in sources:
+        udb.close()
+        raise ValueError(f"Consolidation target {target_path} must be a new file, not one of the sources")
+    udb.conn.execute("ATTACH DATABASE ? AS consolidated", (target_path,))
+    results: Dict[str, Dict[str, int]] = {}
+    try:
+        with udb.transaction() as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS consolidated.schema_migrations (
+                    name TEXT PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            for schema in udb.attached:
+                # Decided before any of this file's tables are copied, so
+                # references are shifted by the same amount as their keys
+                offsets = _id_offsets(udb, schema)
+                for table in udb.tables(schema):
+                    if table == 'schema_migrations':
+                        continue
+                    if not udb.columns('consolidated', table):
+                        _create_table_like(udb, cursor, schema, table, 'consolidated')
+                    existing = set(udb.columns('consolidated', table))
+                    for column in udb.columns(schema, table):
+                        if column not in existing:
+                            cursor.execute(f"ALTER TABLE consolidated.{_quote(table)} ADD COLUMN {_quote(column)}")
+                    if offsets.get(table):
+                        logger.info(f"{schema}.{table}: ids collide with merged rows, shifting them by {offsets[table]}")
+
+                    total = cursor.execute(f"SELECT COUNT(*) FROM {_quote(schema)}.{_quote(table)}").fetchone()[0]
+                    rows = udb.copy_rows(cursor, schema, table, 'consolidated',
+                                         expressions=_merge_expressions(udb, schema, table, offsets))
+                    counts = results.setdefault(table, {'copied': 0, 'dropped': 0})
+                    counts['copied'] += rows
+                    counts['dropped'] += total - rows
+                    if total - rows:
+                        logger.warning(f"{schema}.{table}: {total - rows} of {total} rows conflict with "
+                                       f"earlier files and were not copied")
+                    else:
+                        logger.info(f"{schema}.{table}: {rows} rows")
+            cursor.execute("INSERT OR IGNORE INTO consolidated.schema_migrations (name) VALUES (?)",
+                           (CONSOLIDATION_MIGRATION,))
+    finally:
+        udb.close()
+
+    conn = sqlite3.connect(target_path)
+    apply_index_migrations(conn)
+    ensure_search_index(conn)
+    conn.commit()
+    conn.close()
+
+    copied = sum(counts['copied'] for counts in results.values())
+    dropped = sum(counts['dropped'] for counts in results.values())
+    logger.info(f"Consolidated {copied} rows from {len(udb.attached)} databases into {target_path}"
+                f" ({dropped} conflicting rows dropped)")
+    return results
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Junior News Digest unified data layer')
+    parser.add_argument('--data-dir', default='.', help='Directory holding the database files')
+    parser.add_argument('--status', action='store_true', help='Show tables and row counts')
+    parser.add_argument('--consolidate', metavar='TARGET', help='Merge all databases into TARGET')
+    args = parser.parse_args()
+
+    if args.consolidate:
+        for table, counts in sorted(consolidate_databases(args.consolidate, args.data_dir).items()):
+            dropped = f" ({counts['dropped']} dropped)" if counts['dropped'] else ''
+            print(f"   {table}: {counts['copied']}{dropped}")
+    else:
+        with UnifiedDatabase(args.data_dir) as udb:
+            for schema, tables in udb.status().items():
+                print(f"{schema} ({udb.files[schema]}):")
+                for table, count in tables.items():
+                    print(f"   {table}: {count}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Editorial Dashboard Data
+=============================================
+
+Read model for the editorial portals. Status counts come from one
+``GROUP BY status`` query and candidate cards are fetched a page at a time
+with truncated content, so rendering the portal costs the same whether the
+candidate table holds fifty rows or fifty thousand.
+"""
+
+import sqlite3
+from typing import Dict, Optional
+
+from readability import reading_level_label
+
+# Characters of story content shown on a card before "…"
+CARD_PREVIEW_CHARS = 400
+CARDS_PER_PAGE = 20
+
+CARD_SORTS = {
+    'priority': 'priority_score DESC, generated_date DESC',
+    'reading_level': 'reading_grade IS NULL, reading_grade ASC, priority_score DESC',
+}
+
+def status_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Number of candidate stories in each status, plus the overall total"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, COUNT(*) FROM candidate_stories GROUP BY status")
+    counts = {status: count for status, count in cursor.fetchall()}
+    counts['total'] = sum(counts.values())
+    return counts
+
+def candidate_cards(conn: sqlite3.Connection, status: str = 'pending_review',
+                    sort_by: str = 'priority', max_grade: Optional[float] = None,
+                    page: int = 1, per_page: int = CARDS_PER_PAGE,
+                    total: Optional[int] = None) -> Dict:
+    """One page of candidate cards with content cut to CARD_PREVIEW_CHARS.
+
+    Pass ``total`` (e.g. from status_counts) to skip the count query when no
+    grade filter is applied.
+    """
+    page = max(1, page)
+    per_page = max(1, min(per_page, 100))
+    order_by = CARD_SORTS.get(sort_by, CARD_SORTS['priority'])
+
+    where = "status = ?"
+    params = [status]
+    if max_grade is not None:
+        where += " AND reading_grade <= ?"
+        params.append(max_grade)
+
+    cursor = conn.cursor()
+    if total is None or max_grade is not None:
+        cursor.execute(f"SELECT COUNT(*) FROM candidate_stories WHERE {where}", params)
+        total = cursor.fetchone()[0]
+
+    cursor.execute(f'''
+        SELECT id, COALESCE(final_title, title), substr(COALESCE(final_content, content), 1, ?),
+               length(COALESCE(final_content, content)) > ?, COALESCE(final_summary, summary),
+               category, author, priority_score, is_breaking, is_trending, is_hot,
+               editor_notes, reading_grade, word_count
+        FROM candidate_stories
+        WHERE {where}
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    ''', (CARD_PREVIEW_CHARS, CARD_PREVIEW_CHARS, *params, per_page, (page - 1) * per_page))
+
+    cards = []
+    for row in cursor.fetchall():
+        cards.append({
+            'id': row[0], 'title': row[1],
+            'content': row[2] + ('…' if row[3] else ''), 'summary': row[4],
+            'category': row[5], 'author': row[6], 'priority_score': row[7],
+            'is_breaking': row[8], 'is_trending': row[9], 'is_hot': row[10],
+            'editor_notes': row[11] or '', 'reading_grade': row[12], 'word_count': row[13],
+            'reading_level': reading_level_label(row[12])
+        })
+
+    return {
+        'cards': cards,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page
+    }
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Batch Editorial Review
+===========================================
+
+Applies many approve/reject decisions to candidate_stories in one
+transaction. Used by the editorial portal's JSON review endpoint, so an
+editor's whole review session costs one round trip and one commit instead of
+a form POST, two connections and a full page re-render per story.
+
+Run this file directly to time reviewing 100 candidates both ways:
+    python editorial_review.py --count 100
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from readability import analyze_batch
+
+logger = logging.getLogger(__name__)
+
+REVIEW_ACTIONS = ('approve', 'reject')
+
+def apply_review_decisions(conn: sqlite3.Connection, decisions: List[Dict]) -> Dict:
+    """Apply a batch of review decisions atomically.
+
+    Each decision is ``{'candidate_id', 'action', 'editor_notes'?, 'final_title'?,
+    'final_content'?, 'final_summary'?}``. Invalid decisions and unknown
+    candidates are reported in ``errors`` and skipped; the rest commit together.
+    Returns the applied counts plus fresh pending/approved totals for the portal.
+    """
+    errors = []
+    valid = {}
+    for decision in decisions:
+        candidate_id = decision.get('candidate_id')
+        action = decision.get('action')
+        if not candidate_id:
+            errors.append({'candidate_id': None, 'error': 'Missing candidate_id'})
+        elif action not in REVIEW_ACTIONS:
+            errors.append({'candidate_id': candidate_id, 'error': f'Invalid action: {action}'})
+        else:
+            # Last decision for a candidate wins, as if submitted one by one
+            valid[candidate_id] = decision
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+
+        if valid:
+            placeholders = ', '.join('?' * len(valid))
+            cursor.execute(f"SELECT id FROM candidate_stories WHERE id IN ({placeholders})",
+                           tuple(valid))
+            existing = {row[0] for row in cursor.fetchall()}
+            for candidate_id in list(valid):
+                if candidate_id not in existing:
+                    errors.append({'candidate_id': candidate_id, 'error': 'Candidate not found'})
+                    del valid[candidate_id]
+
+        approvals = [d for d in valid.values() if d['action'] == 'approve']
+        rejections = [d for d in valid.values() if d['action'] == 'reject']
+
+        approved_date = datetime.now().isoformat()
+        cursor.executemany('''
+            UPDATE candidate_stories
+            SET status = 'approved',
+                approved_date = ?,
+                final_title = COALESCE(?, title),
+                final_content = COALESCE(?, content),
+                final_summary = COALESCE(?, summary),
+                editor_notes = ?
+            WHERE id = ?
+        ''', [(approved_date, d.get('final_title'), d.get('final_content'),
+               d.get('final_summary'), d.get('editor_notes', ''), d['candidate_id'])
+              for d in approvals])
+
+        # Edited copy gets re-scored so the stored reading level stays accurate
+        edited = [d for d in approvals if d.get('final_content')]
+        if edited:
+            scores = analyze_batch(d['final_content'] for d in edited)
+            cursor.executemany('''
+                UPDATE candidate_stories SET reading_grade = ?, word_count = ? WHERE id = ?
+            ''', [(score.reading_grade, score.word_count, d['candidate_id'])
+                  for d, score in zip(edited, scores)])
+
+        cursor.executemany('''
+            UPDATE candidate_stories SET status = 'rejected', editor_notes = ?
+            WHERE id = ?
+        ''', [(d.get('editor_notes', ''), d['candidate_id']) for d in rejections])
+
+        cursor.execute('''
+            SELECT SUM(status = 'pending_review'), SUM(status = 'approved')
+            FROM candidate_stories
+        ''')
+        pending_count, approved_count = cursor.fetchone()
+
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    logger.info(f"Reviewed {len(valid)} stories: {len(approvals)} approved, {len(rejections)} rejected")
+
+    return {
+        'approved': [d['candidate_id'] for d in approvals],
+        'rejected': [d['candidate_id'] for d in rejections],
+        'errors': errors,
+        'pending_count': pending_count or 0,
+        'approved_count': approved_count or 0
+    }
+
+def _seed_candidates(db_path: str, count: int):
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE candidate_stories (
+            id TEXT PRIMARY KEY, title TEXT NOT NULL, content TEXT NOT NULL, summary TEXT,
+            category TEXT NOT NULL, author TEXT NOT NULL, generated_date TEXT NOT NULL,
+            status TEXT DEFAULT 'pending_review', editor_notes TEXT DEFAULT '',
+            priority_score INTEGER DEFAULT 5, is_breaking BOOLEAN DEFAULT FALSE,
+            is_trending BOOLEAN DEFAULT FALSE, is_hot BOOLEAN DEFAULT FALSE,
+            approved_date TEXT, final_title TEXT, final_content TEXT, final_summary TEXT,
+            reading_grade REAL, word_count INTEGER
+        );
+        CREATE INDEX idx_candidate_stories_status ON candidate_stories (status, priority_score, generated_date);
+    ''')
+    conn.executemany('''
+        INSERT INTO candidate_stories (id, title, content, summary, category, author, generated_date)
+        VALUES (?, ?, ?, ?, 'science', 'Junior News Team', ?)
+    ''', [(f"candidate_{i}", f"Story number {i}", "Kids discover something amazing. " * 40,
+           "A short summary.", datetime.now().isoformat()) for i in range(count)])
+    conn.commit()
+    conn.close()
+
+def _review_one_by_one(db_path: str, decisions: List[Dict]):
+    """The form-POST path: one update per connection, then the portal's two list queries"""
+    for decision in decisions:
+        conn = sqlite3.connect(db_path)
+        if decision['action'] == 'approve':
+            conn.execute('''
+                UPDATE candidate_stories
+                SET status = 'approved', approved_date = ?, final_title = COALESCE(?, title),
+                    final_content = COALESCE(?, content), final_summary = COALESCE(?, summary),
+                    editor_notes = ?
+                WHERE id = ?
+            ''', (datetime.now().isoformat(), None, None, None, '', decision['candidate_id']))
+        else:
+            conn.execute("UPDATE candidate_stories SET status = 'rejected', editor_notes = ? WHERE id = ?",
+                         ('', decision['candidate_id']))
+        conn.commit()
+        conn.close()
+
+        # Redirect back to the portal, which re-reads both lists
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            SELECT * FROM candidate_stories WHERE status = 'pending_review'
+            ORDER BY priority_score DESC, generated_date DESC
+        ''').fetchall()
+        conn.close()
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            SELECT * FROM candidate_stories WHERE status = 'approved' ORDER BY approved_date
+        ''').fetchall()
+        conn.close()
+
+def run_benchmark(count: int) -> List[Dict]:
+    """Time reviewing ``count`` candidates one at a time and as one batch"""
+    decisions = [{'candidate_id': f"candidate_{i}", 'action': 'approve' if i % 3 else 'reject'}
+                 for i in range(count)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('per_story', 'batch'):
+            db_path = os.path.join(tmp, f"{name}.db")
+            _seed_candidates(db_path, count)
+
+            start = time.perf_counter()
+            if name == 'per_story':
+                _review_one_by_one(db_path, decisions)
+            else:
+                conn = sqlite3.connect(db_path)
+                apply_review_decisions(conn, decisions)
+                conn.close()
+            results.append({'method': name, 'reviewed': count,
+                            'seconds': time.perf_counter() - start})
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batch editorial review')
+    parser.add_argument('--count', type=int, default=100, help='Candidates to review')
+    args = parser.parse_args()
+
+    for result in run_benchmark(args.count):
+        print(f"{result['method']:>10}: {result['reviewed']} reviews in {result['seconds'] * 1000:.1f}ms")
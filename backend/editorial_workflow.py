@@ -21,7 +21,7 @@ import json
 import sys
 import os
 import sqlite3
-from datetime import datetime, timedelta, date
+from datetime import datetime
 import requests
 import random
 from typing import List, Dict, Any
@@ -31,6 +31,13 @@ from flask import Flask, render_template_string, request, redirect, url_for, fla
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from add_content import ContentManager
+from readability import (analyze_text, reading_level_label,
+                         ensure_readability_columns, backfill_reading_levels)
+from migrate_database import apply_index_migrations
+from pregeneration import ensure_pregeneration_queue
+from editorial_dashboard import status_counts, candidate_cards
+from schedule_balancer import schedule_week, week_start
+from candidate_batch import upsert_candidates
 
 class NewsStoryGenerator:
     """Generate candidate news stories for editorial review"""
@@ -41,8 +48,13 @@ class NewsStoryGenerator:
             'education', 'sports', 'culture', 'general'
         ]
         
-    def generate_candidate_stories(self, count=20) -> List[Dict[str, Any]]:
-        """Generate candidate stories for editorial review"""
+    def generate_candidate_stories(self, count=20, seed: int = None) -> List[Dict[str, Any]]:
+        """Generate candidate stories for editorial review.
+        
+        With a ``seed`` the same count produces the same stories and ids on a
+        given day, so batches can be regenerated for load tests.
+        """
+        self._rng = random.Random(seed)
         
         # Sample story templates for different categories
         story_templates = {
@@ -82,10 +94,10 @@ class NewsStoryGenerator:
         candidates = []
         
         for i in range(count):
-            category = random.choice(self.categories)
+            category = self._rng.choice(self.categories)
             
             if category in story_templates:
-                template = random.choice(story_templates[category])
+                template = self._rng.choice(story_templates[category])
                 story = self._generate_from_template(template, category)
             else:
                 story = self._generate_generic_story(category, i)
@@ -94,7 +106,7 @@ class NewsStoryGenerator:
             story['generated_date'] = datetime.now().isoformat()
             story['status'] = 'pending_review'
             story['editor_notes'] = ''
-            story['priority_score'] = random.randint(1, 10)
+            story['priority_score'] = self._rng.randint(1, 10)
             
             candidates.append(story)
         
@@ -114,9 +126,9 @@ class NewsStoryGenerator:
             if key.endswith('s') and key != 'title' and key != 'content_template':
                 placeholder = f"{{{key[:-1]}}}"  # Remove 's' and wrap in braces
                 if placeholder in title:
-                    title = title.replace(placeholder, random.choice(values))
+                    title = title.replace(placeholder, self._rng.choice(values))
                 if placeholder in content:
-                    content = content.replace(placeholder, random.choice(values))
+                    content = content.replace(placeholder, self._rng.choice(values))
         
         # Add some random details
         durations = ['3 months', '6 months', '8 months', '1 year']
@@ -127,8 +139,8 @@ class NewsStoryGenerator:
             'It can process 100 items per hour'
         ]
         
-        content = content.replace('{duration}', random.choice(durations))
-        content = content.replace('{impact_stat}', random.choice(impact_stats))
+        content = content.replace('{duration}', self._rng.choice(durations))
+        content = content.replace('{impact_stat}', self._rng.choice(impact_stats))
         
         return {
             'title': title,
@@ -136,9 +148,9 @@ class NewsStoryGenerator:
             'category': category,
             'author': 'Junior News Team',
             'summary': content[:150] + '...' if len(content) > 150 else content,
-            'is_breaking': random.choice([True, False]) if random.random() < 0.2 else False,
-            'is_trending': random.choice([True, False]) if random.random() < 0.3 else False,
-            'is_hot': random.choice([True, False]) if random.random() < 0.25 else False
+            'is_breaking': self._rng.choice([True, False]) if self._rng.random() < 0.2 else False,
+            'is_trending': self._rng.choice([True, False]) if self._rng.random() < 0.3 else False,
+            'is_hot': self._rng.choice([True, False]) if self._rng.random() < 0.25 else False
         }
     
     def _generate_generic_story(self, category: str, index: int) -> Dict[str, Any]:
@@ -167,7 +179,7 @@ class NewsStoryGenerator:
         }
         
         category_titles = titles.get(category, [f'Amazing {category.title()} Discovery #{index+1}'])
-        title = random.choice(category_titles)
+        title = self._rng.choice(category_titles)
         
         content = f"This is an exciting story about {category} that will inspire young minds. " \
                  f"Children and young people are making incredible discoveries and contributions in {category}. " \
@@ -182,7 +194,7 @@ class NewsStoryGenerator:
             'author': 'Junior News Team',
             'summary': content[:150] + '...' if len(content) > 150 else content,
             'is_breaking': False,
-            'is_trending': random.choice([True, False]) if random.random() < 0.3 else False,
+            'is_trending': self._rng.choice([True, False]) if self._rng.random() < 0.3 else False,
             'is_hot': False
         }
 
@@ -219,9 +231,13 @@ class EditorialWorkflow:
                 approved_date TEXT,
                 final_title TEXT,
                 final_content TEXT,
-                final_summary TEXT
+                final_summary TEXT,
+                reading_grade REAL,
+                word_count INTEGER
             )
         ''')
+        ensure_readability_columns(conn)
+        backfill_reading_levels(conn)
         
         # Weekly schedule table
         cursor.execute('''
@@ -240,61 +256,58 @@ class EditorialWorkflow:
             )
         ''')
         
+        # Secondary indexes for the hot status/category/date filters
+        apply_index_migrations(conn)
+        
+        # Media builds are queued as soon as a story is scheduled
+        ensure_pregeneration_queue(conn)
+        
         conn.commit()
         conn.close()
     
-    def generate_weekly_candidates(self, count=20):
+    def generate_weekly_candidates(self, count=20, seed: int = None):
         """Generate candidate stories for the week"""
         print(f"🎯 Generating {count} candidate stories for editorial review...")
         
-        candidates = self.story_generator.generate_candidate_stories(count)
+        candidates = self.story_generator.generate_candidate_stories(count, seed=seed)
         
-        # Save candidates to database
+        # Upsert in one transaction; editor notes and reviewed stories are kept
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear previous week's pending candidates
-        cursor.execute("DELETE FROM candidate_stories WHERE status = 'pending_review'")
-        
-        saved_count = 0
-        for candidate in candidates:
-            try:
-                cursor.execute('''
-                    INSERT INTO candidate_stories 
-                    (id, title, content, summary, category, author, generated_date, 
-                     status, priority_score, is_breaking, is_trending, is_hot)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    candidate['candidate_id'], candidate['title'], candidate['content'],
-                    candidate['summary'], candidate['category'], candidate['author'],
-                    candidate['generated_date'], candidate['status'], candidate['priority_score'],
-                    candidate['is_breaking'], candidate['is_trending'], candidate['is_hot']
-                ))
-                saved_count += 1
-            except Exception as e:
-                print(f"❌ Error saving candidate {candidate['candidate_id']}: {e}")
-        
-        conn.commit()
-        conn.close()
+        try:
+            result = upsert_candidates(conn, candidates)
+        finally:
+            conn.close()
         
-        print(f"✅ Generated and saved {saved_count} candidate stories!")
+        print(f"✅ Generated {len(candidates)} candidate stories "
+              f"({result['inserted']} new, {result['refreshed']} refreshed, {result['removed']} stale removed)")
         print(f"📅 Stories are ready for editorial review")
         print(f"🔗 Run 'python editorial_workflow.py review-portal' to start the review process")
         
         return candidates
     
-    def get_pending_candidates(self):
-        """Get all pending candidate stories"""
+    def get_pending_candidates(self, sort_by: str = 'priority', max_grade: float = None):
+        """Get all pending candidate stories, optionally sorted/filtered by reading level"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
+        order_by = {
+            'priority': 'priority_score DESC, generated_date DESC',
+            'reading_level': 'reading_grade IS NULL, reading_grade ASC, priority_score DESC',
+        }.get(sort_by, 'priority_score DESC, generated_date DESC')
+        
+        query = '''
             SELECT id, title, content, summary, category, author, priority_score,
-                   is_breaking, is_trending, is_hot, editor_notes
+                   is_breaking, is_trending, is_hot, editor_notes, reading_grade, word_count
             FROM candidate_stories 
             WHERE status = 'pending_review'
-            ORDER BY priority_score DESC, generated_date DESC
-        ''')
+        '''
+        params = []
+        if max_grade is not None:
+            query += " AND reading_grade <= ?"
+            params.append(max_grade)
+        query += f" ORDER BY {order_by}"
+        
+        cursor.execute(query, tuple(params))
         
         candidates = []
         for row in cursor.fetchall():
@@ -309,12 +322,26 @@ class EditorialWorkflow:
                 'is_breaking': row[7],
                 'is_trending': row[8],
                 'is_hot': row[9],
-                'editor_notes': row[10] or ''
+                'editor_notes': row[10] or '',
+                'reading_grade': row[11],
+                'word_count': row[12],
+                'reading_level': reading_level_label(row[11])
             })
         
         conn.close()
         return candidates
     
+    def get_dashboard(self, sort_by: str = 'priority', max_grade: float = None, page: int = 1):
+        """Status counts and one page of pending candidate cards for the portal"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            counts = status_counts(conn)
+            cards = candidate_cards(conn, sort_by=sort_by, max_grade=max_grade, page=page,
+                                    total=counts.get('pending_review', 0))
+        finally:
+            conn.close()
+        return {'counts': counts, 'cards': cards}
+    
     def approve_story(self, candidate_id: str, final_title: str = None, 
                      final_content: str = None, final_summary: str = None, 
                      editor_notes: str = ''):
@@ -336,6 +363,13 @@ class EditorialWorkflow:
             final_summary, editor_notes, candidate_id
         ))
         
+        # Edited copy gets re-scored so the stored reading level stays accurate
+        if final_content:
+            score = analyze_text(final_content)
+            cursor.execute('''
+                UPDATE candidate_stories SET reading_grade = ?, word_count = ? WHERE id = ?
+            ''', (score.reading_grade, score.word_count, candidate_id))
+        
         conn.commit()
         conn.close()
         
@@ -451,68 +485,29 @@ class EditorialWorkflow:
         conn.commit()
         conn.close()
     
-    def schedule_weekly_content(self):
-        """Schedule processed content for Monday, Wednesday, Friday"""
-        # Get this week's Monday
-        today = date.today()
-        days_since_monday = today.weekday()
-        monday = today - timedelta(days=days_since_monday)
+    def schedule_weekly_content(self, dry_run: bool = False) -> Dict:
+        """Schedule processed content for Monday, Wednesday, Friday.
         
-        # Get processed stories that haven't been scheduled yet
+        Stories are balanced across days by category, priority and estimated
+        build time (see schedule_balancer); ``dry_run`` only returns the plan.
+        """
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT cs.id, cs.title
-            FROM candidate_stories cs
-            LEFT JOIN weekly_schedule ws ON cs.id = ws.candidate_id 
-                AND ws.week_start_date = ?
-            WHERE cs.status = 'processed' AND ws.candidate_id IS NULL
-            ORDER BY cs.approved_date
-        ''', (monday.isoformat(),))
-        
-        unscheduled_stories = cursor.fetchall()
-        
-        if not unscheduled_stories:
-            print("📅 No unscheduled stories found")
+        try:
+            plan = schedule_week(conn, week_start(), dry_run=dry_run)
+        finally:
             conn.close()
-            return
         
-        # Schedule stories for Monday, Wednesday, Friday
-        schedule_days = [
-            (monday, 'Monday'),
-            (monday + timedelta(days=2), 'Wednesday'), 
-            (monday + timedelta(days=4), 'Friday')
-        ]
-        
-        scheduled_count = 0
-        story_index = 0
-        
-        for schedule_date, day_name in schedule_days:
-            stories_per_day = len(unscheduled_stories) // 3
-            if day_name == 'Friday':  # Give Friday any remaining stories
-                stories_per_day = len(unscheduled_stories) - story_index
-            
-            for i in range(min(stories_per_day, len(unscheduled_stories) - story_index)):
-                if story_index >= len(unscheduled_stories):
-                    break
-                
-                candidate_id, title = unscheduled_stories[story_index]
-                
-                cursor.execute('''
-                    INSERT INTO weekly_schedule 
-                    (week_start_date, candidate_id, scheduled_date, day_of_week, status)
-                    VALUES (?, ?, ?, ?, 'scheduled')
-                ''', (monday.isoformat(), candidate_id, schedule_date.isoformat(), day_name))
-                
-                print(f"📅 Scheduled for {day_name} ({schedule_date}): {title}")
-                scheduled_count += 1
-                story_index += 1
+        if not plan['assignments']:
+            print("📅 No unscheduled stories found")
+            return plan
         
-        conn.commit()
-        conn.close()
+        for assignment in plan['assignments']:
+            print(f"📅 {'Would schedule' if dry_run else 'Scheduled'} for {assignment['day_of_week']} "
+                  f"({assignment['scheduled_date']}): {assignment['title']}")
         
-        print(f"✅ Scheduled {scheduled_count} stories for the week of {monday}")
+        if not dry_run:
+            print(f"✅ Scheduled {len(plan['assignments'])} stories for the week of {plan['week_start_date']}")
+        return plan
 
 # Flask Web Interface for Editorial Review
 app = Flask(__name__)
@@ -541,6 +536,9 @@ REVIEW_PORTAL_TEMPLATE = '''
         .badge.breaking { background: #FFEBEE; color: #D32F2F; }
         .badge.trending { background: #F3E5F5; color: #7B1FA2; }
         .badge.hot { background: #FFF8E1; color: #F9A825; }
+        .badge.reading { background: #E8F5E9; color: #388E3C; }
+        .filters { display: flex; gap: 10px; margin-bottom: 20px; justify-content: center; align-items: center; }
+        .filters select, .filters input { padding: 8px; border: 1px solid #ddd; border-radius: 5px; }
         .candidate-content { margin-bottom: 15px; max-height: 150px; overflow-y: auto; }
         .candidate-summary { color: #666; font-style: italic; margin-bottom: 15px; }
         .editor-notes { width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 5px; margin-bottom: 15px; }
@@ -553,6 +551,7 @@ REVIEW_PORTAL_TEMPLATE = '''
         .flash-messages { margin-bottom: 20px; }
         .flash-success { background: #d4edda; color: #155724; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
         .flash-error { background: #f8d7da; color: #721c24; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
+        .pagination { display: flex; gap: 15px; margin-top: 20px; justify-content: center; align-items: center; }
         .process-section { background: white; padding: 20px; border-radius: 10px; margin-bottom: 20px; text-align: center; }
     </style>
 </head>
@@ -588,6 +587,19 @@ REVIEW_PORTAL_TEMPLATE = '''
         </div>
     </div>
     
+    <form class="filters" action="/" method="get">
+        <label>Sort by
+            <select name="sort">
+                <option value="priority" {% if sort_by == 'priority' %}selected{% endif %}>Priority</option>
+                <option value="reading_level" {% if sort_by == 'reading_level' %}selected{% endif %}>Reading level (easiest first)</option>
+            </select>
+        </label>
+        <label>Max grade
+            <input type="number" name="max_grade" step="0.5" min="0" value="{{ max_grade if max_grade is not none else '' }}">
+        </label>
+        <button type="submit" class="btn">Apply</button>
+    </form>
+    
     {% if approved_count > 0 %}
     <div class="process-section">
         <h3>🎉 {{ approved_count }} Stories Approved!</h3>
@@ -611,6 +623,7 @@ REVIEW_PORTAL_TEMPLATE = '''
                 {% if candidate.is_breaking %}<span class="badge breaking">🔴 Breaking</span>{% endif %}
                 {% if candidate.is_trending %}<span class="badge trending">🔥 Trending</span>{% endif %}
                 {% if candidate.is_hot %}<span class="badge hot">⚡ Hot</span>{% endif %}
+                {% if candidate.reading_grade is not none %}<span class="badge reading">📖 Grade {{ candidate.reading_grade }} · {{ candidate.reading_level }}</span>{% endif %}
             </div>
             
             <div class="candidate-summary">{{ candidate.summary }}</div>
@@ -629,6 +642,15 @@ REVIEW_PORTAL_TEMPLATE = '''
         </div>
         {% endfor %}
     </div>
+    
+    {% if cards.pages > 1 %}
+    <div class="pagination">
+        {% set filters = '&sort=' ~ sort_by ~ ('&max_grade=' ~ max_grade if max_grade is not none else '') %}
+        {% if cards.page > 1 %}<a class="btn" href="/?page={{ cards.page - 1 }}{{ filters }}">← Previous</a>{% endif %}
+        <span>Page {{ cards.page }} of {{ cards.pages }}</span>
+        {% if cards.page < cards.pages %}<a class="btn" href="/?page={{ cards.page + 1 }}{{ filters }}">Next →</a>{% endif %}
+    </div>
+    {% endif %}
 </body>
 </html>
 '''
@@ -636,18 +658,20 @@ REVIEW_PORTAL_TEMPLATE = '''
 @app.route('/')
 def review_portal():
     """Main editorial review portal"""
-    candidates = workflow.get_pending_candidates()
-    
-    # Get counts
-    total_candidates = len(candidates)
-    approved_count = len(workflow.get_approved_stories())
-    pending_count = total_candidates
+    sort_by = request.args.get('sort', 'priority')
+    max_grade = request.args.get('max_grade', type=float)
+    dashboard = workflow.get_dashboard(sort_by=sort_by, max_grade=max_grade,
+                                       page=request.args.get('page', 1, type=int))
+    counts = dashboard['counts']
     
     return render_template_string(REVIEW_PORTAL_TEMPLATE, 
-                                candidates=candidates,
-                                total_candidates=total_candidates,
-                                approved_count=approved_count,
-                                pending_count=pending_count,
+                                candidates=dashboard['cards']['cards'],
+                                cards=dashboard['cards'],
+                                total_candidates=counts['total'],
+                                approved_count=counts.get('approved', 0),
+                                pending_count=counts.get('pending_review', 0),
+                                sort_by=sort_by,
+                                max_grade=max_grade,
                                 today_date=datetime.now().strftime('%A, %B %d, %Y'))
 
 @app.route('/review-story', methods=['POST'])
@@ -672,6 +696,11 @@ def review_story():
     
     return redirect(url_for('review_portal'))
 
+@app.route('/api/schedule-preview')
+def schedule_preview():
+    """Dry run of this week's balanced schedule (JSON); nothing is written"""
+    return jsonify(workflow.schedule_weekly_content(dry_run=True))
+
 @app.route('/process-approved', methods=['POST'])
 def process_approved():
     """Process all approved stories"""
@@ -686,6 +715,7 @@ def main():
     # Generate candidates command
     generate_cmd = subparsers.add_parser('generate-candidates', help='Generate candidate stories for review')
     generate_cmd.add_argument('--count', type=int, default=20, help='Number of candidates to generate')
+    generate_cmd.add_argument('--seed', type=int, help='Seed for a repeatable batch (e.g. load tests)')
     
     # Review portal command
     subparsers.add_parser('review-portal', help='Start the editorial review web portal')
@@ -694,7 +724,8 @@ def main():
     subparsers.add_parser('process-approved', help='Process approved stories')
     
     # Schedule week command
-    subparsers.add_parser('schedule-week', help='Schedule content for the week')
+    schedule_cmd = subparsers.add_parser('schedule-week', help='Schedule content for the week')
+    schedule_cmd.add_argument('--dry-run', action='store_true', help='Preview the plan without writing it')
     
     # Status command
     subparsers.add_parser('status', help='Show current workflow status')
@@ -708,7 +739,7 @@ def main():
     workflow_manager = EditorialWorkflow()
     
     if args.command == 'generate-candidates':
-        workflow_manager.generate_weekly_candidates(args.count)
+        workflow_manager.generate_weekly_candidates(args.count, seed=args.seed)
     
     elif args.command == 'review-portal':
         print("🚀 Starting Editorial Review Portal...")
@@ -720,17 +751,16 @@ def main():
         workflow_manager.process_approved_stories()
     
     elif args.command == 'schedule-week':
-        workflow_manager.schedule_weekly_content()
+        workflow_manager.schedule_weekly_content(dry_run=args.dry_run)
     
     elif args.command == 'status':
         # Show current status
-        pending = workflow_manager.get_pending_candidates()
-        approved = workflow_manager.get_approved_stories()
+        counts = workflow_manager.get_dashboard()['counts']
         
         print(f"📊 Editorial Workflow Status")
-        print(f"   Pending Review: {len(pending)}")
-        print(f"   Approved: {len(approved)}")
-        print(f"   Ready for Processing: {len(approved)}")
+        print(f"   Pending Review: {counts.get('pending_review', 0)}")
+        print(f"   Approved: {counts.get('approved', 0)}")
+        print(f"   Ready for Processing: {counts.get('approved', 0)}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Expo Push Fan-out
+======================================
+
+Sends a notification to every registered device through the Expo push
+service and prunes tokens that no longer work.
+
+Expo accepts at most ``SEND_BATCH_SIZE`` messages per request, so tokens
+are sent in batches of 100, several batches at a time over one pooled HTTP
+session, under a shared rate limit. Each message comes back with a ticket:
+error tickets for unregistered devices are pruned straight away, and ok
+tickets are stored in ``push_tickets``.
+
+Delivery is only known from receipts, which Expo publishes some minutes
+after sending and keeps for about a day. ``process_receipts`` fetches
+receipts for stored tickets in batches of ``RECEIPT_BATCH_SIZE``, deletes
+every ``DeviceNotRegistered`` token from ``push_tokens`` in one statement
+and drops the checked tickets.
+
+Run this file directly to check receipts from earlier sends:
+    python expo_push.py --db kids_news_content/content_tracking.db
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+EXPO_SEND_URL = os.getenv('EXPO_PUSH_URL', 'https://exp.host/--/api/v2/push/send')
+EXPO_RECEIPTS_URL = os.getenv('EXPO_RECEIPTS_URL', 'https://exp.host/--/api/v2/push/getReceipts')
+
+SEND_BATCH_SIZE = 100
+RECEIPT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 6
+# Expo's documented per-project limit is 600 notifications a second
+DEFAULT_RATE_PER_SECOND = 600
+MAX_RETRIES = 3
+REQUEST_TIMEOUT_SECONDS = 30
+# Expo asks senders to wait before fetching receipts
+RECEIPT_DELAY = timedelta(minutes=15)
+# ... and keeps them for about a day
+RECEIPT_EXPIRY = timedelta(hours=24)
+
+TOKEN_PREFIXES = ('ExponentPushToken[', 'ExpoPushToken[')
+
+def ensure_push_tables(conn: sqlite3.Connection):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS push_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT UNIQUE,
+            platform TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS push_tickets (
+            ticket_id TEXT PRIMARY KEY,
+            token TEXT NOT NULL,
+            sent_at TEXT NOT NULL
+        );
+    ''')
+
+def is_expo_token(token: str) -> bool:
+    return bool(token) and token.startswith(TOKEN_PREFIXES) and token.endswith(']')
+
+def prune_tokens(conn: sqlite3.Connection, tokens: List[str]) -> int:
+    """Delete ``tokens`` from push_tokens in one statement; returns rows deleted"""
+    if not tokens:
+        return 0
+    cursor = conn.execute('''
+        DELETE FROM push_tokens WHERE token IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(sorted(set(tokens))),))
+    conn.commit()
+    logger.info(f"Pruned {cursor.rowcount} invalid push tokens")
+    return cursor.rowcount
+
+class RateLimiter:
+    """Token bucket shared by the sending threads, in notifications per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._allowance = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._allowance = min(self.rate, self._allowance + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._allowance >= amount:
+                    self._allowance -= amount
+                    return
+                wait = (amount - self._allowance) / self.rate
+            time.sleep(wait)
+
+class ExpoPushClient:
+    """Batched, concurrent access to the Expo push API over one pooled session"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+                 access_token: Optional[str] = None, send_url: str = EXPO_SEND_URL,
+                 receipts_url: str = EXPO_RECEIPTS_URL):
+        self.workers = workers
+        self.send_url = send_url
+        self.receipts_url = receipts_url
+        self.limiter = RateLimiter(rate_per_second)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Content-Type': 'application/json'
+        })
+        access_token = access_token or os.getenv('EXPO_ACCESS_TOKEN')
+        if access_token:
+            self.session.headers['Authorization'] = f"Bearer {access_token}"
+
+    def _post(self, url: str, payload) -> Dict:
+        """POST with retries on throttling, server errors and dropped connections"""
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                response = self.session.post(url, json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except requests.ConnectionError as e:
+                error = str(e)
+            if attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt)
+        raise requests.RequestException(f"Expo request failed after {MAX_RETRIES} attempts: {error}")
+
+    def _send_batch(self, messages: List[Dict]) -> List[Dict]:
+        self.limiter.acquire(len(messages))
+        try:
+            tickets = self._post(self.send_url, messages).get('data', [])
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Push batch of {len(messages)} failed: {e}")
+            return [{'status': 'error', 'message': str(e), 'details': {'error': 'RequestFailed'}}] * len(messages)
+        if len(tickets) != len(messages):
+            logger.error(f"Expo returned {len(tickets)} tickets for {len(messages)} messages")
+            tickets = (tickets + [{'status': 'error', 'details': {'error': 'MissingTicket'}}]
+                       * len(messages))[:len(messages)]
+        return tickets
+
+    def send(self, messages: List[Dict]) -> List[Dict]:
+        """Send ``messages``; returns one ticket per message, in order"""
+        batches = [messages[i:i + SEND_BATCH_SIZE] for i in range(0, len(messages), SEND_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return [ticket for tickets in pool.map(self._send_batch, batches) for ticket in tickets]
+
+    def _receipt_batch(self, ticket_ids: List[str]) -> Dict[str, Dict]:
+        try:
+            return self._post(self.receipts_url, {'ids': ticket_ids}).get('data', {})
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Receipt batch of {len(ticket_ids)} failed: {e}")
+            return {}
+
+    def receipts(self, ticket_ids: List[str]) -> Dict[str, Dict]:
+        """Receipts by ticket id; tickets without a receipt yet are missing"""
+        batches = [ticket_ids[i:i + RECEIPT_BATCH_SIZE] for i in range(0, len(ticket_ids), RECEIPT_BATCH_SIZE)]
+        receipts = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for batch in pool.map(self._receipt_batch, batches):
+                receipts.update(batch)
+        return receipts
+
+def _device_gone(result: Dict) -> bool:
+    return result.get('status') == 'error' and \
+        (result.get('details') or {}).get('error') == 'DeviceNotRegistered'
+
+def notify_all(conn: sqlite3.Connection, notification: Dict,
+               client: Optional[ExpoPushClient] = None) -> Dict[str, int]:
+    """Send ``notification`` (title, body, data, ...) to every stored token.
+
+    Returns counts of tickets ``ok`` and ``errors``, and tokens ``pruned``.
+    """
+    ensure_push_tables(conn)
+    client = client or ExpoPushClient()
+    tokens = [row[0] for row in conn.execute("SELECT token FROM push_tokens ORDER BY id")]
+    valid = [token for token in tokens if is_expo_token(token)]
+    invalid = [token for token in tokens if not is_expo_token(token)]
+
+    tickets = client.send([{'to': token, **notification} for token in valid])
+
+    sent_at = datetime.now().isoformat()
+    ok = [(ticket['id'], token, sent_at) for token, ticket in zip(valid, tickets)
+          if ticket.get('status') == 'ok' and ticket.get('id')]
+    conn.executemany("INSERT OR REPLACE INTO push_tickets (ticket_id, token, sent_at) VALUES (?, ?, ?)", ok)
+    conn.commit()
+
+    gone = invalid + [token for token, ticket in zip(valid, tickets) if _device_gone(ticket)]
+    counts = {'ok': len(ok), 'errors': len(valid) - len(ok), 'pruned': prune_tokens(conn, gone)}
+    logger.info(f"Push sent to {len(valid)} devices: {counts}")
+    return counts
+
+def process_receipts(conn: sqlite3.Connection, client: Optional[ExpoPushClient] = None,
+                     min_age: timedelta = RECEIPT_DELAY) -> Dict[str, int]:
+    """Fetch receipts for tickets old enough to have one and prune dead tokens.
+
+    Tickets with a receipt, or too old for Expo to still have one, are
+    dropped; the rest are kept for the next run.
+    """
+    ensure_push_tables(conn)
+    client = client or ExpoPushClient()
+    now = datetime.now()
+    rows = conn.execute("SELECT ticket_id, token, sent_at FROM push_tickets WHERE sent_at <= ?",
+                        ((now - min_age).isoformat(),)).fetchall()
+    if not rows:
+        return {'checked': 0, 'errors': 0, 'pruned': 0}
+
+    receipts = client.receipts([row[0] for row in rows])
+    expired = (now - RECEIPT_EXPIRY).isoformat()
+    done = [ticket_id for ticket_id, _, sent_at in rows if ticket_id in receipts or sent_at < expired]
+    gone = [token for ticket_id, token, _ in rows if _device_gone(receipts.get(ticket_id, {}))]
+    errors = sum(1 for receipt in receipts.values() if receipt.get('status') == 'error')
+
+    conn.execute("DELETE FROM push_tickets WHERE ticket_id IN (SELECT value FROM json_each(?))",
+                 (json.dumps(done),))
+    conn.commit()
+    counts = {'checked': len(receipts), 'errors': errors, 'pruned': prune_tokens(conn, gone)}
+    logger.info(f"Push receipts: {counts}")
+    return counts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check Expo push receipts and prune dead tokens')
+    parser.add_argument('--db', default='kids_news_content/content_tracking.db', help='Database with push_tokens')
+    parser.add_argument('--min-age', type=int, default=15, help='Only tickets at least this many minutes old')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    print(process_receipts(conn, min_age=timedelta(minutes=args.min_age)))
+    conn.close()
@@ -19,6 +19,8 @@ import shutil
 import re
 import random
 
+from audio_mastering import AudioMastering
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +36,9 @@ class FinalVideoGenerator:
         (self.output_dir / "audio").mkdir(exist_ok=True)
         (self.output_dir / "final").mkdir(exist_ok=True)
         
+        # Narration is mastered to podcast loudness; results are cached by source hash
+        self.audio_mastering = AudioMastering(self.output_dir / "audio" / "mastered")
+        
         # Official logo path - look in backend directory first, then root
         self.official_logo = Path("junior_news_digest_official_logo.png")
         if not self.official_logo.exists():
@@ -746,7 +751,7 @@ class FinalVideoGenerator:
                     f.write(response.content)
                 
                 logger.info("✅ Natural ElevenLabs voice generated")
-                return str(audio_path)
+                return str(self.audio_mastering.master(audio_path))
             else:
                 logger.error(f"ElevenLabs API error: {response.status_code}")
                 return self.generate_system_voice_natural(script)
@@ -767,13 +772,9 @@ class FinalVideoGenerator:
         try:
             subprocess.run(cmd, check=True)
             
-            # Convert to MP3
+            # Master to podcast loudness and encode to MP3
             mp3_path = self.output_dir / "audio" / "natural_clean_system.mp3"
-            subprocess.run([
-                'ffmpeg', '-i', str(audio_path),
-                '-acodec', 'libmp3lame', '-b:a', '192k',
-                '-ar', '44100', '-y', str(mp3_path)
-            ], check=True)
+            self.audio_mastering.master_to(audio_path, mp3_path)
             
             # Remove AIFF
             audio_path.unlink()
@@ -785,15 +786,19 @@ class FinalVideoGenerator:
             logger.error(f"Voice generation failed: {e}")
             raise
 
-    def create_branded_video(self, title: str, content: str) -> str:
-        """Create perfect video with consistent branding and watermark-free illustrations"""
-        logger.info(f"🎬 Creating branded Junior News Digest video: {title}")
+    def create_branded_video(self, title: str, content: str, audio_path: str = None) -> str:
+        """Create perfect video with consistent branding and watermark-free illustrations
         
-        # Create natural script
-        script = self.create_natural_conversational_script(title, content)
+        Pass ``audio_path`` to narrate with audio that was already generated.
+        """
+        logger.info(f"🎬 Creating branded Junior News Digest video: {title}")
         
-        # Generate natural voice
-        audio_path = self.generate_elevenlabs_voice_natural(script)
+        if not audio_path:
+            # Create natural script
+            script = self.create_natural_conversational_script(title, content)
+            
+            # Generate natural voice
+            audio_path = self.generate_elevenlabs_voice_natural(script)
         
         # Get audio duration
         duration_info = subprocess.run([
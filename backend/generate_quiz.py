@@ -1,22 +1,55 @@
 #!/usr/bin/env python3
 """
 Quiz generation script for stories
+
+Questions come from each article's extracted facts (see quiz_facts), so an
+article is read once and later quizzes are built from the fact index.
+
+Bulk mode streams every article without a quiz through one cursor, extracts
+facts in a process pool and writes each chunk with one executemany:
+    python generate_quiz.py --workers 4 --chunk-size 200
 """
 
+import os
+import time
 import sqlite3
-import uuid
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from data_layer import database_path
+from migrate_database import apply_index_migrations
+from quiz_facts import FactIndex, build_questions, extract_article_facts, extract_facts
+
+QUIZZES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id TEXT PRIMARY KEY,
+        article_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        questions TEXT NOT NULL,
+        total_questions INTEGER NOT NULL,
+        created_date TEXT NOT NULL,
+        FOREIGN KEY (article_id) REFERENCES articles (id)
+    )
+'''
 
-def generate_quiz_for_article(article_id: str):
-    """Generate a quiz for a specific article"""
+DEFAULT_CHUNK_SIZE = 200
+
+def generate_quiz_for_article(article_id: str, conn_articles: sqlite3.Connection = None):
+    """Generate a quiz for a specific article
+    
+    Pass an open connection to reuse it (and defer the commit) when
+    generating many quizzes.
+    """
     
-    # Connect to databases
-    conn_articles = sqlite3.connect('junior_news_integrated.db')
-    conn_editorial = sqlite3.connect('automated_editorial.db')
+    # Articles and quizzes both live in the app database
+    owns_connection = conn_articles is None
+    if owns_connection:
+        conn_articles = sqlite3.connect(database_path('main'))
     
     cursor_articles = conn_articles.cursor()
-    cursor_editorial = conn_editorial.cursor()
     
     # Get article details
     cursor_articles.execute('SELECT title, content, category FROM articles WHERE id = ?', (article_id,))
@@ -24,28 +57,22 @@ def generate_quiz_for_article(article_id: str):
     
     if not article:
         print(f"❌ Article {article_id} not found!")
+        if owns_connection:
+            conn_articles.close()
         return None
     
     title, content, category = article
     
-    # Generate quiz questions based on content
-    quiz_questions = generate_questions_from_content(title, content, category)
+    # Facts are only re-extracted when the article text changed
+    fact_index = FactIndex(conn_articles)
+    fact_index.index_article(article_id, title, content, category)
+    quiz_questions = fact_index.questions_for(article_id)
     
     # Create quiz ID
     quiz_id = f"quiz_{article_id}"
     
     # Create quizzes table if it doesn't exist
-    cursor_articles.execute('''
-        CREATE TABLE IF NOT EXISTS quizzes (
-            id TEXT PRIMARY KEY,
-            article_id TEXT NOT NULL,
-            title TEXT NOT NULL,
-            questions TEXT NOT NULL,
-            total_questions INTEGER NOT NULL,
-            created_date TEXT NOT NULL,
-            FOREIGN KEY (article_id) REFERENCES articles (id)
-        )
-    ''')
+    cursor_articles.execute(QUIZZES_TABLE_SQL)
     
     # Insert quiz
     cursor_articles.execute('''
@@ -61,170 +88,140 @@ def generate_quiz_for_article(article_id: str):
         datetime.now().isoformat()
     ))
     
-    conn_articles.commit()
-    conn_articles.close()
-    conn_editorial.close()
+    if owns_connection:
+        conn_articles.commit()
+        conn_articles.close()
     
     print(f"✅ Generated quiz for article: {title}")
     return quiz_id
 
 def generate_questions_from_content(title, content, category):
-    """Generate quiz questions based on article content"""
-    
-    # Simple question templates based on content analysis
-    questions = []
-    
-    # Question 1: Main topic
-    questions.append({
-        "id": str(uuid.uuid4()),
-        "question": f"What is the main topic of this story?",
-        "options": [
-            title,
-            "A different story",
-            "Something else",
-            "I don't know"
-        ],
-        "correct_answer": 0,
-        "explanation": f"The main topic is: {title}"
-    })
-    
-    # Question 2: Category
-    category_options = {
-        'environment': ['Protecting nature', 'Space exploration', 'Sports', 'Technology'],
-        'science': ['Scientific discovery', 'Sports', 'Art', 'Music'],
-        'technology': ['New inventions', 'Nature', 'Sports', 'Art'],
-        'sports': ['Athletic achievement', 'Science', 'Art', 'Nature'],
-        'health': ['Health and wellness', 'Sports', 'Art', 'Technology']
-    }
-    
-    if category in category_options:
-        options = category_options[category].copy()
-        if category == 'environment':
-            correct_idx = 0
-        elif category == 'science':
-            correct_idx = 0
-        elif category == 'technology':
-            correct_idx = 0
-        elif category == 'sports':
-            correct_idx = 0
-        elif category == 'health':
-            correct_idx = 0
-        else:
-            correct_idx = 0
-    else:
-        options = ['Amazing discovery', 'Sports news', 'Art project', 'Music event']
-        correct_idx = 0
-    
-    questions.append({
-        "id": str(uuid.uuid4()),
-        "question": f"What category does this story belong to?",
-        "options": options,
-        "correct_answer": correct_idx,
-        "explanation": f"This story is about {category}!"
-    })
-    
-    # Question 3: Key detail from content
-    if "robot" in content.lower():
-        questions.append({
-            "id": str(uuid.uuid4()),
-            "question": "What special invention is mentioned in this story?",
-            "options": ["A robot", "A car", "A book", "A toy"],
-            "correct_answer": 0,
-            "explanation": "The story mentions a robot that helps solve problems!"
-        })
-    elif "scientists" in content.lower():
-        questions.append({
-            "id": str(uuid.uuid4()),
-            "question": "Who made the discovery in this story?",
-            "options": ["Scientists", "Artists", "Musicians", "Athletes"],
-            "correct_answer": 0,
-            "explanation": "Scientists made the amazing discovery!"
-        })
-    elif "students" in content.lower() or "kids" in content.lower():
-        questions.append({
-            "id": str(uuid.uuid4()),
-            "question": "Who are the main characters in this story?",
-            "options": ["Students/Kids", "Adults", "Animals", "Robots"],
-            "correct_answer": 0,
-            "explanation": "Students and kids are the heroes of this story!"
-        })
-    else:
-        questions.append({
-            "id": str(uuid.uuid4()),
-            "question": "What makes this story special?",
-            "options": ["Young people helping", "Adults working", "Animals playing", "Robots dancing"],
-            "correct_answer": 0,
-            "explanation": "This story shows how young people can make a difference!"
-        })
-    
-    # Question 4: Impact/Why it matters
-    questions.append({
-        "id": str(uuid.uuid4()),
-        "question": "Why is this story important for kids?",
-        "options": [
-            "It shows kids can make a difference",
-            "It's just entertainment",
-            "It's about adults only",
-            "It doesn't matter"
-        ],
-        "correct_answer": 0,
-        "explanation": "This story shows that kids have the power to change the world!"
-    })
-    
-    # Question 5: Fun fact
-    questions.append({
-        "id": str(uuid.uuid4()),
-        "question": "What can you learn from this story?",
-        "options": [
-            "Teamwork and creativity are powerful",
-            "Only adults can solve problems",
-            "Kids should never try new things",
-            "Science is boring"
-        ],
-        "correct_answer": 0,
-        "explanation": "You can learn that teamwork, creativity, and trying new things can solve big problems!"
-    })
-    
-    return questions
+    """Generate quiz questions based on article content, without a fact index
+    
+    Wrong answers come from the article itself and built-in options; use
+    FactIndex.questions_for to draw them from the whole corpus.
+    """
+    return build_questions('', title, category, extract_facts(title, content), content=content)
+
+def _extract_chunk(articles):
+    """Fact index rows for a chunk of articles; runs in pool workers"""
+    return [extract_article_facts(article) for article in articles]
 
-def generate_quizzes_for_all_articles():
+def _chunks(cursor: sqlite3.Cursor, chunk_size: int):
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+def generate_missing_quizzes(conn: sqlite3.Connection, workers: Optional[int] = None,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             progress: Optional[Callable[[str, int, int, float], None]] = None) -> Dict:
+    """Generate quizzes for every article that has none.
+    
+    Two passes, each streaming articles through a single cursor
+    ``chunk_size`` at a time with one executemany and one commit per chunk:
+    
+    1. ``index``: articles missing from the fact index have their facts
+       extracted in a process pool (``workers`` processes, CPU count by
+       default; 0 or 1 extracts inline).
+    2. ``quiz``: questions are built from the index, with wrong answers drawn
+       from the whole corpus indexed in pass 1.
+    
+    An interrupted run keeps every finished chunk and the next run picks up
+    the rest. ``progress`` is called as ``progress(stage, done, total,
+    seconds)`` after each chunk.
+    """
+    cursor = conn.cursor()
+    cursor.execute(QUIZZES_TABLE_SQL)
+    fact_index = FactIndex(conn)
+    # The missing-quiz probe needs idx_quizzes_article_id as quizzes grows
+    apply_index_migrations(conn)
+    
+    missing = '''
+        FROM articles a
+        WHERE NOT EXISTS (SELECT 1 FROM quizzes q WHERE q.article_id = a.id)
+    '''
+    unindexed = missing + " AND NOT EXISTS (SELECT 1 FROM article_fact_index f WHERE f.article_id = a.id)"
+    to_index = conn.execute(f"SELECT COUNT(*) {unindexed}").fetchone()[0]
+    total = conn.execute(f"SELECT COUNT(*) {missing}").fetchone()[0]
+    
+    workers = os.cpu_count() if workers is None else workers
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and to_index > chunk_size else None
+    start = time.perf_counter()
+    try:
+        indexed = 0
+        cursor.execute(f"SELECT a.id, a.title, a.content, a.category {unindexed} ORDER BY a.rowid")
+        for articles in _chunks(cursor, chunk_size):
+            if pool:
+                # One task per worker keeps pickling overhead per chunk small
+                step = -(-len(articles) // workers)
+                parts = [articles[i:i + step] for i in range(0, len(articles), step)]
+                rows = [row for part in pool.map(_extract_chunk, parts) for row in part]
+            else:
+                rows = _extract_chunk(articles)
+            fact_index.store(rows)
+            conn.commit()
+            indexed += len(rows)
+            if progress:
+                progress('index', indexed, to_index, time.perf_counter() - start)
+    finally:
+        if pool:
+            pool.shutdown()
+    
+    generated = 0
+    quiz_start = time.perf_counter()
+    cursor.execute(f"SELECT a.id {missing} ORDER BY a.rowid")
+    for chunk in _chunks(cursor, chunk_size):
+        articles = fact_index.facts_for([row[0] for row in chunk])
+        distractors = fact_index.pool()
+        created = datetime.now().isoformat()
+        rows = []
+        for article_id, article in articles.items():
+            questions = build_questions(article_id, article['title'], article['category'],
+                                        article['facts'], distractors)
+            rows.append((f"quiz_{article_id}", article_id, f"Quiz: {article['title']}",
+                         json.dumps(questions), len(questions), created))
+        
+        conn.executemany('''
+            INSERT OR REPLACE INTO quizzes
+            (id, article_id, title, questions, total_questions, created_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        
+        generated += len(rows)
+        if progress:
+            progress('quiz', generated, total, time.perf_counter() - quiz_start)
+    
+    seconds = time.perf_counter() - start
+    return {'indexed': indexed, 'generated': generated, 'seconds': seconds,
+            'per_second': generated / seconds if seconds else 0.0}
+
+def _print_progress(stage: str, done: int, total: int, seconds: float):
+    rate = done / seconds if seconds else 0.0
+    noun = 'articles indexed' if stage == 'index' else 'quizzes'
+    print(f"   {done}/{total} {noun} ({rate:.0f}/s)")
+
+def generate_quizzes_for_all_articles(workers: Optional[int] = None,
+                                      chunk_size: int = DEFAULT_CHUNK_SIZE):
     """Generate quizzes for all articles that don't have them"""
     
-    conn = sqlite3.connect('junior_news_integrated.db')
-    cursor = conn.cursor()
+    conn = sqlite3.connect(database_path('main'))
+    try:
+        result = generate_missing_quizzes(conn, workers=workers, chunk_size=chunk_size,
+                                          progress=_print_progress)
+    finally:
+        conn.close()
     
-    # Get all articles
-    cursor.execute('SELECT id, title FROM articles')
-    articles = cursor.fetchall()
-    
-    # Get existing quizzes (create table if it doesn't exist)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS quizzes (
-            id TEXT PRIMARY KEY,
-            article_id TEXT NOT NULL,
-            title TEXT NOT NULL,
-            questions TEXT NOT NULL,
-            total_questions INTEGER NOT NULL,
-            created_date TEXT NOT NULL,
-            FOREIGN KEY (article_id) REFERENCES articles (id)
-        )
-    ''')
-    
-    cursor.execute('SELECT article_id FROM quizzes')
-    existing_quizzes = [row[0] for row in cursor.fetchall()]
-    
-    generated_count = 0
-    for article_id, title in articles:
-        if article_id not in existing_quizzes:
-            quiz_id = generate_quiz_for_article(article_id)
-            if quiz_id:
-                generated_count += 1
-                print(f"✅ Generated quiz for: {title}")
-        else:
-            print(f"⏭️  Quiz already exists for: {title}")
-    
-    conn.close()
-    print(f"\n🎉 Generated {generated_count} new quizzes!")
+    print(f"\n🎉 Generated {result['generated']} new quizzes in {result['seconds']:.1f}s "
+          f"({result['per_second']:.0f}/s)")
+    return result
 
 if __name__ == "__main__":
-    generate_quizzes_for_all_articles()
+    parser = argparse.ArgumentParser(description='Generate quizzes for articles that have none')
+    parser.add_argument('--workers', type=int, help='Fact-extraction processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='Articles per write transaction')
+    args = parser.parse_args()
+    generate_quizzes_for_all_articles(args.workers, args.chunk_size)
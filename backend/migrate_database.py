@@ -3,16 +3,103 @@
 Database Migration Script for Junior News Digest
 ===============================================
 
-Adds the script column to existing automated_stories table
+Adds the script column to existing automated_stories table, and keeps the
+secondary indexes for every Junior News database in place.
+
+Usage:
+    python migrate_database.py                      # legacy automation migration
+    python migrate_database.py --indexes DB [DB...]  # add missing indexes
+    python migrate_database.py --check DB [DB...]    # fail on full-scan hot queries
 """
 
+import re
+import sys
 import sqlite3
 import logging
+import argparse
 from pathlib import Path
+from typing import Dict, List
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Secondary indexes for the hot filters across all DatabaseManager variants.
+# Each index is only created in databases that have the table and columns,
+# so the same list serves every database file.
+SCHEMA_INDEXES = [
+    ('idx_candidate_stories_status', 'candidate_stories', ('status', 'priority_score', 'generated_date')),
+    ('idx_videos_status', 'videos', ('status', 'upload_date')),
+    ('idx_articles_category', 'articles', ('category', 'published_date')),
+    ('idx_articles_published_date', 'articles', ('published_date',)),
+    ('idx_quizzes_article_id', 'quizzes', ('article_id',)),
+    ('idx_weekly_schedule_date_status', 'weekly_schedule', ('scheduled_date', 'status')),
+    ('idx_weekly_schedule_week', 'weekly_schedule', ('week_start_date', 'scheduled_date')),
+    ('idx_weekly_schedule_candidate', 'weekly_schedule', ('candidate_id',)),
+    ('idx_automated_stories_status', 'automated_stories', ('status', 'scheduled_publish_date')),
+    ('idx_automated_stories_publish_date', 'automated_stories', ('scheduled_publish_date', 'status')),
+    ('idx_publishing_schedule_story', 'publishing_schedule', ('story_id', 'publish_day')),
+    ('idx_weekly_content_week', 'weekly_content', ('week_folder', 'selected')),
+]
+
+# Queries run on every request or scheduler tick; none may scan a whole table.
+# Only queries whose tables exist in the database being checked are explained.
+HOT_QUERIES = {
+    'pending_candidates': (
+        ('candidate_stories',),
+        "SELECT id FROM candidate_stories WHERE status = 'pending_review' "
+        "ORDER BY priority_score DESC, generated_date DESC LIMIT 20"
+    ),
+    'approved_candidates': (
+        ('candidate_stories',),
+        "SELECT id FROM candidate_stories WHERE status = 'approved' ORDER BY approved_date"
+    ),
+    'ready_videos': (
+        ('videos',),
+        "SELECT id FROM videos WHERE status = 'ready' ORDER BY upload_date DESC"
+    ),
+    'articles_by_category': (
+        ('articles',),
+        "SELECT id FROM articles WHERE category = ? ORDER BY published_date DESC LIMIT 50"
+    ),
+    'latest_articles': (
+        ('articles',),
+        "SELECT id FROM articles ORDER BY published_date DESC LIMIT 50"
+    ),
+    'article_quiz': (
+        ('quizzes',),
+        "SELECT id FROM quizzes WHERE article_id = ?"
+    ),
+    'todays_schedule': (
+        ('weekly_schedule', 'candidate_stories'),
+        "SELECT ws.candidate_id, cs.title FROM weekly_schedule ws "
+        "JOIN candidate_stories cs ON ws.candidate_id = cs.id "
+        "WHERE ws.scheduled_date = ? AND ws.status = 'scheduled'"
+    ),
+    'week_schedule': (
+        ('weekly_schedule', 'candidate_stories'),
+        "SELECT ws.day_of_week, cs.title FROM weekly_schedule ws "
+        "JOIN candidate_stories cs ON ws.candidate_id = cs.id "
+        "WHERE ws.week_start_date = ? ORDER BY ws.scheduled_date"
+    ),
+    'approved_automated_stories': (
+        ('automated_stories',),
+        "SELECT id FROM automated_stories WHERE status = 'approved'"
+    ),
+    'todays_automated_stories': (
+        ('automated_stories', 'publishing_schedule'),
+        "SELECT s.id FROM automated_stories s "
+        "JOIN publishing_schedule ps ON s.id = ps.story_id "
+        "WHERE s.scheduled_publish_date = ? AND s.status = 'scheduled' AND ps.publish_day = ?"
+    ),
+    'weekly_content_selected': (
+        ('weekly_content',),
+        "SELECT id FROM weekly_content WHERE week_folder = ? AND selected = 1"
+    ),
+}
+
+# "SCAN <table>" without an index is a full table scan; index and virtual
+# table scans are fine
+FULL_SCAN_RE = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
 def migrate_database(db_path: str = "editorial_automation.db"):
     """Add script column to existing database"""
     try:
@@ -128,5 +215,99 @@ def migrate_database(db_path: str = "editorial_automation.db"):
         logger.error(f"❌ Database migration failed: {e}")
         raise
 
+def _table_columns(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+def apply_index_migrations(conn: sqlite3.Connection) -> List[str]:
+    """Create any missing SCHEMA_INDEXES for tables present in this database.
+
+    Safe to call on every startup: existing indexes are skipped, and each new
+    index is recorded in schema_migrations with the time it was added. An
+    index whose columns no longer match its definition here is dropped and
+    rebuilt, so redefining an index under the same name reaches databases
+    migrated before the change.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    existing = {row[0] for row in cursor.fetchall()}
+
+    created = []
+    for index_name, table, columns in SCHEMA_INDEXES:
+        if index_name in existing:
+            current = tuple(row[2] for row in cursor.execute(f"PRAGMA index_info({index_name})").fetchall())
+            if current == tuple(columns):
+                continue
+        table_columns = _table_columns(cursor, table)
+        if not table_columns or not set(columns) <= set(table_columns):
+            continue
+        if index_name in existing:
+            logger.info(f"Rebuilding {index_name} on ({', '.join(columns)})")
+            cursor.execute(f"DROP INDEX {index_name}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})")
+        cursor.execute("INSERT OR REPLACE INTO schema_migrations (name) VALUES (?)", (index_name,))
+        created.append(index_name)
+
+    if created:
+        cursor.execute("PRAGMA optimize")
+        logger.info(f"Created indexes: {', '.join(created)}")
+    conn.commit()
+    return created
+
+def check_query_plans(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """EXPLAIN every applicable hot query; return the ones doing full table scans"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tables = {row[0] for row in cursor.fetchall()}
+
+    full_scans = {}
+    for name, (required_tables, query) in HOT_QUERIES.items():
+        if not set(required_tables) <= tables:
+            continue
+        params = (None,) * query.count('?')
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        scans = [row[3] for row in cursor.fetchall() if FULL_SCAN_RE.match(row[3])]
+        if scans:
+            full_scans[name] = scans
+    return full_scans
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Junior News Digest database migrations')
+    parser.add_argument('databases', nargs='*', help='Database files (default: editorial_automation.db)')
+    parser.add_argument('--indexes', action='store_true', help='Add missing secondary indexes')
+    parser.add_argument('--check', action='store_true', help='Exit non-zero if a hot query does a full scan')
+    args = parser.parse_args()
+
+    if not args.indexes and not args.check:
+        migrate_database(*args.databases[:1])
+        return
+
+    failed = False
+    for db_path in args.databases or ["editorial_automation.db"]:
+        if not Path(db_path).exists():
+            logger.error(f"❌ Database not found: {db_path}")
+            failed = True
+            continue
+
+        conn = sqlite3.connect(db_path)
+        if args.indexes:
+            created = apply_index_migrations(conn)
+            logger.info(f"✅ {db_path}: {len(created)} indexes added")
+        if args.check:
+            for name, scans in check_query_plans(conn).items():
+                logger.error(f"❌ {db_path}: {name} does a full scan ({'; '.join(scans)})")
+                failed = True
+        conn.close()
+
+    sys.exit(1 if failed else 0)
+
 if __name__ == '__main__':
-    migrate_database()
+    main()
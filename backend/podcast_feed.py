@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Podcast Episode Index and Feed
+==================================================
+
+Episodes are recorded in ``podcast_episodes`` as their audio is generated,
+with the file size and publish time captured once. The RSS feed is built
+from the newest ``FEED_EPISODE_LIMIT`` rows with a single query, and the
+rendered XML is stored in ``podcast_feed_cache`` together with its ETag.
+
+Recording an episode drops the cached feed; the next request rebuilds it.
+The cache also remembers the channel settings (site URL, title, ...) it was
+built with, so changing them rebuilds the feed as well. Everything else
+serves the stored bytes, and HTTP handlers can answer ``If-None-Match``
+with a 304 using the ETag.
+
+Run this file directly to index audio generated before the index existed:
+    python podcast_feed.py --db kids_news_content/content_tracking.db --backfill kids_news_content
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger(__name__)
+
+FEED_EPISODE_LIMIT = 50
+DEFAULT_SUMMARY = 'Kid‑friendly news story.'
+
+def ensure_podcast_tables(conn: sqlite3.Connection):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS podcast_episodes (
+            guid TEXT PRIMARY KEY,
+            story_id TEXT,
+            week_folder TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            title TEXT NOT NULL,
+            summary TEXT,
+            length INTEGER NOT NULL,
+            published_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_podcast_episodes_published ON podcast_episodes (published_at);
+
+        CREATE TABLE IF NOT EXISTS podcast_feed_cache (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            settings TEXT NOT NULL,
+            xml BLOB NOT NULL,
+            etag TEXT NOT NULL,
+            built_at TEXT NOT NULL
+        );
+    ''')
+
+def record_episode(conn: sqlite3.Connection, week_folder: str, audio_path: Path,
+                   story_id: Optional[str] = None, title: Optional[str] = None,
+                   summary: Optional[str] = None, published_at: Optional[datetime] = None):
+    """Add (or refresh) an episode and drop the cached feed; the caller commits"""
+    audio_path = Path(audio_path)
+    published_at = published_at or datetime.now(timezone.utc)
+    conn.execute('''
+        INSERT OR REPLACE INTO podcast_episodes
+        (guid, story_id, week_folder, filename, title, summary, length, published_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (f"{week_folder}-{audio_path.name}", story_id or audio_path.stem, week_folder, audio_path.name,
+          title or audio_path.stem, summary or DEFAULT_SUMMARY, audio_path.stat().st_size,
+          published_at.astimezone(timezone.utc).isoformat()))
+    conn.execute("DELETE FROM podcast_feed_cache")
+
+def feed_settings(site_url: Optional[str] = None) -> Dict[str, str]:
+    """Channel metadata, from the environment unless a site URL is given"""
+    return {
+        'site_url': (site_url or os.getenv('PODCAST_SITE_URL', 'https://example.com/kids_news_podcast')).rstrip('/'),
+        'title': os.getenv('PODCAST_TITLE', 'Kids Daily News Podcast'),
+        'description': os.getenv('PODCAST_DESCRIPTION', 'Kid‑friendly news stories with natural narration.'),
+        'author': os.getenv('PODCAST_AUTHOR', 'Junior News Digest'),
+        'email': os.getenv('PODCAST_CONTACT_EMAIL', os.getenv('EMAIL_USER', 'podcast@example.com')),
+    }
+
+def _rfc822(iso_timestamp: str) -> str:
+    return datetime.fromisoformat(iso_timestamp).strftime('%a, %d %b %Y %H:%M:%S +0000')
+
+def build_feed_xml(conn: sqlite3.Connection, settings: Dict[str, str]) -> Tuple[str, int]:
+    """Render the feed from the newest episodes; returns (xml, episode count)"""
+    rows = conn.execute('''
+        SELECT guid, week_folder, filename, title, summary, length, published_at
+        FROM podcast_episodes ORDER BY published_at DESC, guid LIMIT ?
+    ''', (FEED_EPISODE_LIMIT,)).fetchall()
+
+    site_url = settings['site_url']
+    items = []
+    for guid, week_folder, filename, title, summary, length, published_at in rows:
+        items.append(f"""
+    <item>
+      <title>{escape(title)}</title>
+      <description><![CDATA[{(summary or DEFAULT_SUMMARY).replace(']]>', ']]]]><![CDATA[>')}]]></description>
+      <pubDate>{_rfc822(published_at)}</pubDate>
+      <guid isPermaLink="false">{escape(guid)}</guid>
+      <enclosure url={quoteattr(f"{site_url}/audio/{week_folder}/{filename}")} length="{length}" type="audio/mpeg" />
+      <itunes:explicit>false</itunes:explicit>
+    </item>""")
+
+    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <title>{escape(settings['title'])}</title>
+    <link>{escape(site_url)}</link>
+    <description>{escape(settings['description'])}</description>
+    <language>en-us</language>
+    <atom:link href={quoteattr(f"{site_url}/podcast/feed.xml")} rel="self" type="application/rss+xml" />
+    <itunes:author>{escape(settings['author'])}</itunes:author>
+    <itunes:owner>
+      <itunes:name>{escape(settings['author'])}</itunes:name>
+      <itunes:email>{escape(settings['email'])}</itunes:email>
+    </itunes:owner>
+    <itunes:explicit>false</itunes:explicit>
+    <itunes:image href={quoteattr(f"{site_url}/podcast/cover.png")} />
+    <itunes:category text="Kids &amp; Family" />{''.join(items)}
+  </channel>
+</rss>
+"""
+    return xml, len(rows)
+
+def get_feed(conn: sqlite3.Connection, site_url: Optional[str] = None) -> Optional[Tuple[bytes, str, str]]:
+    """Cached ``(xml, etag, built_at)``, rebuilt only when stale; None if there are no episodes"""
+    ensure_podcast_tables(conn)
+    settings = feed_settings(site_url)
+    settings_key = json.dumps(settings, sort_keys=True)
+
+    row = conn.execute("SELECT settings, xml, etag, built_at FROM podcast_feed_cache WHERE id = 1").fetchone()
+    if row and row[0] == settings_key:
+        return bytes(row[1]), row[2], row[3]
+
+    xml, episode_count = build_feed_xml(conn, settings)
+    if not episode_count:
+        return None
+    body = xml.encode('utf-8')
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    built_at = datetime.now(timezone.utc).isoformat()
+    conn.execute('''
+        INSERT OR REPLACE INTO podcast_feed_cache (id, settings, xml, etag, built_at) VALUES (1, ?, ?, ?, ?)
+    ''', (settings_key, body, etag, built_at))
+    conn.commit()
+    logger.info(f"Rebuilt podcast feed with {episode_count} episodes")
+    return body, etag, built_at
+
+def backfill_episodes(conn: sqlite3.Connection, content_dir: Path) -> int:
+    """Index week-folder MP3s that aren't in podcast_episodes yet (one-off migration)"""
+    ensure_podcast_tables(conn)
+    known = {row[0] for row in conn.execute("SELECT guid FROM podcast_episodes")}
+    has_stories = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'weekly_content'").fetchone()
+    added = 0
+    for week_dir in sorted(Path(content_dir).glob('*_week')):
+        for mp3 in sorted((week_dir / 'generated_audio').glob('*.mp3')):
+            if f"{week_dir.name}-{mp3.name}" in known:
+                continue
+            row = conn.execute("SELECT title, content FROM weekly_content WHERE id = ?",
+                               (mp3.stem,)).fetchone() if has_stories else None
+            record_episode(conn, week_dir.name, mp3, mp3.stem, row[0] if row else None, row[1] if row else None,
+                           datetime.fromtimestamp(mp3.stat().st_mtime, timezone.utc))
+            added += 1
+    conn.commit()
+    return added
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Maintain the podcast episode index')
+    parser.add_argument('--db', default='kids_news_content/content_tracking.db', help='Content tracking database')
+    parser.add_argument('--backfill', metavar='CONTENT_DIR', help='Index existing audio under this folder')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    ensure_podcast_tables(conn)
+    if args.backfill:
+        print(f"Indexed {backfill_episodes(conn, Path(args.backfill))} existing episodes")
+    feed = get_feed(conn)
+    print(f"Feed ETag: {feed[1]} ({len(feed[0])} bytes)" if feed else "No episodes indexed yet")
+    conn.close()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Content Pre-generation
+===========================================
+
+Builds each scheduled story's thumbnail, quiz, audio and video ahead of its
+publish time instead of at 08:00 on publish day.
+
+As soon as a story lands in ``weekly_schedule`` (editorial workflow) or
+``publishing_schedule`` (automated editorial system), a trigger enqueues one
+job per artifact in ``pregeneration_jobs``. Each job's deadline is the
+story's 08:00 publish time minus a per-artifact safety margin, and workers
+always take the job with the earliest deadline next (EDF). A failed job is
+retried after a backoff that doubles with each attempt. By publish time
+the artifacts are on disk, so publishing only attaches their paths and flips
+statuses in one transaction.
+
+Run this file directly to drain the queue once, or keep a worker polling:
+    python pregeneration.py --db editorial_workflow.db
+    python pregeneration.py --db editorial_automation.db --watch
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Hours before the 08:00 publish time each artifact must be ready. Slow,
+# flaky builds get a wider margin so failed attempts can be retried in time.
+# Audio is due before video, which is narrated with it.
+ARTIFACT_LEAD_HOURS = {
+    'audio': 14,
+    'video': 12,
+    'thumbnail': 2,
+    'quiz': 2,
+}
+
+PUBLISH_TIME = '08:00'
+
+MAX_ATTEMPTS = 3
+
+# Wait before retrying a failed job, doubled after each further failure
+RETRY_BACKOFF = timedelta(minutes=10)
+
+# A job left 'running' this long is assumed to belong to a dead worker
+STALE_JOB_AFTER = timedelta(hours=2)
+
+ARTIFACT_DIR = Path(os.getenv('PREGENERATED_DIR', 'pregenerated'))
+
+# Schedule tables that feed the queue. ``{row}`` is replaced with ``new``/``old``
+# inside triggers and with the table name when backfilling.
+PREGENERATION_SOURCES = {
+    'weekly_schedule': {
+        'story_id': '{row}.candidate_id',
+        'publish_date': '{row}.scheduled_date',
+        'pending': "{row}.status = 'scheduled'",
+        'story_sql': '''
+            SELECT id, COALESCE(final_title, title), COALESCE(final_content, content),
+                   COALESCE(final_summary, summary), category, NULL
+            FROM candidate_stories WHERE id = ?
+        ''',
+    },
+    'publishing_schedule': {
+        'story_id': '{row}.story_id',
+        # Stories are scheduled before scheduled_publish_date is written, so
+        # derive the date from the week and day
+        'publish_date': "date({row}.week_start_date, CASE {row}.publish_day "
+                        "WHEN 'Wednesday' THEN '+2 days' WHEN 'Friday' THEN '+4 days' "
+                        "ELSE '+0 days' END)",
+        'pending': "{row}.status = 'scheduled'",
+        'story_sql': '''
+            SELECT id, title, content, summary, category, script
+            FROM automated_stories WHERE id = ?
+        ''',
+    },
+}
+
+def _source_expr(source: Dict, key: str, row: str) -> str:
+    return source[key].format(row=row)
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+def _deadline_expr(publish_date: str, artifact: str) -> str:
+    return (f"datetime({publish_date} || ' {PUBLISH_TIME}', "
+            f"'-{ARTIFACT_LEAD_HOURS[artifact]} hours')")
+
+def _enqueue_select(table: str, row: str, source: Dict) -> str:
+    """SELECT producing one job row per artifact for schedule row(s) ``row``"""
+    publish_date = _source_expr(source, 'publish_date', row)
+    return '\n            UNION ALL '.join(
+        f"SELECT '{table}', {row}.id, {_source_expr(source, 'story_id', row)}, "
+        f"'{artifact}', {_deadline_expr(publish_date, artifact)}"
+        + (f" FROM {table} WHERE {_source_expr(source, 'pending', row)}"
+           f" AND {publish_date} >= date('now', 'localtime')" if row == table else '')
+        for artifact in ARTIFACT_LEAD_HOURS
+    )
+
+def ensure_pregeneration_queue(conn: sqlite3.Connection):
+    """Create the job queue and enqueue triggers, backfilling scheduled stories"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pregeneration_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            schedule_id INTEGER NOT NULL,
+            story_id TEXT NOT NULL,
+            artifact TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            status TEXT DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            retry_after TEXT,
+            result TEXT,
+            error TEXT,
+            enqueued_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            started_at TEXT,
+            finished_at TEXT,
+            UNIQUE (source, schedule_id, artifact)
+        )
+    ''')
+    cursor.execute("PRAGMA table_info(pregeneration_jobs)")
+    if 'retry_after' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE pregeneration_jobs ADD COLUMN retry_after TEXT")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pregeneration_jobs_queue
+        ON pregeneration_jobs (status, deadline)
+    ''')
+
+    for table, source in PREGENERATION_SOURCES.items():
+        if not _table_exists(cursor, table):
+            continue
+        cursor.executescript(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_pregenerate AFTER INSERT ON {table}
+            WHEN {_source_expr(source, 'pending', 'new')} BEGIN
+                INSERT OR IGNORE INTO pregeneration_jobs (source, schedule_id, story_id, artifact, deadline)
+                {_enqueue_select(table, 'new', source)};
+            END;
+            CREATE TRIGGER IF NOT EXISTS {table}_pregenerate_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM pregeneration_jobs
+                WHERE source = '{table}' AND schedule_id = old.id AND status != 'done';
+            END;
+        ''')
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO pregeneration_jobs (source, schedule_id, story_id, artifact, deadline)
+            {_enqueue_select(table, table, source)}
+        ''')
+        if cursor.rowcount > 0:
+            logger.info(f"Enqueued {cursor.rowcount} pre-generation jobs for existing {table} rows")
+
+def requeue_stale_jobs(conn: sqlite3.Connection, now: Optional[datetime] = None) -> int:
+    """Put jobs abandoned by a crashed worker back in the queue"""
+    now = now or datetime.now()
+    cursor = conn.execute('''
+        UPDATE pregeneration_jobs SET status = 'queued'
+        WHERE status = 'running' AND started_at < ?
+    ''', ((now - STALE_JOB_AFTER).isoformat(sep=' ', timespec='seconds'),))
+    conn.commit()
+    return cursor.rowcount
+
+def claim_next_job(conn: sqlite3.Connection, now: Optional[datetime] = None) -> Optional[Dict]:
+    """Atomically take the due queued job with the earliest deadline"""
+    now = (now or datetime.now()).isoformat(sep=' ', timespec='seconds')
+    cursor = conn.execute('''
+        UPDATE pregeneration_jobs
+        SET status = 'running', started_at = ?, attempts = attempts + 1
+        WHERE id = (
+            SELECT id FROM pregeneration_jobs
+            WHERE status = 'queued' AND (retry_after IS NULL OR retry_after <= ?)
+            ORDER BY deadline, id
+            LIMIT 1
+        )
+        RETURNING id, source, schedule_id, story_id, artifact, deadline, attempts
+    ''', (now, now))
+    row = cursor.fetchone()
+    conn.commit()
+    if not row:
+        return None
+    return {'id': row[0], 'source': row[1], 'schedule_id': row[2], 'story_id': row[3],
+            'artifact': row[4], 'deadline': row[5], 'attempts': row[6]}
+
+def _load_story(conn: sqlite3.Connection, job: Dict) -> Optional[Dict]:
+    row = conn.execute(PREGENERATION_SOURCES[job['source']]['story_sql'],
+                       (job['story_id'],)).fetchone()
+    if not row:
+        return None
+    return {'id': row[0], 'title': row[1], 'content': row[2] or '', 'summary': row[3] or '',
+            'category': row[4], 'script': row[5]}
+
+def _finish_job(conn: sqlite3.Connection, job: Dict, result: Optional[str], error: Optional[str]):
+    now = datetime.now()
+    if error is None:
+        conn.execute('''
+            UPDATE pregeneration_jobs
+            SET status = 'done', result = ?, error = NULL, retry_after = NULL, finished_at = ?
+            WHERE id = ?
+        ''', (result, now.isoformat(sep=' ', timespec='seconds'), job['id']))
+    else:
+        retry_after = now + RETRY_BACKOFF * 2 ** (job['attempts'] - 1)
+        conn.execute('''
+            UPDATE pregeneration_jobs
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                error = ?, retry_after = ?, finished_at = ?
+            WHERE id = ?
+        ''', (MAX_ATTEMPTS, error, retry_after.isoformat(sep=' ', timespec='seconds'),
+              now.isoformat(sep=' ', timespec='seconds'), job['id']))
+    conn.commit()
+
+def run_pregeneration(conn: sqlite3.Connection,
+                      builders: Optional[Dict[str, Callable[[Dict], str]]] = None,
+                      max_jobs: Optional[int] = None) -> Dict:
+    """Build due queued artifacts in deadline order until none are left.
+
+    ``builders`` maps artifact name to a callable taking the story dict (with
+    the story's finished ``artifacts``) and returning the artifact (a file
+    path, or JSON for quizzes). Returns counts
+    of built and failed jobs and how many finished after their deadline.
+    """
+    builders = builders or default_builders()
+    requeue_stale_jobs(conn)
+
+    stats = {'built': 0, 'failed': 0, 'late': 0}
+    while max_jobs is None or stats['built'] + stats['failed'] < max_jobs:
+        job = claim_next_job(conn)
+        if job is None:
+            break
+
+        story = _load_story(conn, job)
+        try:
+            if story is None:
+                raise LookupError(f"Story {job['story_id']} not found")
+            # Artifacts already built for this story, e.g. the narration for its video
+            story['artifacts'] = prepared_artifacts(conn.cursor(), job['source'],
+                                                    [job['schedule_id']])[job['schedule_id']]
+            result = builders[job['artifact']](story)
+        except Exception as e:
+            logger.error(f"Pre-generating {job['artifact']} for {job['story_id']} failed: {e}")
+            _finish_job(conn, job, None, str(e))
+            stats['failed'] += 1
+            continue
+
+        _finish_job(conn, job, result, None)
+        stats['built'] += 1
+        if datetime.now().isoformat(sep=' ', timespec='seconds') > job['deadline']:
+            stats['late'] += 1
+            logger.warning(f"{job['artifact']} for {job['story_id']} finished after its deadline {job['deadline']}")
+
+    if stats['built'] or stats['failed']:
+        logger.info(f"Pre-generation: {stats['built']} built, {stats['failed']} failed, {stats['late']} late")
+    return stats
+
+def prepared_artifacts(cursor, source: str, schedule_ids: Iterable[int]) -> Dict[int, Dict[str, str]]:
+    """Finished artifacts per schedule row, e.g. ``{12: {'video': path, 'quiz': json}}``"""
+    schedule_ids = list(schedule_ids)
+    prepared = {schedule_id: {} for schedule_id in schedule_ids}
+    if not schedule_ids:
+        return prepared
+    placeholders = ', '.join('?' * len(schedule_ids))
+    cursor.execute(f'''
+        SELECT schedule_id, artifact, result FROM pregeneration_jobs
+        WHERE source = ? AND schedule_id IN ({placeholders}) AND status = 'done'
+    ''', (source, *schedule_ids))
+    for schedule_id, artifact, result in cursor.fetchall():
+        prepared[schedule_id][artifact] = result
+    return prepared
+
+def skip_unfinished_jobs(cursor, source: str, schedule_ids: Iterable[int]) -> int:
+    """Drop queued builds for stories that are being published without them"""
+    schedule_ids = list(schedule_ids)
+    if not schedule_ids:
+        return 0
+    placeholders = ', '.join('?' * len(schedule_ids))
+    cursor.execute(f'''
+        UPDATE pregeneration_jobs SET status = 'skipped'
+        WHERE source = ? AND schedule_id IN ({placeholders}) AND status IN ('queued', 'failed')
+    ''', (source, *schedule_ids))
+    return cursor.rowcount
+
+def queue_summary(conn: sqlite3.Connection) -> Dict[str, int]:
+    cursor = conn.execute("SELECT status, COUNT(*) FROM pregeneration_jobs GROUP BY status")
+    return {status: count for status, count in cursor.fetchall()}
+
+@lru_cache(maxsize=1)
+def _video_generator():
+    # Heavy imports (PIL, numpy, ffmpeg helpers) only when a media job runs
+    from final_video_generator import FinalVideoGenerator
+    return FinalVideoGenerator()
+
+def _keep(path: str, story_id: str, artifact: str) -> str:
+    """Copy a generator's fixed-name output to a per-story location"""
+    target_dir = ARTIFACT_DIR / story_id
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / f"{artifact}{Path(path).suffix}"
+    shutil.copyfile(path, target)
+    return str(target)
+
+def build_thumbnail(story: Dict) -> str:
+    from thumbnail_generator import ThumbnailGenerator
+    path = ThumbnailGenerator().generate_thumbnail_for_story(story)
+    if not path:
+        raise RuntimeError('No thumbnail generated')
+    return path
+
+def build_quiz(story: Dict) -> str:
+    from generate_quiz import generate_questions_from_content
+    return json.dumps(generate_questions_from_content(story['title'], story['content'], story['category']))
+
+def build_audio(story: Dict) -> str:
+    generator = _video_generator()
+    script = story['script'] or generator.create_natural_conversational_script(story['title'], story['content'])
+    return _keep(generator.generate_elevenlabs_voice_natural(script), story['id'], 'audio')
+
+def build_video(story: Dict) -> str:
+    # Narrated with the pre-generated audio when it is ready
+    audio_path = story.get('artifacts', {}).get('audio')
+    if audio_path and not Path(audio_path).exists():
+        audio_path = None
+    return _keep(_video_generator().create_branded_video(story['title'], story['content'], audio_path),
+                 story['id'], 'video')
+
+def default_builders() -> Dict[str, Callable[[Dict], str]]:
+    return {
+        'thumbnail': build_thumbnail,
+        'quiz': build_quiz,
+        'audio': build_audio,
+        'video': build_video,
+    }
+
+class PregenerationWorker:
+    """Background thread that keeps draining the queue of one database"""
+
+    def __init__(self, db_path: str, builders: Optional[Dict[str, Callable[[Dict], str]]] = None,
+                 poll_seconds: int = 300):
+        self.db_path = db_path
+        self.builders = builders
+        self.poll_seconds = poll_seconds
+        self.thread = None
+        self._stop_event = threading.Event()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    run_pregeneration(conn, self.builders)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Pre-generation worker error: {e}")
+            self._stop_event.wait(self.poll_seconds)
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Pre-generate media for scheduled stories')
+    parser.add_argument('--db', required=True, help='Database holding the schedule and queue')
+    parser.add_argument('--watch', action='store_true', help='Keep polling for new jobs')
+    parser.add_argument('--poll', type=int, default=300, help='Seconds between polls with --watch')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    ensure_pregeneration_queue(conn)
+    conn.commit()
+    while True:
+        run_pregeneration(conn)
+        print(json.dumps(queue_summary(conn)))
+        if not args.watch:
+            break
+        time.sleep(args.poll)
+    conn.close()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Weekly Production Runner
+=============================================
+
+Builds a week's selected stories as a dependency graph of tasks, run in
+parallel on a process pool (one worker per core by default).
+
+Each story gets one task per ``ProductionTask`` (narration audio, video,
+podcast episode, ...). A task starts as soon as every task it depends on
+has finished for that story, so while one story's video renders, the next
+story's audio is already being narrated. If a task fails, the tasks that
+depend on it are skipped; the story's other branches still run.
+
+Every task's status (``pending``, ``running``, ``done``, ``failed``,
+``skipped``), output and error is kept in ``production_tasks``. Running the
+same week again only redoes what didn't finish: completed tasks are reused
+and their outputs passed on to the tasks that need them.
+
+Run this file directly to see a week's progress:
+    python production_runner.py --db kids_news_content/content_tracking.db --week 2025-09-08_week
+"""
+
+import os
+import sqlite3
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ProductionTask:
+    """One build step per story.
+
+    ``func(story, inputs)`` runs in a worker process and returns the task's
+    output (usually a file path); ``inputs`` maps each dependency's name to
+    its output. ``func`` must be picklable: a module-level function or a
+    method of a picklable object.
+    """
+    name: str
+    func: Callable[[Dict, Dict[str, str]], Optional[str]]
+    depends_on: Tuple[str, ...] = ()
+
+def ensure_task_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS production_tasks (
+            week_folder TEXT NOT NULL,
+            story_id TEXT NOT NULL,
+            task TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            output TEXT,
+            error TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            PRIMARY KEY (week_folder, story_id, task)
+        )
+    ''')
+    conn.commit()
+
+def _check_graph(tasks: List[ProductionTask]):
+    """Reject unknown dependencies and cycles before anything runs"""
+    names = {task.name for task in tasks}
+    for task in tasks:
+        missing = set(task.depends_on) - names
+        if missing:
+            raise ValueError(f"Task {task.name} depends on unknown tasks: {', '.join(sorted(missing))}")
+    done, remaining = set(), list(tasks)
+    while remaining:
+        ready = [task for task in remaining if set(task.depends_on) <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle among: {', '.join(task.name for task in remaining)}")
+        done.update(task.name for task in ready)
+        remaining = [task for task in remaining if task.name not in done]
+
+def _run_task(task: ProductionTask, story: Dict, inputs: Dict[str, str]) -> Optional[str]:
+    return task.func(story, inputs)
+
+def run_week(db_path: str, week_folder: str, stories: List[Dict], tasks: List[ProductionTask],
+             workers: Optional[int] = None) -> Dict[str, int]:
+    """Build every task for every story (each story needs an ``id``).
+
+    Returns how many tasks ended ``done``, ``failed`` or ``skipped``,
+    including tasks that were already done in an earlier run.
+    """
+    _check_graph(tasks)
+    by_name = {task.name: task for task in tasks}
+    stories_by_id = {story['id']: story for story in stories}
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    ensure_task_table(conn)
+    conn.executemany('''
+        INSERT OR IGNORE INTO production_tasks (week_folder, story_id, task) VALUES (?, ?, ?)
+    ''', [(week_folder, story_id, task.name) for story_id in stories_by_id for task in tasks])
+    # Anything unfinished (including tasks of an interrupted run) is retried
+    conn.execute('''
+        UPDATE production_tasks SET status = 'pending', error = NULL
+        WHERE week_folder = ? AND status != 'done'
+    ''', (week_folder,))
+    conn.commit()
+
+    status: Dict[Tuple[str, str], str] = {}
+    outputs: Dict[Tuple[str, str], Optional[str]] = {}
+    for story_id, name, state, output in conn.execute('''
+        SELECT story_id, task, status, output FROM production_tasks WHERE week_folder = ?
+    ''', (week_folder,)):
+        if story_id in stories_by_id and name in by_name:
+            status[(story_id, name)] = state
+            outputs[(story_id, name)] = output
+
+    def update(key, state, **fields):
+        status[key] = state
+        columns = ', '.join(f"{column} = ?" for column in ['status', *fields])
+        conn.execute(f'''
+            UPDATE production_tasks SET {columns} WHERE week_folder = ? AND story_id = ? AND task = ?
+        ''', (state, *fields.values(), week_folder, *key))
+
+    def skip_dependents(story_id, failed_task):
+        for task in tasks:
+            key = (story_id, task.name)
+            if failed_task in task.depends_on and status[key] == 'pending':
+                update(key, 'skipped', error=f"{failed_task} failed", finished_at=datetime.now().isoformat())
+                skip_dependents(story_id, task.name)
+
+    def ready_tasks():
+        return [(story_id, task) for (story_id, name), state in status.items() if state == 'pending'
+                for task in [by_name[name]]
+                if all(status[(story_id, dependency)] == 'done' for dependency in task.depends_on)]
+
+    workers = workers or os.cpu_count() or 1
+    running: Dict[Future, Tuple[str, str]] = {}
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            for story_id, task in ready_tasks():
+                key = (story_id, task.name)
+                inputs = {dependency: outputs[(story_id, dependency)] for dependency in task.depends_on}
+                running[pool.submit(_run_task, task, stories_by_id[story_id], inputs)] = key
+                status[key] = 'running'
+                conn.execute('''
+                    UPDATE production_tasks SET status = 'running', attempts = attempts + 1, started_at = ?,
+                    finished_at = NULL WHERE week_folder = ? AND story_id = ? AND task = ?
+                ''', (datetime.now().isoformat(), week_folder, *key))
+            conn.commit()
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                try:
+                    outputs[key] = future.result()
+                    update(key, 'done', output=outputs[key], finished_at=datetime.now().isoformat())
+                    logger.info(f"✅ {key[1]} done for {key[0]}")
+                except Exception as e:
+                    update(key, 'failed', error=str(e) or type(e).__name__, finished_at=datetime.now().isoformat())
+                    logger.error(f"❌ {key[1]} failed for {key[0]}: {e}")
+                    skip_dependents(*key)
+            conn.commit()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        conn.commit()
+        conn.close()
+
+    counts = {'done': 0, 'failed': 0, 'skipped': 0}
+    for state in status.values():
+        counts[state] = counts.get(state, 0) + 1
+    logger.info(f"Production for {week_folder}: {counts}")
+    return counts
+
+def week_status(conn: sqlite3.Connection, week_folder: str) -> List[Tuple]:
+    ensure_task_table(conn)
+    return conn.execute('''
+        SELECT story_id, task, status, attempts, output, error FROM production_tasks
+        WHERE week_folder = ? ORDER BY story_id, started_at
+    ''', (week_folder,)).fetchall()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Show the status of a week's production tasks")
+    parser.add_argument('--db', default='kids_news_content/content_tracking.db', help='Content tracking database')
+    parser.add_argument('--week', required=True, help='Week folder, e.g. 2025-09-08_week')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    for story_id, task, state, attempts, output, error in week_status(conn, args.week):
+        print(f"{story_id:<20} {task:<10} {state:<8} x{attempts}  {error or output or ''}")
+    conn.close()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Quiz Attempts
+==================================
+
+Server-side scoring of quiz answers, an append-only attempt log and
+per-question correctness stats for editors.
+
+Each submission is scored against the stored quiz and appended to
+``quiz_attempts`` as a single INSERT (no secondary indexes to maintain, so
+the write path stays cheap under load). Per-question outcomes go in the row
+as a compact JSON list.
+
+``quiz_question_stats`` is a materialized aggregate of attempts and correct
+answers per question. It is rolled forward in batches: one INSERT ... SELECT
+over ``json_each`` folds every attempt past a watermark into the totals, so
+reading stats never scans the raw log. A batch runs once
+``STATS_BATCH_SIZE`` attempts are waiting, and before stats are read.
+
+Questions are keyed by their id, which quiz generation derives from the
+question's content, so stats carry over when a quiz is re-generated. Stats
+of questions a quiz no longer has are kept but not listed.
+
+Run this file directly to roll the stats forward and list weak questions
+(``--rescore`` first re-scores the whole log from the stored answers):
+    python quiz_attempts.py --db production.db --max-rate 0.4
+"""
+
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATS_BATCH_SIZE = 100
+
+# Questions answered fewer times than this are too noisy to judge
+DEFAULT_MIN_ATTEMPTS = 20
+
+WATERMARK_KEY = 'quiz_stats.last_attempt_id'
+
+def ensure_attempt_tables(conn: sqlite3.Connection):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS quiz_attempts (
+            id INTEGER PRIMARY KEY,
+            quiz_id TEXT NOT NULL,
+            user_id TEXT,
+            answers TEXT NOT NULL,
+            results TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            submitted_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS quiz_question_stats (
+            quiz_id TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT,
+            PRIMARY KEY (quiz_id, question_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS system_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+def question_key(question: Dict, position: int) -> str:
+    """Stable id of a question; hand-made quizzes without ids use their position"""
+    return str(question.get('id') or position)
+
+def _normalise(answer: Any, question: Dict) -> Optional[int]:
+    """An answer given as option text, index or letter -> option index.
+
+    Option text is matched first, so on a numeric question "4" is the
+    option "4", not the option at index 4.
+    """
+    options = question.get('options') or []
+    keys = list(options) if isinstance(options, dict) else None
+    values = list(options.values()) if isinstance(options, dict) else list(options)
+    if isinstance(answer, bool) or answer is None:
+        return None
+    if isinstance(answer, int):
+        return answer if 0 <= answer < len(values) else None
+    answer = str(answer).strip()
+    texts = [str(value).strip() for value in values]
+    if answer in texts:
+        return texts.index(answer)
+    if keys and answer.upper() in keys:
+        return keys.index(answer.upper())
+    if answer.isdigit():
+        return _normalise(int(answer), question)
+    return None
+
+def score_answers(questions: List[Dict], answers: Any) -> Dict:
+    """Score ``answers`` (a list in question order, or a dict by question id).
+
+    Returns the score, total, and per-question results with the right answer
+    and explanation, for the app to show after submitting.
+    """
+    if isinstance(answers, list):
+        answers = {question_key(q, i): a for i, (q, a) in enumerate(zip(questions, answers))}
+    results = []
+    for position, question in enumerate(questions):
+        key = question_key(question, position)
+        correct_index = _normalise(question.get('correct_answer'), question)
+        given = _normalise(answers.get(key), question) if key in answers else None
+        results.append({
+            'question_id': key,
+            'answered': given is not None,
+            'correct': given is not None and given == correct_index,
+            'correct_answer': question.get('correct_answer'),
+            'explanation': question.get('explanation', '')
+        })
+    return {'score': sum(r['correct'] for r in results), 'total': len(questions), 'results': results}
+
+def _watermark(cursor: sqlite3.Cursor) -> int:
+    row = cursor.execute("SELECT value FROM system_settings WHERE key = ?", (WATERMARK_KEY,)).fetchone()
+    return int(row[0]) if row else 0
+
+def refresh_question_stats(conn: sqlite3.Connection, batch_size: int = 5000) -> int:
+    """Fold attempts past the watermark into quiz_question_stats; returns attempts folded"""
+    folded = 0
+    cursor = conn.cursor()
+    while True:
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            start = _watermark(cursor)
+            end = cursor.execute('''
+                SELECT MAX(id) FROM (SELECT id FROM quiz_attempts WHERE id > ? ORDER BY id LIMIT ?)
+            ''', (start, batch_size)).fetchone()[0]
+            if end is None:
+                conn.commit()
+                if folded:
+                    logger.info(f"Folded {folded} quiz attempts into question stats")
+                return folded
+
+            cursor.execute('''
+                INSERT INTO quiz_question_stats (quiz_id, question_id, attempts, correct, updated_at)
+                SELECT a.quiz_id, json_extract(r.value, '$[0]'), COUNT(*),
+                       SUM(json_extract(r.value, '$[1]')), ?
+                FROM quiz_attempts a, json_each(a.results) r
+                WHERE a.id > ? AND a.id <= ?
+                GROUP BY a.quiz_id, json_extract(r.value, '$[0]')
+                ON CONFLICT (quiz_id, question_id) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    correct = correct + excluded.correct,
+                    updated_at = excluded.updated_at
+            ''', (datetime.now().isoformat(), start, end))
+            batch = cursor.execute("SELECT COUNT(*) FROM quiz_attempts WHERE id > ? AND id <= ?",
+                                   (start, end)).fetchone()[0]
+            cursor.execute('''
+                INSERT INTO system_settings (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            ''', (WATERMARK_KEY, str(end)))
+            conn.commit()
+            folded += batch
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+def record_attempt(conn: sqlite3.Connection, quiz_id: str, answers: Any,
+                   user_id: Optional[str] = None) -> Optional[Dict]:
+    """Score and log one submission; None if the quiz doesn't exist"""
+    row = conn.execute("SELECT questions FROM quizzes WHERE id = ?", (quiz_id,)).fetchone()
+    if not row:
+        return None
+    questions = json.loads(row[0])
+    scored = score_answers(questions, answers)
+
+    cursor = conn.execute('''
+        INSERT INTO quiz_attempts (quiz_id, user_id, answers, results, score, total, submitted_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (quiz_id, user_id, json.dumps(answers),
+          json.dumps([[r['question_id'], int(r['correct'])] for r in scored['results']]),
+          scored['score'], scored['total'], datetime.now().isoformat()))
+    conn.commit()
+    attempt_id = cursor.lastrowid
+
+    if attempt_id - _watermark(conn.cursor()) >= STATS_BATCH_SIZE:
+        refresh_question_stats(conn)
+
+    return {'attempt_id': attempt_id, 'quiz_id': quiz_id, **scored}
+
+def rescore_attempts(conn: sqlite3.Connection) -> int:
+    """Re-score every logged attempt from its raw answers and rebuild the stats.
+
+    For when scoring rules change; returns the number of attempts whose
+    score changed. Attempts on questions the quiz no longer has (it was
+    re-generated since) keep their original results, since their answers
+    can't be matched to the current questions.
+    """
+    changed = 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        quizzes = {quiz_id: json.loads(questions) for quiz_id, questions in cursor.execute('''
+            SELECT id, questions FROM quizzes WHERE id IN (SELECT DISTINCT quiz_id FROM quiz_attempts)
+        ''')}
+        updates, stale = [], 0
+        for attempt_id, quiz_id, answers, results in cursor.execute(
+                "SELECT id, quiz_id, answers, results FROM quiz_attempts").fetchall():
+            if quiz_id not in quizzes:
+                continue
+            current = {question_key(q, i) for i, q in enumerate(quizzes[quiz_id])}
+            if {question_id for question_id, _ in json.loads(results)} != current:
+                stale += 1
+                continue
+            scored = score_answers(quizzes[quiz_id], json.loads(answers))
+            rescored = [[r['question_id'], int(r['correct'])] for r in scored['results']]
+            if rescored != json.loads(results):
+                changed += 1
+                updates.append((json.dumps(rescored), scored['score'], scored['total'], attempt_id))
+        cursor.executemany("UPDATE quiz_attempts SET results = ?, score = ?, total = ? WHERE id = ?", updates)
+        cursor.execute("DELETE FROM quiz_question_stats")
+        cursor.execute("DELETE FROM system_settings WHERE key = ?", (WATERMARK_KEY,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    refresh_question_stats(conn)
+    logger.info(f"Re-scored quiz attempts; {changed} changed, {stale} on older versions of their quiz kept")
+    return changed
+
+def question_stats(conn: sqlite3.Connection, min_attempts: int = DEFAULT_MIN_ATTEMPTS,
+                   max_rate: Optional[float] = None, quiz_id: Optional[str] = None,
+                   limit: int = 50) -> List[Dict]:
+    """Per-question correctness, weakest first, with the question text"""
+    refresh_question_stats(conn)
+    query = '''
+        SELECT s.quiz_id, s.question_id, s.attempts, s.correct,
+               1.0 * s.correct / s.attempts AS rate, q.title,
+               json_extract(item.value, '$.question') AS question
+        FROM quiz_question_stats s
+        JOIN quizzes q ON q.id = s.quiz_id
+        JOIN json_each(q.questions) item
+            ON COALESCE(json_extract(item.value, '$.id'), CAST(item.key AS TEXT)) = s.question_id
+        WHERE s.attempts >= ?
+    '''
+    params = [min_attempts]
+    if max_rate is not None:
+        query += " AND 1.0 * s.correct / s.attempts <= ?"
+        params.append(max_rate)
+    if quiz_id:
+        query += " AND s.quiz_id = ?"
+        params.append(quiz_id)
+    query += " ORDER BY rate, s.attempts DESC LIMIT ?"
+    params.append(limit)
+
+    return [{'quiz_id': row[0], 'question_id': row[1], 'attempts': row[2], 'correct': row[3],
+             'correct_rate': round(row[4], 3), 'quiz_title': row[5], 'question': row[6]}
+            for row in conn.execute(query, params).fetchall()]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Roll quiz stats forward and list weak questions')
+    parser.add_argument('--db', default='production.db', help='Database with quizzes and attempts')
+    parser.add_argument('--min-attempts', type=int, default=DEFAULT_MIN_ATTEMPTS)
+    parser.add_argument('--max-rate', type=float, help='Only questions at or below this correct rate')
+    parser.add_argument('--rescore', action='store_true', help='Re-score all attempts and rebuild the stats')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    ensure_attempt_tables(conn)
+    if args.rescore:
+        print(f"Re-scored attempts, {rescore_attempts(conn)} changed")
+    print(f"Folded {refresh_question_stats(conn)} new attempts")
+    for stat in question_stats(conn, args.min_attempts, args.max_rate):
+        print(f"{stat['correct_rate']:>6.0%}  {stat['attempts']:>5}  {stat['quiz_title']}: {stat['question']}")
+    conn.close()
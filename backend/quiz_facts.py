@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Quiz Fact Index
+====================================
+
+Content-aware quiz questions built from facts extracted from each article.
+
+An article is read once: ``extract_facts`` pulls out named entities
+(capitalised word runs), numbers with their units, and key terms (frequent
+content words, title words weighted up), each with the sentence it came
+from. ``FactIndex`` stores them per article in ``article_facts``, keyed by a
+hash of the article text, so re-generating a quiz is an index lookup and
+only edited articles are re-read.
+
+Questions are fill-in-the-blank on fact sentences, key-term, topic and
+category questions. Wrong answers are drawn from the same kind of fact in
+other articles (numbers with the same unit, other titles, other stories'
+key terms), falling back to built-in options for a small corpus.
+
+Each question's id is a hash of its kind, text and correct answer, so
+re-generating a quiz keeps the ids of questions that still ask the same
+thing even when the corpus, and with it the distractors, has changed. Stats
+and answers keyed by question id carry over. Options are shuffled with a
+seed taken from that id, so the correct answer moves around between
+questions but stays put while the options don't change.
+
+Run this file directly to index a database and preview an article's quiz:
+    python quiz_facts.py --db junior_news_integrated.db --article ARTICLE_ID
+"""
+
+import re
+import json
+import random
+import sqlite3
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_PER_QUIZ = 5
+MAX_ENTITIES = 8
+MAX_NUMBERS = 6
+MAX_KEY_TERMS = 6
+
+CATEGORIES = ['technology', 'science', 'environment', 'health', 'education',
+              'sports', 'culture', 'animals', 'space', 'general']
+
+STOPWORDS = frozenset('''
+    a about after all also an and any are around as at be because been before being
+    but by can could did do does during each even every for from had has have he her
+    here him his how i if in into is it its just kids like made make many more most
+    much my new no not now of off on one only or other our out over she so some such
+    than that the their them then there these they this those through to too up us
+    very was we were what when where which while who why will with would you young
+    your amazing incredible children people world story today week year years
+'''.split())
+
+# Used when the corpus doesn't have enough facts of a kind yet
+FALLBACK_KEY_TERMS = ['volcano', 'orchestra', 'marathon', 'dinosaur', 'rainforest',
+                      'telescope', 'recycling', 'championship', 'glacier', 'robotics']
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+WORD = re.compile(r"[A-Za-z][A-Za-z'\-]*")
+NUMBER = re.compile(r"\b(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)(\s*(?:%|percent\b))?(?:\s+([a-z]+))?")
+
+FACT_KINDS = ('entity', 'number', 'term')
+
+# Lower-case words allowed inside a name ("Trees for Tomorrow", "Bay of Fundy")
+NAME_JOINERS = ('of', 'for', 'the', 'de')
+
+def content_hash(title: str, content: str) -> str:
+    return hashlib.sha1(f"{title}\n{content}".encode('utf-8')).hexdigest()
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_SPLIT.split(text or '') if s.strip()]
+
+def _entities(sentences: List[str]) -> List[Tuple[str, str]]:
+    """Runs of capitalised words; a lone word opening a sentence only counts
+    if it is also capitalised mid-sentence somewhere"""
+    found, mid_sentence = [], set()
+    for sentence in sentences:
+        words = list(WORD.finditer(sentence))
+        run = []
+        for position, match in enumerate(words + [None]):
+            word = match.group() if match else ''
+            if word[:1].isupper() or (run and word in NAME_JOINERS and position + 1 < len(words)
+                                      and words[position + 1].group()[:1].isupper()):
+                run.append((position, word))
+                continue
+            # Drop capitalised function words ("The", "A") leading a run
+            while run and run[0][1].lower() in STOPWORDS:
+                run.pop(0)
+            if run:
+                names = [w for _, w in run]
+                starts_sentence = run[0][0] == 0
+                if not starts_sentence:
+                    mid_sentence.update(names)
+                found.append((' '.join(names), sentence, starts_sentence and len(names) == 1))
+            run = []
+    return [(name, sentence) for name, sentence, lone_opener in found
+            if not lone_opener or name in mid_sentence]
+
+def extract_facts(title: str, content: str) -> List[Dict]:
+    """Entities, numbers and key terms of an article, each with its source sentence"""
+    sentences = _sentences(content)
+    facts = []
+
+    counts = {}
+    first_sentence = {}
+    for name, sentence in _entities(sentences):
+        counts[name] = counts.get(name, 0) + 1
+        first_sentence.setdefault(name, sentence)
+    for name in sorted(counts, key=lambda n: -counts[n])[:MAX_ENTITIES]:
+        facts.append({'kind': 'entity', 'value': name, 'unit': '',
+                      'sentence': first_sentence[name], 'weight': counts[name]})
+
+    seen_numbers = set()
+    for sentence in sentences:
+        for match in NUMBER.finditer(sentence):
+            value = match.group(1)
+            unit = 'percent' if match.group(2) else (match.group(3) or '')
+            # A following verb or adverb ("16 worked") is not a unit
+            if unit in STOPWORDS or unit.endswith(('ed', 'ly', 'ing')):
+                unit = ''
+            if (value, unit) in seen_numbers or len(seen_numbers) >= MAX_NUMBERS:
+                continue
+            seen_numbers.add((value, unit))
+            facts.append({'kind': 'number', 'value': value, 'unit': unit,
+                          'sentence': sentence, 'weight': 1.0})
+
+    entity_words = {w.lower() for fact in facts if fact['kind'] == 'entity' for w in fact['value'].split()}
+    title_words = {w.lower() for w in WORD.findall(title or '')}
+    scores, term_sentence = {}, {}
+    for sentence in sentences:
+        for word in WORD.findall(sentence):
+            term = word.lower()
+            if len(term) < 5 or term in STOPWORDS or term in entity_words:
+                continue
+            scores[term] = scores.get(term, 0) + (2 if term in title_words else 1)
+            term_sentence.setdefault(term, sentence)
+    for term in sorted(scores, key=lambda t: -scores[t])[:MAX_KEY_TERMS]:
+        facts.append({'kind': 'term', 'value': term, 'unit': '',
+                      'sentence': term_sentence[term], 'weight': scores[term]})
+
+    return facts
+
+def extract_article_facts(article: Sequence) -> Tuple:
+    """(id, title, content, category) -> index row; module-level so pool workers can run it"""
+    article_id, title, content, category = article
+    return article_id, title, category, content_hash(title, content), extract_facts(title, content)
+
+class DistractorPool:
+    """Wrong-answer candidates per fact kind, drawn from other articles.
+
+    Values are deduplicated once at load time and sampled at random, so a
+    pick costs the same however large the corpus gets.
+    """
+
+    # Below this many values, filter the whole list instead of sampling
+    SCAN_LIMIT = 64
+
+    def __init__(self, facts: Iterable[Tuple] = (), titles: Iterable[Tuple[str, str]] = ()):
+        # facts: (article_id, kind, value, unit); titles: (article_id, title)
+        owners = {}
+        for article_id, kind, value, unit in facts:
+            key = (kind, unit if kind == 'number' else '')
+            owners.setdefault(key, {}).setdefault(value, set()).add(article_id)
+        for article_id, title in titles:
+            owners.setdefault(('title', ''), {}).setdefault(title, set()).add(article_id)
+        self.owners = owners
+        self.values = {key: sorted(values) for key, values in owners.items()}
+
+    def _pick(self, key: Tuple[str, str], article_id: str, n: int,
+              rng: random.Random, avoid: Iterable[str]) -> List[str]:
+        values = self.values.get(key, [])
+        owners = self.owners.get(key, {})
+        avoid = {a.lower() for a in avoid}
+
+        def usable(value):
+            return value.lower() not in avoid and owners[value] != {article_id}
+
+        if len(values) <= self.SCAN_LIMIT:
+            usable_values = [v for v in values if usable(v)]
+            return rng.sample(usable_values, min(n, len(usable_values)))
+        picked = []
+        for _ in range(n * 20):
+            value = rng.choice(values)
+            if value not in picked and usable(value):
+                picked.append(value)
+                if len(picked) == n:
+                    break
+        return picked
+
+    def facts(self, kind: str, article_id: str, n: int, rng: random.Random,
+              avoid: Iterable[str] = (), unit: str = '') -> List[str]:
+        return self._pick((kind, unit), article_id, n, rng, avoid)
+
+    def other_titles(self, article_id: str, n: int, rng: random.Random, avoid: Iterable[str] = ()) -> List[str]:
+        return self._pick(('title', ''), article_id, n, rng, avoid)
+
+def _number_variants(value: str, rng: random.Random) -> List[str]:
+    """Plausible wrong numbers close to ``value``, formatted the same way"""
+    number = float(value.replace(',', ''))
+    factors = [0.5, 2, 10, 0.1, 1.5, 3]
+    rng.shuffle(factors)
+    variants = []
+    for factor in factors:
+        candidate = number * factor
+        if '.' not in value:
+            candidate = round(candidate)
+        text = f"{candidate:,}" if ',' in value else f"{candidate:g}"
+        if candidate > 0 and text != value and text not in variants:
+            variants.append(text)
+    return variants
+
+def _blank(sentence: str, value: str) -> Optional[str]:
+    """``sentence`` with ``value`` blanked out; None unless it occurs exactly once as a whole token"""
+    # Not part of a longer word or number ("4" in "2024" or "4.5", "Mars" in "Marshall")
+    pattern = rf'(?<!\w)(?<!\d[.,]){re.escape(value)}(?!\w)(?![.,]\d)'
+    if len(re.findall(pattern, sentence)) != 1:
+        return None
+    return re.sub(pattern, '_____', sentence)
+
+def _blankable(facts: List[Dict], limit: int) -> List[Tuple[Dict, str]]:
+    """Up to ``limit`` ``(fact, blanked sentence)`` pairs, skipping ambiguous facts"""
+    blanked = ((fact, _blank(fact['sentence'], fact['value'])) for fact in facts)
+    return [(fact, text) for fact, text in blanked if text][:limit]
+
+def question_id(kind: str, text: str, correct: str) -> str:
+    """Id derived from what a question asks, so it survives re-generation"""
+    return 'q' + hashlib.sha256(f"{kind}\n{text}\n{correct}".encode('utf-8')).hexdigest()[:8]
+
+def _question(kind: str, text: str, correct: str, wrong: List[str], explanation: str) -> Dict:
+    qid = question_id(kind, text, correct)
+    options = [correct] + wrong[:3]
+    # Seeded by the question, so the answer keeps its place while the
+    # distractors stay the same
+    random.Random(qid).shuffle(options)
+    return {'id': qid, 'question': text, 'options': options,
+            'correct_answer': options.index(correct), 'explanation': explanation}
+
+def build_questions(article_id: str, title: str, category: str, facts: List[Dict],
+                    pool: Optional[DistractorPool] = None, count: int = QUESTIONS_PER_QUIZ,
+                    content: str = '') -> List[Dict]:
+    """Turn an article's facts into up to ``count`` multiple-choice questions"""
+    pool = pool or DistractorPool()
+    rng = random.Random(article_id or title)
+    by_kind = {kind: [f for f in facts if f['kind'] == kind] for kind in FACT_KINDS}
+    candidates = []
+
+    for fact, blanked in _blankable(by_kind['number'], 2):
+        wrong = pool.facts('number', article_id, 3, rng, avoid=[fact['value']], unit=fact['unit'])
+        wrong += [v for v in _number_variants(fact['value'], rng) if v not in wrong]
+        candidates.append(('number', _question(
+            'number', f'Fill in the blank: "{blanked}"',
+            fact['value'], wrong, f'The story says: "{fact["sentence"]}"')))
+
+    entity_names = [f['value'] for f in by_kind['entity']]
+    for fact, blanked in _blankable(by_kind['entity'], 2):
+        wrong = pool.facts('entity', article_id, 3, rng, avoid=entity_names)
+        wrong += [name for name in entity_names
+                  if name != fact['value'] and name not in fact['sentence'] and name not in wrong]
+        if len(wrong) >= 3:
+            candidates.append(('entity', _question(
+                'entity', f'Fill in the blank: "{blanked}"',
+                fact['value'], wrong, f'The story says: "{fact["sentence"]}"')))
+
+    if by_kind['term']:
+        fact = by_kind['term'][0]
+        text = f"{title} {content} {' '.join(f['sentence'] for f in facts)}".lower()
+        wrong = [t for t in pool.facts('term', article_id, 6, rng) if t not in text]
+        wrong += [t for t in FALLBACK_KEY_TERMS if t not in text and t not in wrong]
+        candidates.append(('term', _question(
+            'term', 'Which of these words is an important part of this story?',
+            fact['value'], rng.sample(wrong[:6], min(3, len(wrong))),
+            f'The story talks about {fact["value"]}: "{fact["sentence"]}"')))
+
+    other_titles = pool.other_titles(article_id, 3, rng, avoid=[title])
+    if len(other_titles) == 3:
+        candidates.append(('topic', _question('topic', 'Which headline belongs to this story?', title,
+                                              other_titles, f'This story is "{title}".')))
+
+    category = (category or 'general').lower()
+    others = [c for c in CATEGORIES if c != category]
+    candidates.append(('category', _question('category', 'What kind of story is this?', category.title(),
+                                             [c.title() for c in rng.sample(others, 3)],
+                                             f'This is a {category} story!')))
+
+    # One question of each kind first, then second numbers/entities
+    kinds = {kind for kind, _ in candidates}
+    selected = [next(q for k, q in candidates if k == kind) for kind in
+                ('number', 'entity', 'term', 'topic', 'category') if kind in kinds]
+    selected += [q for _, q in candidates if q not in selected]
+    selected = selected[:count]
+    rng.shuffle(selected)
+    return selected
+
+def as_lettered(questions: List[Dict]) -> List[Dict]:
+    """Convert to the A-D option format the automation pipeline's Quiz uses"""
+    letters = 'ABCD'
+    return [{**q, 'id': f"q{i + 1}",
+             'options': {letters[j]: option for j, option in enumerate(q['options'])},
+             'correct_answer': letters[q['correct_answer']]}
+            for i, q in enumerate(questions)]
+
+class FactIndex:
+    """Per-article fact store in SQLite, plus the corpus-wide distractor pool"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._pool = None
+        self.ensure_tables()
+
+    def ensure_tables(self):
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS article_fact_index (
+                article_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                category TEXT,
+                content_hash TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS article_facts (
+                article_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                unit TEXT DEFAULT '',
+                sentence TEXT,
+                weight REAL DEFAULT 1,
+                FOREIGN KEY (article_id) REFERENCES article_fact_index (article_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_article_facts_article ON article_facts (article_id);
+        ''')
+
+    def store(self, rows: Iterable[Tuple]):
+        """Write ``extract_article_facts`` rows, replacing any earlier facts (caller commits)"""
+        rows = list(rows)
+        ids = [(row[0],) for row in rows]
+        now = datetime.now().isoformat()
+        cursor = self.conn.cursor()
+        cursor.executemany("DELETE FROM article_facts WHERE article_id = ?", ids)
+        cursor.executemany('''
+            INSERT OR REPLACE INTO article_fact_index (article_id, title, category, content_hash, indexed_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(article_id, title, category, digest, now) for article_id, title, category, digest, _ in rows])
+        cursor.executemany('''
+            INSERT INTO article_facts (article_id, kind, value, unit, sentence, weight)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(article_id, f['kind'], f['value'], f['unit'], f['sentence'], f['weight'])
+              for article_id, _, _, _, facts in rows for f in facts])
+        self._pool = None
+
+    def index_article(self, article_id: str, title: str, content: str, category: str) -> bool:
+        """Extract and store facts unless the indexed text is unchanged; True if re-indexed"""
+        row = self.conn.execute("SELECT content_hash FROM article_fact_index WHERE article_id = ?",
+                                (article_id,)).fetchone()
+        if row and row[0] == content_hash(title, content):
+            return False
+        self.store([extract_article_facts((article_id, title, content, category))])
+        return True
+
+    def facts_for(self, article_ids: List[str]) -> Dict[str, Dict]:
+        """{article_id: {'title', 'category', 'facts'}} for indexed articles"""
+        ids = json.dumps(list(article_ids))
+        articles = {row[0]: {'title': row[1], 'category': row[2], 'facts': []}
+                    for row in self.conn.execute('''
+                        SELECT article_id, title, category FROM article_fact_index
+                        WHERE article_id IN (SELECT value FROM json_each(?))
+                    ''', (ids,))}
+        for article_id, kind, value, unit, sentence, weight in self.conn.execute('''
+            SELECT article_id, kind, value, unit, sentence, weight FROM article_facts
+            WHERE article_id IN (SELECT value FROM json_each(?))
+            ORDER BY rowid
+        ''', (ids,)):
+            articles[article_id]['facts'].append({'kind': kind, 'value': value, 'unit': unit,
+                                                  'sentence': sentence, 'weight': weight})
+        return articles
+
+    def pool(self) -> DistractorPool:
+        """Distractor pool over the whole index, loaded once until the index changes"""
+        if self._pool is None:
+            self._pool = DistractorPool(
+                self.conn.execute("SELECT article_id, kind, value, unit FROM article_facts"),
+                self.conn.execute("SELECT article_id, title FROM article_fact_index"))
+        return self._pool
+
+    def questions_for(self, article_id: str, count: int = QUESTIONS_PER_QUIZ) -> Optional[List[Dict]]:
+        """Quiz questions from the index alone; None if the article isn't indexed"""
+        article = self.facts_for([article_id]).get(article_id)
+        if article is None:
+            return None
+        return build_questions(article_id, article['title'], article['category'], article['facts'],
+                               self.pool(), count)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the quiz fact index and preview quizzes')
+    parser.add_argument('--db', default='junior_news_integrated.db', help='Database with an articles table')
+    parser.add_argument('--article', help='Article id to preview a quiz for')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    index = FactIndex(conn)
+    reindexed = sum(index.index_article(*row) for row in conn.execute(
+        "SELECT id, title, content, category FROM articles").fetchall())
+    conn.commit()
+    print(f"Indexed {reindexed} new or changed articles")
+
+    if args.article:
+        for question in index.questions_for(args.article) or []:
+            print(f"\n{question['question']}")
+            for i, option in enumerate(question['options']):
+                print(f"   {'*' if i == question['correct_answer'] else ' '} {option}")
+    conn.close()
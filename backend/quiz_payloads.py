@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Pre-serialized Quiz Payloads
+=================================================
+
+Quiz responses are built once, when a quiz is written, instead of on every
+read.
+
+Triggers on ``quizzes`` render the full JSON response body
+(``{"success": true, "quiz": {...}}``) into ``quiz_payloads`` with SQLite's
+JSON functions, so every writer (API, quiz scripts, automation) keeps it
+current. Each write takes the next ``version``; a deleted quiz leaves a
+tombstone row with a NULL payload so the version never goes backwards.
+
+``QuizPayloadCache`` keeps encoded payloads in memory per article. A hit is
+a dict lookup; at most every ``check_interval`` seconds it pulls rows with a
+newer version than it has seen and refreshes only those articles, so writes
+from other processes show up without flushing the whole cache.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND_PAYLOAD = b'{"success": false, "error": "Quiz not found"}'
+
+TRIGGER_NAMES = ('quiz_payloads_insert', 'quiz_payloads_update', 'quiz_payloads_delete')
+
+def _quiz_columns(conn: sqlite3.Connection) -> List[str]:
+    return [row[1] for row in conn.execute("PRAGMA table_info(quizzes)").fetchall()]
+
+def _payload_sql(columns: List[str], row: str) -> str:
+    """json_object(...) expression rendering one quizzes row as the API response"""
+    fields = []
+    for column in columns:
+        value = f"{row}.{column}"
+        if column == 'questions':
+            value = f"CASE WHEN json_valid({value}) THEN json({value}) ELSE {value} END"
+        fields.append(f"'{column}', {value}")
+    return f"json_object('success', json('true'), 'quiz', json_object({', '.join(fields)}))"
+
+NEXT_VERSION = "(SELECT COALESCE(MAX(version), 0) + 1 FROM quiz_payloads)"
+
+def ensure_quiz_payloads(conn: sqlite3.Connection) -> bool:
+    """Create the payload table and triggers for this database's quizzes schema.
+
+    Triggers are rebuilt if the quizzes columns changed, and quizzes without
+    a payload are backfilled. Returns False if there is no quizzes table yet.
+    """
+    columns = _quiz_columns(conn)
+    if not columns:
+        return False
+
+    cursor = conn.cursor()
+    cursor.executescript('''
+        CREATE TABLE IF NOT EXISTS quiz_payloads (
+            article_id TEXT PRIMARY KEY,
+            quiz_id TEXT,
+            version INTEGER NOT NULL,
+            payload TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_quiz_payloads_version ON quiz_payloads (version);
+    ''')
+
+    upsert = f'''
+        INSERT OR REPLACE INTO quiz_payloads (article_id, quiz_id, version, payload, updated_at)
+        VALUES (NEW.article_id, NEW.id, {NEXT_VERSION}, {_payload_sql(columns, 'NEW')}, CURRENT_TIMESTAMP);
+    '''
+    # The column list is part of the trigger, so a schema change means new triggers
+    signature = f"-- columns: {','.join(columns)}"
+    existing = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'quiz_payloads_insert'"
+    ).fetchone()
+    if not existing or signature not in existing[0]:
+        for name in TRIGGER_NAMES:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER quiz_payloads_insert AFTER INSERT ON quizzes BEGIN {signature}\n{upsert} END")
+        cursor.execute(f"CREATE TRIGGER quiz_payloads_update AFTER UPDATE ON quizzes BEGIN {upsert} END")
+        # Tombstone the article, then fall back to any other quiz it still has
+        cursor.execute(f'''
+            CREATE TRIGGER quiz_payloads_delete AFTER DELETE ON quizzes BEGIN
+                INSERT OR REPLACE INTO quiz_payloads (article_id, quiz_id, version, payload, updated_at)
+                VALUES (OLD.article_id, NULL, {NEXT_VERSION}, NULL, CURRENT_TIMESTAMP);
+                INSERT OR REPLACE INTO quiz_payloads (article_id, quiz_id, version, payload, updated_at)
+                SELECT q.article_id, q.id, {NEXT_VERSION}, {_payload_sql(columns, 'q')}, CURRENT_TIMESTAMP
+                FROM quizzes q WHERE q.article_id = OLD.article_id LIMIT 1;
+            END
+        ''')
+        # Stale payloads were rendered with the old columns
+        cursor.execute("DELETE FROM quiz_payloads")
+        logger.info(f"Built quiz payload triggers for columns: {', '.join(columns)}")
+
+    base_version = cursor.execute("SELECT COALESCE(MAX(version), 0) FROM quiz_payloads").fetchone()[0]
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO quiz_payloads (article_id, quiz_id, version, payload)
+        SELECT q.article_id, q.id, ? + q.rowid, {_payload_sql(columns, 'q')}
+        FROM quizzes q
+        WHERE q.article_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM quiz_payloads p WHERE p.article_id = q.article_id)
+    ''', (base_version,))
+    conn.commit()
+    return True
+
+class QuizPayloadCache:
+    """In-memory article_id -> encoded quiz response, kept fresh by version"""
+
+    def __init__(self, db_path: str, check_interval: float = 1.0):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self._payloads: Dict[str, Optional[bytes]] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _sync(self, conn: sqlite3.Connection):
+        """Refresh cached articles whose payload changed since the last sync"""
+        if self._version is None:
+            row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM quiz_payloads").fetchone()
+            self._version = row[0]
+            return
+        changed = conn.execute('''
+            SELECT article_id, payload, version FROM quiz_payloads WHERE version > ? ORDER BY version
+        ''', (self._version,)).fetchall()
+        for article_id, payload, version in changed:
+            if article_id in self._payloads:
+                self._payloads[article_id] = payload.encode('utf-8') if payload is not None else None
+            self._version = version
+
+    def get(self, article_id: str) -> Optional[bytes]:
+        """Encoded response body for an article's quiz, or None if it has no quiz"""
+        now = time.monotonic()
+        if self._ready and now - self._checked_at < self.check_interval and article_id in self._payloads:
+            return self._payloads[article_id]
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                if not self._ready:
+                    if not ensure_quiz_payloads(conn):
+                        return None
+                    self._ready = True
+                if now - self._checked_at >= self.check_interval:
+                    self._sync(conn)
+                    self._checked_at = now
+                if article_id not in self._payloads:
+                    row = conn.execute("SELECT payload FROM quiz_payloads WHERE article_id = ?",
+                                       (article_id,)).fetchone()
+                    self._payloads[article_id] = row[0].encode('utf-8') if row and row[0] else None
+                return self._payloads[article_id]
+            finally:
+                conn.close()
+
+    def forget(self, article_id: str):
+        """Drop one article so this process sees its own write immediately"""
+        self._payloads.pop(article_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._payloads.clear()
+            self._version = None
+            self._ready = False
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Readability Scoring
+========================================
+
+Batch Flesch-Kincaid scoring for story text. Syllable counts are memoized
+per word, so scoring a week's candidates (which share most of their
+vocabulary) only analyses each distinct word once.
+
+Scores are stored on candidate_stories (reading_grade, word_count) so the
+editorial portal can sort and filter by reading level without recomputing.
+"""
+
+import re
+import sqlite3
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+SENTENCE_END_RE = re.compile(r'[.!?]+(?:\s|$)')
+VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+SOUNDED_ES_RE = re.compile(r'(?:[sxz]|ch|sh|[aeiouy])es$')
+SOUNDED_ED_RE = re.compile(r'(?:[td]|[aeiou])ed$')
+SPLIT_VOWELS_RE = re.compile(r'(?<![ct])ia|ien|(?<!q)ua|uo')
+
+@dataclass
+class ReadabilityScore:
+    word_count: int
+    sentence_count: int
+    syllable_count: int
+    reading_grade: float
+    reading_ease: float
+
+@lru_cache(maxsize=50000)
+def syllable_count(word: str) -> int:
+    """Estimate syllables in a single lowercase word"""
+    if len(word) <= 3:
+        return 1
+
+    count = len(VOWEL_GROUP_RE.findall(word))
+
+    # Silent endings: "make", "whale", "makes", "cared" (but not "table", "boxes", "needed")
+    if word.endswith('e') and not word.endswith(('le', 'ee', 'ye')):
+        count -= 1
+    elif word.endswith('le') and word[-3] in 'aeiouy':
+        count -= 1
+    elif word.endswith('es') and not SOUNDED_ES_RE.search(word):
+        count -= 1
+    elif word.endswith('ed') and not SOUNDED_ED_RE.search(word):
+        count -= 1
+
+    # Vowel pairs that are usually two syllables ("giant", "scientist", "usual")
+    count += len(SPLIT_VOWELS_RE.findall(word))
+
+    return max(1, count)
+
+def analyze_text(text: str) -> ReadabilityScore:
+    """Compute Flesch-Kincaid grade level and reading ease for one text"""
+    words = [w.lower() for w in WORD_RE.findall(text or '')]
+    word_count = len(words)
+    if word_count == 0:
+        return ReadabilityScore(0, 0, 0, 0.0, 100.0)
+
+    sentence_count = max(1, len(SENTENCE_END_RE.findall(text)))
+    syllables = sum(syllable_count(w) for w in words)
+
+    words_per_sentence = word_count / sentence_count
+    syllables_per_word = syllables / word_count
+
+    grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+
+    return ReadabilityScore(
+        word_count=word_count,
+        sentence_count=sentence_count,
+        syllable_count=syllables,
+        reading_grade=round(max(0.0, grade), 1),
+        reading_ease=round(ease, 1)
+    )
+
+def analyze_batch(texts: Iterable[str]) -> List[ReadabilityScore]:
+    """Score many texts in one pass, sharing the memoized syllable table"""
+    return [analyze_text(text) for text in texts]
+
+def reading_level_label(grade: Optional[float]) -> str:
+    """Human-readable description of a grade level for editors"""
+    if grade is None:
+        return 'Not scored'
+    if grade <= 2:
+        return 'Beginning readers'
+    if grade <= 4:
+        return 'Early readers'
+    if grade <= 6:
+        return 'Confident readers'
+    return 'Challenging'
+
+def ensure_readability_columns(conn: sqlite3.Connection, table: str = 'candidate_stories'):
+    """Add reading level columns to an existing table if they are missing"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = [column[1] for column in cursor.fetchall()]
+
+    if 'reading_grade' not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN reading_grade REAL")
+    if 'word_count' not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN word_count INTEGER")
+
+def backfill_reading_levels(conn: sqlite3.Connection) -> int:
+    """Score every candidate story that has no stored reading level yet"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, COALESCE(final_content, content)
+        FROM candidate_stories
+        WHERE reading_grade IS NULL
+    ''')
+    rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    scores = analyze_batch(content for _, content in rows)
+    cursor.executemany('''
+        UPDATE candidate_stories SET reading_grade = ?, word_count = ? WHERE id = ?
+    ''', [(score.reading_grade, score.word_count, story_id)
+          for (story_id, _), score in zip(rows, scores)])
+
+    logger.info(f"Scored reading level for {len(rows)} candidate stories")
+    return len(rows)
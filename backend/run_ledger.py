@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Automation Run Ledger
+==========================================
+
+Checkpoints every stage of a daily automation run so a failed run can be
+resumed instead of restarted.
+
+Each run (one per day) records, for every story, which of the stages in
+``RUN_STAGES`` finished and what they produced. Small outputs (story
+metadata, scripts, quizzes) are stored as JSON in ``run_stages``. Files
+(audio, images, video) are copied into a content-addressed store under
+``ARTIFACT_ROOT`` and referenced by SHA-256, so a checkpoint stays valid even
+if the original working file is overwritten or cleaned up. On a rerun, a
+finished stage is skipped and its output and files are restored from the
+ledger.
+
+Usage:
+    python run_ledger.py --db production.db              # Show today's run
+    python run_ledger.py --db production.db --date 2025-09-12
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RUN_STAGES = ('selected', 'scripted', 'audio', 'images', 'video', 'quiz', 'saved')
+
+ARTIFACT_ROOT = Path(os.getenv('RUN_ARTIFACT_DIR', 'generated_videos/artifacts'))
+
+HASH_CHUNK_SIZE = 1 << 20
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class RunLedger:
+    """Stage checkpoints and hash-addressed artifacts for one day's run"""
+
+    def __init__(self, db_path: str, run_date: Optional[date] = None,
+                 artifact_root: Path = ARTIFACT_ROOT):
+        self.db_path = db_path
+        self.run_date = (run_date or date.today()).isoformat()
+        self.artifact_root = Path(artifact_root)
+        self._init_tables()
+        self.run_id = self._open_run()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_tables(self):
+        conn = self._connect()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS automation_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_date TEXT NOT NULL,
+                status TEXT DEFAULT 'running',
+                attempts INTEGER DEFAULT 1,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_automation_runs_date
+                ON automation_runs (run_date, status);
+
+            CREATE TABLE IF NOT EXISTS run_stages (
+                run_id INTEGER NOT NULL,
+                story_key TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                story_index INTEGER,
+                output TEXT,
+                artifacts TEXT,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, story_key, stage),
+                FOREIGN KEY (run_id) REFERENCES automation_runs (id)
+            );
+
+            CREATE TABLE IF NOT EXISTS run_artifacts (
+                hash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _open_run(self) -> int:
+        """Resume today's unfinished run if there is one, otherwise start a new one"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id FROM automation_runs
+            WHERE run_date = ? AND status != 'completed'
+            ORDER BY id DESC LIMIT 1
+        ''', (self.run_date,))
+        row = cursor.fetchone()
+        if row:
+            run_id = row[0]
+            cursor.execute('''
+                UPDATE automation_runs SET status = 'running', attempts = attempts + 1, error = NULL
+                WHERE id = ?
+            ''', (run_id,))
+            logger.info(f"Resuming automation run {run_id} for {self.run_date}")
+        else:
+            cursor.execute('''
+                INSERT INTO automation_runs (run_date, started_at) VALUES (?, ?)
+            ''', (self.run_date, datetime.now().isoformat()))
+            run_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return run_id
+
+    def store_artifact(self, path: str) -> str:
+        """Copy a file into the content-addressed store and return its hash"""
+        digest = file_digest(path)
+        target = self.artifact_root / digest[:2] / f"{digest}{Path(path).suffix}"
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            partial = target.with_name(target.name + '.partial')
+            shutil.copyfile(path, partial)
+            os.replace(partial, target)
+
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR IGNORE INTO run_artifacts (hash, path, size, created_at) VALUES (?, ?, ?, ?)
+        ''', (digest, str(target), target.stat().st_size, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        return digest
+
+    def artifact_path(self, digest: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute("SELECT path FROM run_artifacts WHERE hash = ?", (digest,)).fetchone()
+        conn.close()
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def restore_artifact(self, digest: str, path: str) -> str:
+        """Put a stored artifact back at ``path`` (for tools that expect fixed names)"""
+        stored = self.artifact_path(digest)
+        if stored is None:
+            raise FileNotFoundError(f"Artifact {digest} is missing from the store")
+        if not os.path.exists(path) or file_digest(path) != digest:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            shutil.copyfile(stored, path)
+        return path
+
+    def checkpoint(self, story_key: str, stage: str, output: Any = None,
+                   files: Optional[Dict[str, Any]] = None, story_index: Optional[int] = None):
+        """Record a finished stage. ``files`` maps names to a path or list of paths"""
+        if stage not in RUN_STAGES:
+            raise ValueError(f"Unknown run stage: {stage}")
+
+        hashes = {}
+        for name, paths in (files or {}).items():
+            if isinstance(paths, (list, tuple)):
+                hashes[name] = [self.store_artifact(p) for p in paths]
+            else:
+                hashes[name] = self.store_artifact(paths)
+
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO run_stages
+                (run_id, story_key, stage, story_index, output, artifacts, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (self.run_id, story_key, stage, story_index, json.dumps(output),
+              json.dumps(hashes), datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def completed(self, story_key: str, stage: str) -> Optional[Dict]:
+        """A finished stage's output and artifact paths, or None if it has to run.
+
+        A stage whose stored files have gone missing counts as not finished.
+        """
+        conn = self._connect()
+        row = conn.execute('''
+            SELECT output, artifacts FROM run_stages
+            WHERE run_id = ? AND story_key = ? AND stage = ?
+        ''', (self.run_id, story_key, stage)).fetchone()
+        conn.close()
+        if not row:
+            return None
+
+        files = {}
+        for name, hashes in json.loads(row[1] or '{}').items():
+            digests = hashes if isinstance(hashes, list) else [hashes]
+            paths = [self.artifact_path(digest) for digest in digests]
+            if None in paths:
+                logger.warning(f"Artifacts for {story_key}/{stage} are missing; stage will rerun")
+                return None
+            files[name] = paths if isinstance(hashes, list) else paths[0]
+        return {'output': json.loads(row[0]), 'files': files,
+                'hashes': json.loads(row[1] or '{}')}
+
+    def selected_stories(self) -> List[Dict]:
+        """Stories checkpointed at the 'selected' stage, in their original order"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT output FROM run_stages
+            WHERE run_id = ? AND stage = 'selected'
+            ORDER BY story_index
+        ''', (self.run_id,)).fetchall()
+        conn.close()
+        return [json.loads(row[0]) for row in rows]
+
+    def finish(self, error: Optional[str] = None):
+        conn = self._connect()
+        conn.execute('''
+            UPDATE automation_runs SET status = ?, finished_at = ?, error = ? WHERE id = ?
+        ''', ('failed' if error else 'completed', datetime.now().isoformat(), error, self.run_id))
+        conn.commit()
+        conn.close()
+
+    def progress(self) -> Dict[str, List[str]]:
+        """Finished stages per story for this run"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT story_key, stage FROM run_stages WHERE run_id = ? ORDER BY story_index, completed_at
+        ''', (self.run_id,)).fetchall()
+        conn.close()
+        progress = {}
+        for story_key, stage in rows:
+            progress.setdefault(story_key, []).append(stage)
+        return progress
+
+def show_run(db_path: str, run_date: str):
+    conn = sqlite3.connect(db_path)
+    runs = conn.execute('''
+        SELECT id, status, attempts, started_at, finished_at, error
+        FROM automation_runs WHERE run_date = ? ORDER BY id
+    ''', (run_date,)).fetchall()
+    if not runs:
+        print(f"No automation runs on {run_date}")
+    for run_id, status, attempts, started_at, finished_at, error in runs:
+        print(f"Run {run_id}: {status} after {attempts} attempt(s), started {started_at}")
+        if error:
+            print(f"   error: {error}")
+        for story_key, stages in conn.execute('''
+            SELECT story_key, group_concat(stage, ', ') FROM run_stages
+            WHERE run_id = ? GROUP BY story_key ORDER BY MIN(story_index)
+        ''', (run_id,)).fetchall():
+            print(f"   {story_key}: {stages}")
+    conn.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect daily automation run checkpoints')
+    parser.add_argument('--db', default='production.db', help='Database holding the run ledger')
+    parser.add_argument('--date', default=date.today().isoformat(), help='Run date (YYYY-MM-DD)')
+    args = parser.parse_args()
+    show_run(args.db, args.date)
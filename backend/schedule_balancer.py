@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Weekly Schedule Balancer
+=============================================
+
+Assigns processed candidate stories to the week's publish days.
+
+Stories are placed one at a time, most urgent first (breaking news, then
+priority_score, then the most expensive to produce), on the day with the
+lowest placement cost:
+
+- category diversity: each story of the same category already on that day
+  costs ``CATEGORY_PENALTY``, so a day doesn't become all science;
+- production load: the day's estimated generation minutes (video, audio,
+  thumbnail and quiz builds) relative to an even share of the week, so the
+  pre-generation queue isn't swamped before a single deadline;
+- priority: high-priority stories pay more for every day they are pushed back.
+
+Stories already scheduled for the week count towards each day's load and
+categories. The plan is written with one ``executemany`` in one transaction,
+or returned as-is for a dry-run preview.
+
+Run this file directly to preview (or write) a week's plan:
+    python schedule_balancer.py --db editorial_workflow.db
+    python schedule_balancer.py --db editorial_workflow.db --week 2025-09-08 --write
+"""
+
+import sqlite3
+import logging
+import argparse
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (offset from Monday, day name) of each publish day
+PUBLISH_DAYS = ((0, 'Monday'), (2, 'Wednesday'), (4, 'Friday'))
+
+# Fixed build minutes per artifact, plus narration-dependent time below
+ARTIFACT_BASE_MINUTES = {
+    'video': 4.0,
+    'audio': 0.5,
+    'thumbnail': 0.5,
+    'quiz': 0.25,
+}
+NARRATION_WORDS_PER_MINUTE = 130
+# Video render minutes per minute of narration
+VIDEO_RENDER_FACTOR = 2.0
+DEFAULT_WORD_COUNT = 300
+
+CATEGORY_PENALTY = 3.0
+LOAD_WEIGHT = 2.0
+PRIORITY_WEIGHT = 1.0
+
+def estimate_generation_minutes(word_count: Optional[int]) -> float:
+    """Rough minutes to build every artifact for a story of ``word_count`` words"""
+    narration = (word_count or DEFAULT_WORD_COUNT) / NARRATION_WORDS_PER_MINUTE
+    return round(sum(ARTIFACT_BASE_MINUTES.values()) + narration * (1 + VIDEO_RENDER_FACTOR), 1)
+
+def week_start(day: Optional[date] = None) -> date:
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+def _effective_priority(story: Dict) -> int:
+    return 10 if story['is_breaking'] else (story['priority_score'] or 5)
+
+def _load_week(cursor: sqlite3.Cursor, monday: date) -> Tuple[List[Dict], List[Dict]]:
+    """Unscheduled processed stories, and stories already scheduled for the week"""
+    cursor.execute('''
+        SELECT cs.id, COALESCE(cs.final_title, cs.title), cs.category, cs.priority_score,
+               cs.is_breaking, cs.word_count, ws.scheduled_date
+        FROM candidate_stories cs
+        LEFT JOIN weekly_schedule ws ON cs.id = ws.candidate_id
+            AND ws.week_start_date = ?
+        WHERE (cs.status = 'processed' AND ws.candidate_id IS NULL)
+           OR ws.status = 'scheduled'
+        ORDER BY cs.approved_date, cs.id
+    ''', (monday.isoformat(),))
+
+    unscheduled, scheduled = [], []
+    for row in cursor.fetchall():
+        story = {
+            'candidate_id': row[0], 'title': row[1], 'category': row[2],
+            'priority_score': row[3], 'is_breaking': bool(row[4]),
+            'estimated_minutes': estimate_generation_minutes(row[5])
+        }
+        if row[6]:
+            story['scheduled_date'] = row[6]
+            scheduled.append(story)
+        else:
+            unscheduled.append(story)
+    return unscheduled, scheduled
+
+def plan_week(cursor: sqlite3.Cursor, monday: date) -> Dict:
+    """Balance the week's unscheduled stories across the publish days.
+
+    Returns ``{'week_start_date', 'assignments': [...], 'days': [...]}`` where
+    each assignment is a story dict with its ``scheduled_date`` and
+    ``day_of_week``, and ``days`` summarises every publish day including
+    stories that were already scheduled.
+    """
+    unscheduled, scheduled = _load_week(cursor, monday)
+    days = [{'scheduled_date': (monday + timedelta(days=offset)).isoformat(),
+             'day_of_week': name, 'stories': 0, 'categories': {}, 'estimated_minutes': 0.0}
+            for offset, name in PUBLISH_DAYS]
+    by_date = {day['scheduled_date']: day for day in days}
+
+    def place(story, day):
+        day['stories'] += 1
+        day['categories'][story['category']] = day['categories'].get(story['category'], 0) + 1
+        day['estimated_minutes'] = round(day['estimated_minutes'] + story['estimated_minutes'], 1)
+
+    for story in scheduled:
+        if story['scheduled_date'] in by_date:
+            place(story, by_date[story['scheduled_date']])
+
+    total_minutes = sum(day['estimated_minutes'] for day in days)
+    total_minutes += sum(story['estimated_minutes'] for story in unscheduled)
+    fair_share = max(total_minutes / len(days), 1.0)
+
+    # Urgent first; among equals, largest builds first so loads even out
+    order = sorted(unscheduled, key=lambda s: (-_effective_priority(s), -s['estimated_minutes'],
+                                               s['candidate_id']))
+    assignments = []
+    for story in order:
+        urgency = _effective_priority(story) / 10
+
+        def cost(indexed_day):
+            index, day = indexed_day
+            return (CATEGORY_PENALTY * day['categories'].get(story['category'], 0)
+                    + LOAD_WEIGHT * (day['estimated_minutes'] + story['estimated_minutes']) / fair_share
+                    + PRIORITY_WEIGHT * urgency * index)
+
+        _, day = min(enumerate(days), key=cost)
+        place(story, day)
+        assignments.append({**story, 'scheduled_date': day['scheduled_date'],
+                            'day_of_week': day['day_of_week']})
+
+    assignments.sort(key=lambda a: (a['scheduled_date'], -_effective_priority(a)))
+    return {'week_start_date': monday.isoformat(), 'assignments': assignments, 'days': days}
+
+def schedule_week(conn: sqlite3.Connection, monday: Optional[date] = None,
+                  dry_run: bool = False) -> Dict:
+    """Plan the week and, unless ``dry_run``, write the plan in one transaction"""
+    monday = monday or week_start()
+    cursor = conn.cursor()
+    if dry_run:
+        return plan_week(cursor, monday)
+
+    try:
+        # Plan inside the write lock so two schedulers can't place the same story
+        cursor.execute("BEGIN IMMEDIATE")
+        plan = plan_week(cursor, monday)
+        cursor.executemany('''
+            INSERT INTO weekly_schedule
+            (week_start_date, candidate_id, scheduled_date, day_of_week, status)
+            VALUES (?, ?, ?, ?, 'scheduled')
+        ''', [(plan['week_start_date'], a['candidate_id'], a['scheduled_date'], a['day_of_week'])
+              for a in plan['assignments']])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    logger.info(f"Scheduled {len(plan['assignments'])} stories for the week of {monday}")
+    return plan
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Balance processed stories across the publish days')
+    parser.add_argument('--db', default='editorial_workflow.db', help='Editorial workflow database')
+    parser.add_argument('--week', type=date.fromisoformat, help='Any date in the week (default: this week)')
+    parser.add_argument('--write', action='store_true', help='Write the plan instead of previewing it')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    plan = schedule_week(conn, week_start(args.week), dry_run=not args.write)
+    conn.close()
+
+    for day in plan['days']:
+        categories = ', '.join(f"{name} x{n}" for name, n in sorted(day['categories'].items()))
+        print(f"{day['day_of_week']} {day['scheduled_date']}: {day['stories']} stories, "
+              f"~{day['estimated_minutes']:.0f} min to build ({categories or 'empty'})")
+    for a in plan['assignments']:
+        print(f"   {a['day_of_week'][:3]}  {a['category']:<12} p{a['priority_score']}  {a['title']}")
+    if not args.write:
+        print("(dry run - nothing written)")
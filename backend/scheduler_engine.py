@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Scheduler Engine
+=====================================
+
+Timer-heap scheduler shared by the editorial backends and automation scripts.
+
+Instead of waking every 60 seconds and comparing hour/minute (which skips a
+job whenever a drifted sleep steps over its minute), jobs sit in a heap
+ordered by their next due time and the thread sleeps until the earliest one.
+
+Each job's last scheduled slot is stored in ``system_settings``. Claiming a
+slot is a single conditional upsert, so when several app workers run a
+scheduler against the same database exactly one of them fires each
+occurrence. On start-up, an occurrence missed while no scheduler was running
+is caught up once if it is still within the job's catch-up window.
+
+When several processes share a database (e.g. gunicorn workers), pass a
+``SchedulerLease`` so only the current leader keeps a timer heap and runs
+jobs. The leader renews a lease row every ``ttl / 3`` seconds; if it dies,
+a follower takes over once the lease expires, i.e. within ``ttl`` plus one
+heartbeat interval.
+"""
+
+import os
+import time
+import uuid
+import heapq
+import socket
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import count as _counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+# Upper bound on a single sleep, so wall-clock jumps (DST, NTP, suspend)
+# are noticed within a few minutes
+MAX_SLEEP_SECONDS = 300
+
+SETTINGS_KEY_PREFIX = 'scheduler.last_run.'
+
+# Seconds a leader's lease stays valid without a heartbeat
+DEFAULT_LEASE_TTL = 30
+
+@dataclass
+class WeeklyJob:
+    """A job that runs at a fixed local time on some days of the week"""
+    name: str
+    days: Tuple[str, ...]
+    at: str  # "HH:MM"
+    func: Callable
+    args: tuple = ()
+    catch_up: timedelta = timedelta(hours=6)
+
+    def __post_init__(self):
+        self.weekdays = {WEEKDAYS[day.lower()] for day in self.days}
+        hour, minute = self.at.split(':')
+        self.hour, self.minute = int(hour), int(minute)
+
+    def _slot_on(self, day: datetime) -> datetime:
+        return day.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First occurrence strictly after ``moment``"""
+        for offset in range(8):
+            slot = self._slot_on(moment + timedelta(days=offset))
+            if slot > moment and slot.weekday() in self.weekdays:
+                return slot
+        raise ValueError(f"Job {self.name} has no weekdays")
+
+    def previous_at_or_before(self, moment: datetime) -> datetime:
+        """Latest occurrence at or before ``moment``"""
+        for offset in range(8):
+            slot = self._slot_on(moment - timedelta(days=offset))
+            if slot <= moment and slot.weekday() in self.weekdays:
+                return slot
+        raise ValueError(f"Job {self.name} has no weekdays")
+
+    def describe(self) -> str:
+        days = ', '.join(day.capitalize() for day in self.days)
+        return f"{days} {self.at} - {self.name}"
+
+class SchedulerLease:
+    """Lease-based leader election through a row in ``scheduler_leases``.
+
+    Acquiring and renewing are the same conditional upsert: it succeeds when
+    the row is free, expired or already ours. A background heartbeat thread
+    keeps renewing while the process is alive, so a long-running job does not
+    let the lease lapse.
+    """
+
+    def __init__(self, db_path: str, name: str = 'automation', ttl: float = DEFAULT_LEASE_TTL):
+        self.db_path = db_path
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat_interval = ttl / 3
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._init_lease_table()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.heartbeat_interval)
+
+    def _init_lease_table(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                acquired_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def try_acquire(self) -> bool:
+        """Take or renew the lease; returns whether this process is the leader"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                    INSERT INTO scheduler_leases (name, holder, acquired_at, heartbeat_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        acquired_at = CASE WHEN scheduler_leases.holder = excluded.holder
+                                           THEN scheduler_leases.acquired_at ELSE excluded.acquired_at END,
+                        holder = excluded.holder,
+                        heartbeat_at = excluded.heartbeat_at,
+                        expires_at = excluded.expires_at
+                    WHERE scheduler_leases.holder = excluded.holder
+                       OR scheduler_leases.expires_at < excluded.heartbeat_at
+                ''', (self.name, self.holder_id, now, now, now + self.ttl))
+                conn.commit()
+                leader = cursor.rowcount == 1
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Can't prove we still hold it, so behave as a follower
+            logger.warning(f"Lease {self.name} heartbeat failed: {e}")
+            leader = False
+
+        if leader != self.is_leader:
+            if leader:
+                logger.info(f"Acquired scheduler lease {self.name} as {self.holder_id}")
+            else:
+                logger.warning(f"Lost scheduler lease {self.name}; {self.holder_id} is now a follower")
+        self.is_leader = leader
+        return leader
+
+    def current_holder(self) -> Optional[Dict]:
+        conn = self._connect()
+        row = conn.execute('''
+            SELECT holder, acquired_at, heartbeat_at, expires_at FROM scheduler_leases WHERE name = ?
+        ''', (self.name,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        return {'holder': row[0], 'acquired_at': row[1], 'heartbeat_at': row[2],
+                'expires_at': row[3], 'expired': row[3] < time.time()}
+
+    def release(self):
+        """Expire the lease now so a follower can take over without waiting out the TTL"""
+        if not self.is_leader:
+            return
+        conn = self._connect()
+        conn.execute("UPDATE scheduler_leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+                     (self.name, self.holder_id))
+        conn.commit()
+        conn.close()
+        self.is_leader = False
+        logger.info(f"Released scheduler lease {self.name}")
+
+    def _heartbeat(self):
+        while not self._stop_event.is_set():
+            self.try_acquire()
+            self._stop_event.wait(self.heartbeat_interval)
+
+    def start(self):
+        """Start acquiring/renewing the lease in a background daemon thread"""
+        if self.thread is None or not self.thread.is_alive():
+            self._stop_event.clear()
+            self.try_acquire()
+            self.thread = threading.Thread(target=self._heartbeat, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.release()
+
+class JobScheduler:
+    """Sleeps until the next due job; fires each occurrence exactly once per database"""
+
+    def __init__(self, db_path: str, jobs: List[WeeklyJob],
+                 lease: Optional[SchedulerLease] = None):
+        self.db_path = db_path
+        self.jobs = jobs
+        self.lease = lease
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._heap = []
+        self._seq = _counter()
+        self._init_state_table()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Several workers may claim the same slot at once; wait for the lock
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_state_table(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS system_settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def last_run(self, job: WeeklyJob) -> Optional[datetime]:
+        """Slot time of the last occurrence any worker claimed for this job"""
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM system_settings WHERE key = ?",
+                           (SETTINGS_KEY_PREFIX + job.name,)).fetchone()
+        conn.close()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def claim(self, job: WeeklyJob, slot: datetime) -> bool:
+        """Atomically record ``slot`` as run; False if another worker already has it"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO system_settings (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+                WHERE system_settings.value < excluded.value
+            ''', (SETTINGS_KEY_PREFIX + job.name, slot.isoformat()))
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def _push(self, slot: datetime, job: WeeklyJob):
+        heapq.heappush(self._heap, (slot, next(self._seq), job))
+
+    def _build_heap(self, now: datetime):
+        self._heap = []
+        for job in self.jobs:
+            last = self.last_run(job)
+            missed = job.previous_at_or_before(now)
+            if last is not None and last < missed and now - missed <= job.catch_up:
+                logger.info(f"Catching up missed run of {job.name} scheduled for {missed}")
+                self._push(missed, job)
+            else:
+                self._push(job.next_after(now), job)
+
+    def next_due(self) -> Optional[Tuple[datetime, str]]:
+        if not self._heap:
+            return None
+        slot, _, job = self._heap[0]
+        return slot, job.name
+
+    def is_leader(self) -> bool:
+        return self.lease is None or self.lease.is_leader
+
+    def run_forever(self):
+        """Run the scheduler loop in the calling thread until stop() is called"""
+        self._stop_event.clear()
+        if self.lease:
+            self.lease.start()
+        for job in self.jobs:
+            logger.info(f"   • {job.describe()}")
+
+        try:
+            # Followers keep no heap; it is rebuilt (with catch-up) on promotion
+            self._heap = []
+            while not self._stop_event.is_set():
+                if not self.is_leader():
+                    self._heap = []
+                    self._stop_event.wait(self.lease.heartbeat_interval)
+                    continue
+                if not self._heap:
+                    self._build_heap(datetime.now())
+
+                slot, _, job = self._heap[0]
+                now = datetime.now()
+                delay = (slot - now).total_seconds()
+                if delay > 0:
+                    max_sleep = MAX_SLEEP_SECONDS
+                    if self.lease:
+                        max_sleep = min(max_sleep, self.lease.heartbeat_interval)
+                    self._stop_event.wait(min(delay, max_sleep))
+                    continue
+
+                heapq.heappop(self._heap)
+                self._push(job.next_after(max(slot, now)), job)
+
+                # Renew synchronously so a leader that was paused past its TTL
+                # cannot fire after a follower has taken over
+                if self.lease and not self.lease.try_acquire():
+                    continue
+
+                if not self.claim(job, slot):
+                    logger.info(f"{job.name} for {slot} already ran in another worker")
+                    continue
+
+                logger.info(f"Running {job.name} (scheduled for {slot})")
+                try:
+                    job.func(*job.args)
+                except Exception as e:
+                    logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            if self.lease:
+                self.lease.stop()
+
+    def start(self):
+        """Run the scheduler in a background daemon thread"""
+        if not self.running:
+            self.thread = threading.Thread(target=self.run_forever, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
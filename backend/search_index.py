@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Full-Text Search
+=====================================
+
+SQLite FTS5 index over published articles and editorial candidate stories.
+
+The index is kept in sync by triggers, so every writer (API, editorial
+workflow, automation scripts) updates it without code changes. Each indexed
+document gets a stable row in ``search_docs`` keyed by (doc_type, doc_id); the
+FTS rowid is that row's id. Keying on the story id rather than the source
+table's rowid means ``INSERT OR REPLACE`` (which does not fire delete
+triggers) still replaces the old index entry instead of leaving a stale one.
+
+The document type is also indexed as the ``kind`` column, so filtering to
+articles or candidates is a doclist intersection inside FTS5 rather than a
+per-row lookup.
+"""
+
+import re
+import html
+import sqlite3
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Indexed sources: doc_type -> table and the expressions used for each FTS column.
+# ``{row}`` is replaced with ``new``/``old`` inside triggers and the table name
+# when rebuilding.
+SEARCH_SOURCES = {
+    'article': {
+        'table': 'articles',
+        'title': '{row}.title',
+        'summary': '{row}.summary',
+        'content': '{row}.content',
+        'category': '{row}.category',
+        'watch': 'title, summary, content, category',
+    },
+    'candidate': {
+        'table': 'candidate_stories',
+        'title': 'COALESCE({row}.final_title, {row}.title)',
+        'summary': 'COALESCE({row}.final_summary, {row}.summary)',
+        'content': 'COALESCE({row}.final_content, {row}.content)',
+        'category': '{row}.category',
+        'watch': 'title, summary, content, category, final_title, final_summary, final_content',
+    },
+}
+
+# BM25 column weights (kind, title, summary, content): title matches outrank
+# summary, summary outranks body; the type filter never affects ranking
+BM25_WEIGHTS = (0.0, 10.0, 4.0, 1.0)
+
+# Above this many matches, results are ordered by recency instead of BM25
+BM25_RANK_LIMIT = 2000
+
+# Match counting stops here; larger totals are reported as "at least"
+COUNT_LIMIT = 10000
+
+# Private-use markers for snippet(); escaped text is then wrapped in <mark>
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def _source_expr(source: Dict, column: str, row: str) -> str:
+    return source[column].format(row=row)
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+def ensure_search_index(conn: sqlite3.Connection):
+    """Create the FTS5 index and sync triggers, backfilling on first run"""
+    cursor = conn.cursor()
+    created = not _table_exists(cursor, 'search_index')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_docs (
+            id INTEGER PRIMARY KEY,
+            doc_type TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            category TEXT,
+            UNIQUE (doc_type, doc_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind, title, summary, content,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+    ''')
+
+    for doc_type, source in SEARCH_SOURCES.items():
+        if not _table_exists(cursor, source['table']):
+            continue
+        _create_sync_triggers(cursor, doc_type, source)
+
+    if created:
+        rebuild_search_index(conn)
+
+def _create_sync_triggers(cursor, doc_type: str, source: Dict):
+    table = source['table']
+    doc_key = f"doc_type = '{doc_type}' AND doc_id = {{row}}.id"
+
+    def remove(row: str) -> str:
+        key = doc_key.format(row=row)
+        return f'''
+            DELETE FROM search_index WHERE rowid = (SELECT id FROM search_docs WHERE {key});
+            DELETE FROM search_docs WHERE {key};'''
+
+    def add(row: str) -> str:
+        return f'''
+            INSERT INTO search_docs (doc_type, doc_id, category)
+            VALUES ('{doc_type}', {row}.id, {_source_expr(source, 'category', row)});
+            INSERT INTO search_index (rowid, kind, title, summary, content)
+            VALUES (last_insert_rowid(), '{doc_type}', {_source_expr(source, 'title', row)},
+                    {_source_expr(source, 'summary', row)}, {_source_expr(source, 'content', row)});'''
+
+    cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            {remove('new')}
+            {add('new')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {source['watch']} ON {table} BEGIN
+            {remove('old')}
+            {add('new')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            {remove('old')}
+        END;
+    ''')
+
+def rebuild_search_index(conn: sqlite3.Connection) -> int:
+    """Re-index every article and candidate story from scratch"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM search_index")
+    cursor.execute("DELETE FROM search_docs")
+
+    indexed = 0
+    for doc_type, source in SEARCH_SOURCES.items():
+        table = source['table']
+        if not _table_exists(cursor, table):
+            continue
+        cursor.execute(f'''
+            INSERT INTO search_docs (doc_type, doc_id, category)
+            SELECT ?, id, {_source_expr(source, 'category', table)} FROM {table}
+        ''', (doc_type,))
+        indexed += cursor.rowcount
+        cursor.execute(f'''
+            INSERT INTO search_index (rowid, kind, title, summary, content)
+            SELECT d.id, d.doc_type, {_source_expr(source, 'title', table)},
+                   {_source_expr(source, 'summary', table)}, {_source_expr(source, 'content', table)}
+            FROM {table} JOIN search_docs d ON d.doc_type = ? AND d.doc_id = {table}.id
+        ''', (doc_type,))
+
+    cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    logger.info(f"Rebuilt search index with {indexed} documents")
+    return indexed
+
+def build_match_query(text: str, doc_type: Optional[str] = None) -> Optional[str]:
+    """Turn free text into a safe FTS5 query (all terms, last term as prefix)"""
+    tokens = SEARCH_TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    query = '{title summary content} : (' + ' '.join(terms) + ')'
+    if doc_type:
+        query = f'kind : "{doc_type}" AND {query}'
+    return query
+
+def _highlight(text: Optional[str]) -> str:
+    """HTML-escape FTS output, then turn match markers into <mark> tags"""
+    escaped = html.escape(text or '')
+    return escaped.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+def search(conn: sqlite3.Connection, text: str, doc_type: Optional[str] = None,
+           page: int = 1, per_page: int = 20) -> Dict:
+    """Ranked, highlighted search over the index with pagination.
+
+    BM25 has to score every match before it can sort, so queries matching more
+    than BM25_RANK_LIMIT documents (e.g. a single very common word) are
+    returned newest-first instead, which FTS5 can stream in rowid order.
+    Totals are counted up to COUNT_LIMIT; ``total_capped`` flags larger ones.
+    """
+    page = max(1, page)
+    per_page = max(1, min(per_page, 100))
+    if doc_type is not None and doc_type not in SEARCH_SOURCES:
+        raise ValueError(f"Unknown document type: {doc_type}")
+
+    match = build_match_query(text, doc_type)
+    if match is None:
+        return {'results': [], 'total': 0, 'total_capped': False, 'page': page,
+                'per_page': per_page, 'pages': 0, 'ranking': 'bm25'}
+
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM search_index WHERE search_index MATCH ? LIMIT ?
+        )
+    ''', (match, COUNT_LIMIT + 1))
+    total = cursor.fetchone()[0]
+    total_capped = total > COUNT_LIMIT
+    total = min(total, COUNT_LIMIT)
+
+    ranking = 'bm25' if total <= BM25_RANK_LIMIT else 'recent'
+    order_by = 'rank' if ranking == 'bm25' else 'search_index.rowid DESC'
+
+    cursor.execute(f'''
+        SELECT d.doc_type, d.doc_id, d.category,
+               highlight(search_index, 1, ?, ?),
+               snippet(search_index, 3, ?, ?, '…', 16),
+               bm25(search_index, ?, ?, ?, ?) AS rank
+        FROM search_index CROSS JOIN search_docs d ON d.id = search_index.rowid
+        WHERE search_index MATCH ?
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    ''', (MATCH_START, MATCH_END, MATCH_START, MATCH_END, *BM25_WEIGHTS,
+          match, per_page, (page - 1) * per_page))
+
+    results = []
+    for row in cursor.fetchall():
+        results.append({
+            'type': row[0], 'id': row[1], 'category': row[2],
+            'title': _highlight(row[3]), 'snippet': _highlight(row[4]),
+            'score': round(-row[5], 4)
+        })
+
+    return {
+        'results': results,
+        'total': total,
+        'total_capped': total_capped,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+        'ranking': ranking
+    }
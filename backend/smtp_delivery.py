@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Junior News Digest - Pooled SMTP Delivery
+=========================================
+
+Sends one message to many recipients over a pool of SMTP connections.
+
+The MIME message is built and encoded once; each recipient only adds its
+own ``To`` and ``Message-ID`` headers in front of the shared bytes. Every
+connection runs in its own worker, logs in once and sends its share of the
+queue back to back over the same session, reconnecting after
+``MESSAGES_PER_CONNECTION`` messages (providers cap this) or whenever the
+server drops it. Temporary failures (4xx replies, dropped connections) are
+retried with a short backoff; permanent 5xx rejections are not.
+
+Every recipient of a campaign has a row in the ``email_sends`` ledger, so a
+send that is interrupted can simply be run again: recipients already marked
+``sent``, or ``rejected`` with a permanent failure, are skipped. Recipients
+that ran out of attempts on temporary failures are ``failed`` and tried
+again.
+
+Run this file directly to see where a campaign stands:
+    python smtp_delivery.py --db content_tracking.db --campaign newsletter-2025-09-08
+"""
+
+import time
+import queue
+import smtplib
+import sqlite3
+import logging
+import argparse
+import threading
+from email import policy
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONNECTIONS = 4
+MESSAGES_PER_CONNECTION = 100
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 2.0
+SMTP_TIMEOUT_SECONDS = 30
+# Ledger updates are written in batches by the coordinating thread
+LEDGER_BATCH_SIZE = 100
+
+def ensure_send_ledger(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_sends (
+            campaign TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (campaign, recipient)
+        )
+    ''')
+    conn.commit()
+
+class PreparedMessage:
+    """A message encoded once and addressed per recipient"""
+
+    def __init__(self, sender: str, subject: str, html: str, text: Optional[str] = None):
+        message = MIMEMultipart('alternative', policy=policy.SMTP)
+        message['From'] = sender
+        message['Subject'] = subject
+        message['Date'] = formatdate(localtime=True)
+        if text:
+            message.attach(MIMEText(text, 'plain', 'utf-8', policy=policy.SMTP))
+        message.attach(MIMEText(html, 'html', 'utf-8', policy=policy.SMTP))
+        self.sender = sender
+        self.encoded = message.as_bytes()
+
+    def for_recipient(self, recipient: str) -> bytes:
+        headers = f"To: {recipient}\r\nMessage-ID: {make_msgid(domain='juniornewsdigest.com')}\r\n"
+        return headers.encode('utf-8') + self.encoded
+
+def _is_permanent(error: Exception) -> bool:
+    """A rejection of this recipient or message that retrying won't fix"""
+    if isinstance(error, (smtplib.SMTPConnectError, smtplib.SMTPHeloError)):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+class SMTPDeliveryPool:
+    """A fixed pool of logged-in SMTP sessions draining one recipient queue"""
+
+    def __init__(self, host: str, port: int, user: Optional[str] = None, password: Optional[str] = None,
+                 connections: int = DEFAULT_CONNECTIONS, use_tls: bool = True,
+                 messages_per_connection: int = MESSAGES_PER_CONNECTION,
+                 max_attempts: int = MAX_ATTEMPTS, retry_delay: float = RETRY_DELAY_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.connections = connections
+        self.use_tls = use_tls
+        self.messages_per_connection = messages_per_connection
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        server.ehlo()
+        if self.use_tls and server.has_extn('starttls'):
+            server.starttls()
+            server.ehlo()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        return server
+
+    @staticmethod
+    def _close(server: Optional[smtplib.SMTP]):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _worker(self, message: PreparedMessage, pending: queue.Queue, results: queue.Queue,
+                stop: threading.Event):
+        server, sent_on_connection = None, 0
+        while not stop.is_set():
+            try:
+                recipient, attempt = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                if server is None or sent_on_connection >= self.messages_per_connection:
+                    self._close(server)
+                    server, sent_on_connection = None, 0
+                    server = self._connect()
+                server.sendmail(message.sender, [recipient], message.for_recipient(recipient))
+                sent_on_connection += 1
+                results.put((recipient, 'sent', attempt, None))
+            except smtplib.SMTPAuthenticationError as e:
+                # Every connection would fail the same way
+                results.put((recipient, 'pending', attempt, str(e)))
+                stop.set()
+            except (smtplib.SMTPException, OSError) as e:
+                if not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)):
+                    # The session is in an unknown state; start a fresh one
+                    self._close(server)
+                    server = None
+                if _is_permanent(e):
+                    results.put((recipient, 'rejected', attempt, str(e)))
+                elif attempt >= self.max_attempts:
+                    results.put((recipient, 'failed', attempt, str(e)))
+                else:
+                    time.sleep(self.retry_delay * attempt)
+                    pending.put((recipient, attempt + 1))
+        self._close(server)
+
+    def send(self, message: PreparedMessage, recipients: Iterable[Tuple[str, int]]):
+        """Send to ``(recipient, attempt)`` pairs, yielding
+        ``(recipient, status, attempts, error)`` as each one finishes."""
+        pending: queue.Queue = queue.Queue()
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        for recipient, attempt in recipients:
+            pending.put((recipient, attempt))
+        if pending.empty():
+            return
+
+        outstanding = pending.qsize()
+        workers = [threading.Thread(target=self._worker, args=(message, pending, results, stop), daemon=True)
+                   for _ in range(min(self.connections, outstanding))]
+        for worker in workers:
+            worker.start()
+
+        # Every recipient ends with exactly one result; retries are requeued instead
+        while outstanding:
+            try:
+                result = results.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set() and not any(worker.is_alive() for worker in workers):
+                    if results.empty():
+                        break
+                continue
+            outstanding -= 1
+            yield result
+        stop.set()
+        for worker in workers:
+            worker.join()
+        if outstanding:
+            logger.error(f"SMTP delivery stopped early; {outstanding} recipients stay pending in the ledger")
+
+def deliver(conn: sqlite3.Connection, campaign: str, message: PreparedMessage,
+            recipients: Iterable[str], pool: SMTPDeliveryPool) -> Dict[str, int]:
+    """Send ``message`` to every recipient of ``campaign`` not already sent or rejected.
+
+    Returns counts of recipients ``sent`` now, ``rejected`` (permanent
+    failure), ``failed`` (out of attempts, retried on the next run),
+    ``skipped`` (sent or rejected by an earlier run) and still ``pending``
+    (delivery stopped early).
+    """
+    ensure_send_ledger(conn)
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT OR IGNORE INTO email_sends (campaign, recipient) VALUES (?, ?)
+    ''', [(campaign, recipient) for recipient in dict.fromkeys(recipients)])
+    conn.commit()
+
+    cursor.execute('''
+        SELECT recipient, attempts FROM email_sends
+        WHERE campaign = ? AND status NOT IN ('sent', 'rejected') ORDER BY recipient
+    ''', (campaign,))
+    todo = [(recipient, attempts + 1) for recipient, attempts in cursor.fetchall()]
+    skipped = cursor.execute('''
+        SELECT COUNT(*) FROM email_sends WHERE campaign = ? AND status IN ('sent', 'rejected')
+    ''', (campaign,)).fetchone()[0]
+
+    counts = {'sent': 0, 'rejected': 0, 'failed': 0, 'skipped': skipped, 'pending': 0}
+    batch: List[Tuple] = []
+
+    def flush():
+        cursor.executemany('''
+            UPDATE email_sends SET status = ?, attempts = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE campaign = ? AND recipient = ?
+        ''', batch)
+        conn.commit()
+        batch.clear()
+
+    for recipient, status, attempts, error in pool.send(message, todo):
+        counts[status] += 1
+        batch.append((status, attempts, error, campaign, recipient))
+        if len(batch) >= LEDGER_BATCH_SIZE:
+            flush()
+    flush()
+
+    counts['pending'] = len(todo) - counts['sent'] - counts['rejected'] - counts['failed']
+    logger.info(f"Campaign {campaign}: {counts}")
+    return counts
+
+def campaign_status(conn: sqlite3.Connection, campaign: str) -> Dict[str, int]:
+    ensure_send_ledger(conn)
+    rows = conn.execute('''
+        SELECT status, COUNT(*) FROM email_sends WHERE campaign = ? GROUP BY status
+    ''', (campaign,)).fetchall()
+    return dict(rows)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show the send ledger of an email campaign')
+    parser.add_argument('--db', required=True, help='Database holding the email_sends ledger')
+    parser.add_argument('--campaign', required=True)
+    parser.add_argument('--failed', action='store_true', help='List failed and rejected recipients and errors')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    for status, count in sorted(campaign_status(conn, args.campaign).items()):
+        print(f"{status:<8} {count}")
+    if args.failed:
+        for recipient, status, attempts, error in conn.execute('''
+            SELECT recipient, status, attempts, last_error FROM email_sends
+            WHERE campaign = ? AND status IN ('failed', 'rejected') ORDER BY recipient
+        ''', (args.campaign,)):
+            print(f"  {recipient} {status} ({attempts} attempts): {error}")
+    conn.close()
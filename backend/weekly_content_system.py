@@ -7,23 +7,27 @@ Handles: Story curation → Email selection → Video generation → App deliver
 import os
 import sys
 import json
-import smtplib
-import requests
-import schedule
 import time
+import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from email.mime.base import MIMEBase  # noqa: F401
 import sqlite3
 import logging
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List
 import subprocess
 import feedparser
 from dotenv import load_dotenv
 
+from migrate_database import apply_index_migrations
+from scheduler_engine import JobScheduler, WeeklyJob
+from smtp_delivery import PreparedMessage, SMTPDeliveryPool, deliver
+from expo_push import notify_all, process_receipts
+from podcast_feed import ensure_podcast_tables, get_feed, record_episode
+from audio_mastering import AudioMastering
+from production_runner import ProductionTask, run_week
+
 # Load environment variables
 load_dotenv()
 
@@ -77,6 +81,8 @@ class WeeklyContentSystem:
         self.podcast_feed_dir = self.base_dir / "podcast"
         self.podcast_feed_dir.mkdir(parents=True, exist_ok=True)
         self.podcast_feed_path = self.podcast_feed_dir / "feed.xml"
+        # Loudness-normalised podcast audio, cached by source hash and settings
+        self.audio_mastering = AudioMastering(self.base_dir / "mastered", self.db_path)
         
         # Story sources (RSS feeds for kid-friendly news)
         self.news_sources = [
@@ -154,6 +160,12 @@ class WeeklyContentSystem:
             )
         ''')
         
+        # Podcast episode index and the cached feed built from it
+        ensure_podcast_tables(conn)
+        
+        # Secondary indexes for the hot status/category/date filters
+        apply_index_migrations(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Database initialized")
@@ -280,27 +292,26 @@ class WeeklyContentSystem:
         # Create HTML email with story previews
         html_content = self.create_selection_email_html(stories)
         
-        for admin_email in self.admin_emails:
-            try:
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = f"📰 Kids News - Week {self.current_week} Story Selection"
-                msg['From'] = self.email_user
-                msg['To'] = admin_email
-                
-                html_part = MIMEText(html_content, 'html')
-                msg.attach(html_part)
-                
-                # Send email
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-                server.starttls()
-                server.login(self.email_user, self.email_password)
-                server.send_message(msg)
-                server.quit()
-                
-                logger.info(f"✅ Selection email sent to {admin_email}")
-                
-            except Exception as e:
-                logger.error(f"Failed to send email to {admin_email}: {e}")
+        message = PreparedMessage(
+            self.email_user,
+            f"📰 Kids News - Week {self.current_week} Story Selection",
+            html_content
+        )
+        pool = SMTPDeliveryPool(self.smtp_server, self.smtp_port, self.email_user, self.email_password)
+        
+        # The ledger makes a re-run resend only to admins it missed; a new
+        # selection for the same week is a new campaign and goes to everyone
+        selection = hashlib.sha256('\n'.join(sorted(story.id for story in stories)).encode('utf-8')).hexdigest()
+        campaign = f"selection-{self.current_week}-{selection[:12]}"
+        conn = sqlite3.connect(self.db_path)
+        try:
+            counts = deliver(conn, campaign, message, self.admin_emails, pool)
+        finally:
+            conn.close()
+        
+        logger.info(f"✅ Selection email sent to {counts['sent']} admins "
+                    f"({counts['skipped']} handled by an earlier run, "
+                    f"{counts['rejected']} rejected, {counts['failed']} failed)")
 
     def create_selection_email_html(self, stories: List[Story]) -> str:
         """Create HTML email for story selection"""
@@ -365,20 +376,18 @@ class WeeklyContentSystem:
         selected_stories = cursor.fetchall()
         
         # Mark as selected
-        for i, (story_id, title, category) in enumerate(selected_stories):
-            _ = category  # not used directly here
-            day = ['tuesday', 'wednesday', 'friday'][i]
-            
-            cursor.execute('''
-                UPDATE weekly_content SET selected = 1 
-                WHERE id = ?
-            ''', (story_id,))
-            
-            cursor.execute('''
-                INSERT INTO admin_selections (week_folder, story_id, admin_email, day_assignment)
-                VALUES (?, ?, ?, ?)
-            ''', (self.current_week, story_id, 'auto-selected', day))
-            
+        days = ['tuesday', 'wednesday', 'friday']
+        cursor.executemany('''
+            UPDATE weekly_content SET selected = 1 
+            WHERE id = ?
+        ''', [(story_id,) for story_id, _, _ in selected_stories])
+        cursor.executemany('''
+            INSERT INTO admin_selections (week_folder, story_id, admin_email, day_assignment)
+            VALUES (?, ?, ?, ?)
+        ''', [(self.current_week, story_id, 'auto-selected', day)
+              for (story_id, _, _), day in zip(selected_stories, days)])
+        
+        for (_, title, _), day in zip(selected_stories, days):
             logger.info(f"📋 Selected '{title}' for {day}")
         
         conn.commit()
@@ -387,7 +396,13 @@ class WeeklyContentSystem:
         return selected_stories
 
     def generate_weekly_content(self):
-        """Monday: Generate videos and audio for selected stories"""
+        """Monday: Generate videos and audio for selected stories.
+        
+        Each story's mastered narration is the soundtrack of its video and
+        its podcast episode; the production runner builds all stories in
+        parallel and records every task's status in production_tasks, so a
+        re-run only redoes failures.
+        """
         logger.info("🎬 Starting weekly content generation...")
         
         conn = sqlite3.connect(self.db_path)
@@ -399,33 +414,52 @@ class WeeklyContentSystem:
             WHERE week_folder = ? AND selected = 1
         ''', (self.current_week,))
         
-        selected_stories = cursor.fetchall()
+        selected_stories = [dict(zip(('id', 'title', 'content', 'category'), row)) for row in cursor.fetchall()]
+        conn.close()
         
-        for story_id, title, content, category in selected_stories:
-            try:
-                # Generate video
-                _ = self.generate_story_video(story_id, title, content, category)
-                
-                # Generate audio for Spotify
-                _ = self.generate_story_audio(story_id, title, content)
-                
-                # Mark as generated
-                cursor.execute('''
-                    UPDATE weekly_content 
-                    SET video_generated = 1, audio_generated = 1 
-                    WHERE id = ?
-                ''', (story_id,))
-                
-                logger.info(f"✅ Generated content for: {title}")
-                
-            except Exception as e:
-                logger.error(f"Failed to generate content for {title}: {e}")
+        counts = run_week(str(self.db_path), self.current_week, selected_stories, [
+            ProductionTask('audio', self.build_story_audio),
+            ProductionTask('video', self.build_story_video, depends_on=('audio',)),
+            ProductionTask('podcast', self.publish_story_episode, depends_on=('audio',)),
+        ])
         
+        # Mark as generated
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            UPDATE weekly_content SET
+                audio_generated = EXISTS (SELECT 1 FROM production_tasks t WHERE t.week_folder = weekly_content.week_folder
+                                          AND t.story_id = weekly_content.id AND t.task = 'audio' AND t.status = 'done'),
+                video_generated = EXISTS (SELECT 1 FROM production_tasks t WHERE t.week_folder = weekly_content.week_folder
+                                          AND t.story_id = weekly_content.id AND t.task = 'video' AND t.status = 'done')
+            WHERE week_folder = ? AND selected = 1
+        ''', (self.current_week,))
         conn.commit()
         conn.close()
+        
+        logger.info(f"✅ Weekly content generated: {counts}")
+        return counts
+
+    def build_story_audio(self, story: dict, inputs: dict) -> str:
+        return self.generate_story_audio(story['id'], story['title'], story['content'])
+
+    def build_story_video(self, story: dict, inputs: dict) -> str:
+        return self.generate_story_video(story['id'], story['title'], story['content'], story['category'],
+                                         audio_path=inputs['audio'])
 
-    def generate_story_video(self, story_id: str, title: str, content: str, category: str) -> str:
-        """Generate video using final branded generator"""
+    def publish_story_episode(self, story: dict, inputs: dict) -> str:
+        """Add the story's narration to the podcast episode index"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            record_episode(conn, self.current_week, Path(inputs['audio']), story['id'], story['title'],
+                           story['content'])
+            conn.commit()
+        finally:
+            conn.close()
+        return inputs['audio']
+
+    def generate_story_video(self, story_id: str, title: str, content: str, category: str,
+                             audio_path: str = None) -> str:
+        """Generate video using final branded generator, narrated with ``audio_path`` if given"""
         try:
             from production.final_video_generator import FinalVideoGenerator
         except Exception as e:
@@ -436,7 +470,7 @@ class WeeklyContentSystem:
 
         try:
             generator = FinalVideoGenerator()
-            video_path = generator.create_branded_video(title, content)
+            video_path = generator.create_branded_video(title, content, audio_path)
             # Copy to weekly folder path
             subprocess.run(['cp', video_path, str(output_path)], check=True)
             logger.info(f"🎥 Video generated: {output_path}")
@@ -464,11 +498,8 @@ class WeeklyContentSystem:
         try:
             subprocess.run(cmd, check=True)
             
-            # Convert to MP3
-            subprocess.run([
-                'ffmpeg', '-i', str(output_path.with_suffix('.aiff')),
-                '-acodec', 'libmp3lame', '-y', str(output_path)
-            ], check=True)
+            # Master to podcast loudness and encode (cached by source hash)
+            self.audio_mastering.master_to(output_path.with_suffix('.aiff'), output_path)
             
             # Remove AIFF
             output_path.with_suffix('.aiff').unlink()
@@ -498,11 +529,8 @@ class WeeklyContentSystem:
 
     def send_push_notifications(self):
         """Send push notifications for new content"""
-        # Using Expo Push Notifications
-        push_tokens = self.get_user_push_tokens()  # From your user database
-        
-        message = {
-            "to": push_tokens,
+        # Using Expo Push Notifications, in batches of 100
+        notification = {
             "sound": "default",
             "title": "📰 New Story Available!",
             "body": "Check out today's amazing kid-friendly news story!",
@@ -510,30 +538,28 @@ class WeeklyContentSystem:
         }
         
         try:
-            response = requests.post(
-                'https://exp.host/--/api/v2/push/send',
-                json=message,
-                headers={'Content-Type': 'application/json'}
-            )
-            logger.info(f"📲 Push notifications sent: {response.status_code}")
+            conn = sqlite3.connect(self.db_path)
+            try:
+                counts = notify_all(conn, notification)
+            finally:
+                conn.close()
+            if not counts['ok'] and not counts['errors']:
+                logger.warning("No push tokens found; notifications were skipped")
+            logger.info(f"📲 Push notifications sent: {counts['ok']} ok, {counts['errors']} failed, "
+                        f"{counts['pruned']} dead tokens removed")
         except Exception as e:
             logger.error(f"Push notification failed: {e}")
 
-    def get_user_push_tokens(self) -> List[str]:
-        """Get push tokens from user database"""
+    def check_push_receipts(self):
+        """Read delivery receipts for recent pushes and drop dead tokens"""
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT token FROM push_tokens')
-            rows = cursor.fetchall()
-            conn.close()
-            tokens = [row[0] for row in rows]
-            if not tokens:
-                logger.warning("No push tokens found; notifications will be skipped")
-            return tokens
+            try:
+                process_receipts(conn)
+            finally:
+                conn.close()
         except Exception as e:
-            logger.error(f"Error fetching push tokens: {e}")
-            return []
+            logger.error(f"Push receipt check failed: {e}")
 
     def upload_to_spotify(self):
         """Upload weekly audio content to Spotify"""
@@ -565,78 +591,22 @@ class WeeklyContentSystem:
         logger.info(f"📼 Prepared for RSS publication: {audio_file.name}")
 
     def update_podcast_rss_feed(self):
-        """Generate or update an RSS feed for weekly audio, to submit to Spotify for Podcasters once."""
+        """Write the podcast RSS feed (built from the episode index) for Spotify for Podcasters."""
         logger.info("🪙 Updating podcast RSS feed")
-        site_url = os.getenv('PODCAST_SITE_URL', 'https://example.com/kids_news_podcast')
-        feed_title = os.getenv('PODCAST_TITLE', 'Kids Daily News Podcast')
-        feed_description = os.getenv('PODCAST_DESCRIPTION', 'Kid‑friendly news stories with natural narration.')
-        feed_author = os.getenv('PODCAST_AUTHOR', 'Kids Daily News')
-
-        # Collect all MP3s from all week folders (limit to recent 50)
-        episodes: List[Dict[str, str]] = []
-        for week_folder in sorted((self.base_dir).glob('*_week'), reverse=True):
-            for audio_file in sorted((week_folder / 'generated_audio').glob('*.mp3'), reverse=True):
-                # Derive metadata from DB if available
-                story_id = audio_file.stem
-                title, summary = self._lookup_story_metadata(story_id)
-                pub_date = datetime.fromtimestamp(audio_file.stat().st_mtime).strftime('%a, %d %b %Y %H:%M:%S +0000')
-                episodes.append({
-                    'title': title or story_id,
-                    'summary': summary or 'Kid‑friendly news story.',
-                    'pub_date': pub_date,
-                    'url': f"{site_url}/audio/{week_folder.name}/{audio_file.name}",
-                    'guid': f"{week_folder.name}-{audio_file.name}",
-                    'length': str(audio_file.stat().st_size)
-                })
-                if len(episodes) >= 50:
-                    break
-            if len(episodes) >= 50:
-                break
-
-        # Build simple RSS (Atom not required)
-        rss_items = []
-        for ep in episodes:
-            rss_items.append(f"""
-            <item>
-              <title>{ep['title']}</title>
-              <description><![CDATA[{ep['summary']}]]></description>
-              <pubDate>{ep['pub_date']}</pubDate>
-              <guid isPermaLink="false">{ep['guid']}</guid>
-              <enclosure url="{ep['url']}" length="{ep['length']}" type="audio/mpeg" />
-            </item>
-            """.strip())
-
-        rss_xml = f"""
-        <?xml version="1.0" encoding="UTF-8"?>
-        <rss version="2.0">
-          <channel>
-            <title>{feed_title}</title>
-            <link>{site_url}</link>
-            <description>{feed_description}</description>
-            <language>en-us</language>
-            <itunes:author>{feed_author}</itunes:author>
-            {''.join(rss_items)}
-          </channel>
-        </rss>
-        """.strip()
-
-        with open(self.podcast_feed_path, 'w', encoding='utf-8') as f:
-            f.write(rss_xml)
-        logger.info(f"🧾 Podcast RSS updated at {self.podcast_feed_path}")
-
-    def _lookup_story_metadata(self, story_id: str) -> Optional[tuple[str, str]]:
-        """Helper to load story title/summary from DB."""
+        conn = sqlite3.connect(self.db_path)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT title, content FROM weekly_content WHERE id = ?', (story_id,))
-            row = cursor.fetchone()
+            feed = get_feed(conn)
+        finally:
             conn.close()
-            if row:
-                return row[0], row[1]
-        except Exception:
-            pass
-        return None, None
+        if feed is None:
+            logger.warning("No podcast episodes indexed yet; RSS feed not written")
+            return
+        
+        rss_xml, etag, _ = feed
+        if self.podcast_feed_path.exists() and self.podcast_feed_path.read_bytes() == rss_xml:
+            return
+        self.podcast_feed_path.write_bytes(rss_xml)
+        logger.info(f"🧾 Podcast RSS updated at {self.podcast_feed_path} (ETag {etag})")
 
     def cleanup_old_content(self):
         """Archive content older than 4 weeks"""
@@ -657,27 +627,32 @@ class WeeklyContentSystem:
                 except ValueError:
                     continue
 
-    def schedule_weekly_tasks(self):
+    def schedule_weekly_tasks(self) -> JobScheduler:
         """Schedule all weekly tasks"""
         logger.info("⏰ Scheduling weekly automation tasks...")
         
-        # Friday 6 PM: Curate stories and send selection email
-        schedule.every().friday.at("21:00").do(self.friday_curation_task)  # 9 PM local
-        
-        # Monday 9 AM: Process selections and generate content
-        schedule.every().monday.at("09:00").do(self.monday_generation_task)
-        
-        # Tuesday 8 AM: Deliver Tuesday content
-        schedule.every().tuesday.at("08:00").do(self.deliver_daily_content, "tuesday")
-        
-        # Wednesday 8 AM: Deliver Wednesday content
-        schedule.every().wednesday.at("08:00").do(self.deliver_daily_content, "wednesday")
-        
-        # Friday 8 AM: Deliver Friday content
-        schedule.every().friday.at("08:00").do(self.deliver_daily_content, "friday")
-        
-        # Sunday 11 PM: Upload to Spotify and cleanup
-        schedule.every().sunday.at("23:00").do(self.sunday_finalization_task)
+        return JobScheduler(str(self.db_path), [
+            # Friday 6 PM: Curate stories and send selection email
+            WeeklyJob('friday_curation', ('friday',), '21:00', self.friday_curation_task),  # 9 PM local
+            
+            # Monday 9 AM: Process selections and generate content
+            WeeklyJob('monday_generation', ('monday',), '09:00', self.monday_generation_task),
+            
+            # Tuesday 8 AM: Deliver Tuesday content
+            WeeklyJob('deliver_tuesday', ('tuesday',), '08:00', self.deliver_daily_content, ('tuesday',)),
+            
+            # Wednesday 8 AM: Deliver Wednesday content
+            WeeklyJob('deliver_wednesday', ('wednesday',), '08:00', self.deliver_daily_content, ('wednesday',)),
+            
+            # Friday 8 AM: Deliver Friday content
+            WeeklyJob('deliver_friday', ('friday',), '08:00', self.deliver_daily_content, ('friday',)),
+            
+            # Half an hour after each delivery: read push receipts (Expo keeps them a day)
+            WeeklyJob('push_receipts', ('tuesday', 'wednesday', 'friday'), '08:30', self.check_push_receipts),
+            
+            # Sunday 11 PM: Upload to Spotify and cleanup
+            WeeklyJob('sunday_finalization', ('sunday',), '23:00', self.sunday_finalization_task),
+        ])
 
     def friday_curation_task(self):
         """Friday: Curate and send selection email"""
@@ -707,12 +682,10 @@ class WeeklyContentSystem:
         self.setup_database()
         
         # Schedule all tasks
-        self.schedule_weekly_tasks()
+        scheduler = self.schedule_weekly_tasks()
         
-        # Run scheduler
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        # Run scheduler; sleeps until the next task is due
+        scheduler.run_forever()
 
 def main():
     """Main entry point"""
@@ -729,6 +702,8 @@ def main():
             system.generate_weekly_content()
         elif task == "deliver":
             system.deliver_to_app()
+        elif task == "receipts":
+            system.check_push_receipts()
         elif task == "spotify":
             system.upload_to_spotify()
         elif task == "cleanup":
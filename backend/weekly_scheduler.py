@@ -11,6 +11,7 @@ Usage:
     python weekly_scheduler.py --check-schedule    # Check what should run today
     python weekly_scheduler.py --run-today         # Run today's scheduled tasks
     python weekly_scheduler.py --setup-cron        # Set up automated cron jobs
+    python weekly_scheduler.py --pregenerate       # Build media for scheduled stories
 """
 
 import argparse
@@ -26,6 +27,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from editorial_workflow import EditorialWorkflow
 from add_content import ContentManager
+from bulk_publishing import article_slug, read_time
+from pregeneration import (ARTIFACT_LEAD_HOURS, prepared_artifacts, skip_unfinished_jobs,
+                           run_pregeneration, queue_summary)
 
 class WeeklyScheduler:
     """Manages automated weekly content scheduling"""
@@ -81,8 +85,24 @@ class WeeklyScheduler:
                 'priority': 'medium'
             })
         
+        # Build media for scheduled stories ahead of their publish dates
+        queued = self._get_queued_pregeneration_jobs()
+        if queued or unscheduled:
+            tasks.append({
+                'type': 'pregenerate',
+                'description': f'Pre-generate media for scheduled stories ({queued} builds queued)',
+                'priority': 'medium'
+            })
+        
         return tasks
     
+    def _get_queued_pregeneration_jobs(self):
+        """Number of media builds waiting in the pre-generation queue"""
+        conn = sqlite3.connect(self.workflow.db_path)
+        queued = queue_summary(conn).get('queued', 0)
+        conn.close()
+        return queued
+    
     def _get_scheduled_content_for_today(self):
         """Get content scheduled for today"""
         today = date.today()
@@ -93,7 +113,7 @@ class WeeklyScheduler:
         cursor.execute('''
             SELECT ws.candidate_id, cs.title, cs.final_title, cs.final_content, 
                    cs.final_summary, cs.category, cs.author, cs.is_breaking, 
-                   cs.is_trending, cs.is_hot
+                   cs.is_trending, cs.is_hot, ws.id
             FROM weekly_schedule ws
             JOIN candidate_stories cs ON ws.candidate_id = cs.id
             WHERE ws.scheduled_date = ? AND ws.status = 'scheduled'
@@ -110,7 +130,8 @@ class WeeklyScheduler:
                 'author': row[6],
                 'is_breaking': row[7],
                 'is_trending': row[8],
-                'is_hot': row[9]
+                'is_hot': row[9],
+                'schedule_id': row[10]
             })
         
         conn.close()
@@ -163,6 +184,9 @@ class WeeklyScheduler:
                 elif task['type'] == 'schedule_content':
                     self._run_schedule_content()
                 
+                elif task['type'] == 'pregenerate':
+                    self._run_pregeneration()
+                
                 print(f"✅ Completed: {task['description']}")
                 
             except Exception as e:
@@ -184,31 +208,76 @@ class WeeklyScheduler:
         )
     
     def _run_publish_content(self, scheduled_content):
-        """Publish scheduled content"""
-        published_count = 0
-        
-        for content in scheduled_content:
-            try:
-                # Add article to main database
-                article_id = self.content_manager.add_article(
-                    title=content['title'],
-                    content=content['content'] or f"This is the content for {content['title']}. The full article will be available soon.",
-                    category=content['category'],
-                    author=content['author'],
-                    summary=content['summary'] or content['title'],
-                    is_breaking=content['is_breaking'],
-                    is_trending=content['is_trending'],
-                    is_hot=content['is_hot']
-                )
+        """Publish scheduled content with its pre-generated media.
+        
+        Thumbnails, quizzes, audio and video were built ahead of time by the
+        pre-generation queue, so this only inserts the articles and flips the
+        schedule rows, all in one transaction across both databases.
+        """
+        schedule_ids = [content['schedule_id'] for content in scheduled_content]
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        published_date = datetime.now().isoformat()
+        
+        conn = sqlite3.connect(self.workflow.db_path, timeout=30)
+        conn.execute("ATTACH DATABASE ? AS content", (self.content_manager.db_path,))
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            prepared = prepared_artifacts(cursor, 'weekly_schedule', schedule_ids)
+            
+            articles, quizzes, flips, missing = [], [], [], []
+            for content in scheduled_content:
+                artifacts = prepared[content['schedule_id']]
+                body = content['content'] or f"This is the content for {content['title']}. The full article will be available soon."
+                article_id = article_slug(content['title'], stamp)
+                quiz_id = f"quiz_{article_id}" if artifacts.get('quiz') else None
                 
-                if article_id:
-                    # Mark as published in schedule
-                    self._mark_content_published(content['candidate_id'])
-                    published_count += 1
-                    print(f"   ✅ Published: {content['title']}")
+                articles.append((
+                    article_id, content['title'], content['title'], body,
+                    content['summary'] or content['title'], content['category'].lower(),
+                    content['author'], published_date, read_time(body),
+                    content['is_breaking'], content['is_trending'], content['is_hot'],
+                    artifacts.get('video'), artifacts.get('thumbnail'), quiz_id
+                ))
+                if quiz_id:
+                    questions = artifacts['quiz']
+                    quizzes.append((quiz_id, article_id, f"Quiz: {content['title']}", questions,
+                                    len(json.loads(questions)), published_date))
+                flips.append((article_id, artifacts.get('video'), quiz_id, content['schedule_id']))
                 
-            except Exception as e:
-                print(f"   ❌ Error publishing '{content['title']}': {e}")
+                not_ready = [name for name in ARTIFACT_LEAD_HOURS if name not in artifacts]
+                if not_ready:
+                    missing.append((content['title'], not_ready))
+            
+            cursor.executemany('''
+                INSERT INTO content.articles (id, title, headline, content, summary, category, author,
+                                              published_date, read_time, is_breaking, is_trending, is_hot,
+                                              video_url, thumbnail_url, quiz_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', articles)
+            cursor.executemany('''
+                INSERT OR REPLACE INTO content.quizzes (id, article_id, title, questions, total_score, created_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', quizzes)
+            cursor.executemany('''
+                UPDATE weekly_schedule
+                SET status = 'published', article_id = ?, video_id = ?, quiz_id = ?
+                WHERE id = ? AND status = 'scheduled'
+            ''', flips)
+            skip_unfinished_jobs(cursor, 'weekly_schedule', schedule_ids)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"   ❌ Error publishing scheduled content: {e}")
+            return
+        finally:
+            conn.close()
+        
+        published_count = len(articles)
+        for content in scheduled_content:
+            print(f"   ✅ Published: {content['title']}")
+        for title, not_ready in missing:
+            print(f"   ⚠️ Published '{title}' without pre-generated {', '.join(not_ready)}")
         
         print(f"📱 Published {published_count} articles to the app")
         
@@ -220,20 +289,6 @@ class WeeklyScheduler:
                 f"Published on: {date.today().strftime('%A, %B %d, %Y')}"
             )
     
-    def _mark_content_published(self, candidate_id):
-        """Mark scheduled content as published"""
-        conn = sqlite3.connect(self.workflow.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE weekly_schedule 
-            SET status = 'published'
-            WHERE candidate_id = ? AND scheduled_date = ?
-        ''', (candidate_id, date.today().isoformat()))
-        
-        conn.commit()
-        conn.close()
-    
     def _run_process_approved(self):
         """Process approved stories"""
         self.workflow.process_approved_stories()
@@ -242,6 +297,15 @@ class WeeklyScheduler:
         """Schedule processed content for the week"""
         self.workflow.schedule_weekly_content()
     
+    def _run_pregeneration(self):
+        """Build queued thumbnails, quizzes, audio and video, earliest deadline first"""
+        conn = sqlite3.connect(self.workflow.db_path, timeout=30)
+        try:
+            stats = run_pregeneration(conn)
+        finally:
+            conn.close()
+        print(f"🎬 Pre-generated {stats['built']} artifacts ({stats['failed']} failed, {stats['late']} late)")
+    
     def _send_editor_notification(self, subject, message):
         """Send notification to editor (placeholder for email/Slack integration)"""
         print(f"\n📧 NOTIFICATION: {subject}")
@@ -263,6 +327,9 @@ class WeeklyScheduler:
             # Monday, Wednesday, Friday at 8:00 AM: Publish scheduled content
             "0 8 * * 1,3,5 cd /Users/shadrackaddo/Desktop/projects/junior\\ graphic/production && /usr/local/bin/python3 weekly_scheduler.py --run-today",
             
+            # Hourly: Pre-generate media for scheduled stories
+            "15 * * * * cd /Users/shadrackaddo/Desktop/projects/junior\\ graphic/production && /usr/local/bin/python3 weekly_scheduler.py --pregenerate",
+            
             # Daily at 6:00 PM: Check for any pending tasks
             "0 18 * * * cd /Users/shadrackaddo/Desktop/projects/junior\\ graphic/production && /usr/local/bin/python3 weekly_scheduler.py --check-schedule"
         ]
@@ -282,6 +349,7 @@ class WeeklyScheduler:
         print(f"   Monday 8:00 AM    - Publish scheduled articles")  
         print(f"   Wednesday 8:00 AM - Publish scheduled articles")
         print(f"   Friday 8:00 AM    - Publish scheduled articles")
+        print(f"   Hourly            - Pre-generate media for scheduled stories")
         print(f"   Daily 6:00 PM     - Check for pending tasks")
         
         return cron_jobs
@@ -323,15 +391,13 @@ class WeeklyScheduler:
         else:
             print("📝 No content scheduled for this week yet")
         
-        # Show pending candidates
-        pending = self.workflow.get_pending_candidates()
-        if pending:
-            print(f"\n🔍 Pending Review: {len(pending)} candidate stories")
+        # Show pending and approved candidates
+        counts = self.workflow.get_dashboard()['counts']
+        if counts.get('pending_review'):
+            print(f"\n🔍 Pending Review: {counts['pending_review']} candidate stories")
         
-        # Show approved stories
-        approved = self.workflow.get_approved_stories()
-        if approved:
-            print(f"✅ Approved: {len(approved)} stories ready for processing")
+        if counts.get('approved'):
+            print(f"✅ Approved: {counts['approved']} stories ready for processing")
         
         conn.close()
 
@@ -341,10 +407,11 @@ def main():
     parser.add_argument('--run-today', action='store_true', help='Run today\'s scheduled tasks')
     parser.add_argument('--setup-cron', action='store_true', help='Set up automated cron jobs')
     parser.add_argument('--overview', action='store_true', help='Show weekly content overview')
+    parser.add_argument('--pregenerate', action='store_true', help='Build queued media for scheduled stories')
     
     args = parser.parse_args()
     
-    if not any([args.check_schedule, args.run_today, args.setup_cron, args.overview]):
+    if not any([args.check_schedule, args.run_today, args.setup_cron, args.overview, args.pregenerate]):
         parser.print_help()
         return
     
@@ -369,6 +436,9 @@ def main():
     
     if args.overview:
         scheduler.show_weekly_overview()
+    
+    if args.pregenerate:
+        scheduler._run_pregeneration()
 
 if __name__ == '__main__':
     main()
@@ -16,8 +16,6 @@ import sys
 import json
 import uuid
 import hashlib
-import threading
-import time
 import random
 from datetime import datetime, timedelta, date
 from pathlib import Path
@@ -25,13 +23,28 @@ from typing import List, Dict, Optional, Any
 import sqlite3
 import logging
 from dataclasses import dataclass, asdict
-from flask import Flask, request, jsonify, send_file, send_from_directory, render_template_string, redirect, url_for, flash, session
+from flask import Flask, request, jsonify, send_file, send_from_directory, render_template_string, redirect, url_for, flash, session, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from thumbnail_api import thumbnail_bp
 import jwt
 from dotenv import load_dotenv
 
+# Shared content modules live in backend/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from readability import (analyze_text, reading_level_label,
+                         ensure_readability_columns, backfill_reading_levels)
+from search_index import ensure_search_index, search as search_stories
+from migrate_database import apply_index_migrations
+from scheduler_engine import JobScheduler, SchedulerLease, WeeklyJob
+from bulk_publishing import publish_approved_candidates
+from editorial_review import apply_review_decisions
+from editorial_dashboard import status_counts, candidate_cards
+from schedule_balancer import schedule_week, week_start
+from candidate_batch import upsert_candidates
+from quiz_attempts import ensure_attempt_tables, record_attempt, question_stats
+from quiz_payloads import QuizPayloadCache, ensure_quiz_payloads, NOT_FOUND_PAYLOAD
+
 # Load environment variables
 load_dotenv()
 
@@ -153,9 +166,13 @@ class DatabaseManager:
                 approved_date TEXT,
                 final_title TEXT,
                 final_content TEXT,
-                final_summary TEXT
+                final_summary TEXT,
+                reading_grade REAL,
+                word_count INTEGER
             )
         ''')
+        ensure_readability_columns(conn)
+        backfill_reading_levels(conn)
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS weekly_schedule (
@@ -182,6 +199,18 @@ class DatabaseManager:
             )
         ''')
         
+        # Full-text search over articles and candidate stories
+        ensure_search_index(conn)
+        
+        # Append-only quiz attempt log and per-question stats
+        ensure_attempt_tables(conn)
+        
+        # Quiz responses are pre-serialized when quizzes are written
+        ensure_quiz_payloads(conn)
+        
+        # Secondary indexes for the hot status/category/date filters
+        apply_index_migrations(conn)
+        
         conn.commit()
         conn.close()
         logger.info("Database initialized successfully")
@@ -229,15 +258,20 @@ class NewsStoryGenerator:
             ]
         }
     
-    def generate_candidate_stories(self, count=20) -> List[Dict[str, Any]]:
-        """Generate candidate stories for editorial review"""
+    def generate_candidate_stories(self, count=20, seed: int = None) -> List[Dict[str, Any]]:
+        """Generate candidate stories for editorial review.
+        
+        With a ``seed`` the same count produces the same stories and ids on a
+        given day, so batches can be regenerated for load tests.
+        """
+        self._rng = random.Random(seed)
         candidates = []
         
         for i in range(count):
-            category = random.choice(self.categories)
+            category = self._rng.choice(self.categories)
             
             if category in self.story_templates:
-                template = random.choice(self.story_templates[category])
+                template = self._rng.choice(self.story_templates[category])
                 story = self._generate_from_template(template, category)
             else:
                 story = self._generate_generic_story(category, i)
@@ -246,7 +280,7 @@ class NewsStoryGenerator:
             story['generated_date'] = datetime.now().isoformat()
             story['status'] = 'pending_review'
             story['editor_notes'] = ''
-            story['priority_score'] = random.randint(1, 10)
+            story['priority_score'] = self._rng.randint(1, 10)
             
             candidates.append(story)
         
@@ -263,9 +297,9 @@ class NewsStoryGenerator:
             if key.endswith('s') and key not in ['title', 'content_template']:
                 placeholder = f"{{{key[:-1]}}}"
                 if placeholder in title:
-                    title = title.replace(placeholder, random.choice(values))
+                    title = title.replace(placeholder, self._rng.choice(values))
                 if placeholder in content:
-                    content = content.replace(placeholder, random.choice(values))
+                    content = content.replace(placeholder, self._rng.choice(values))
         
         # Add random details
         durations = ['3 months', '6 months', '8 months', '1 year']
@@ -276,8 +310,8 @@ class NewsStoryGenerator:
             'It can process 100 items per hour'
         ]
         
-        content = content.replace('{duration}', random.choice(durations))
-        content = content.replace('{impact_stat}', random.choice(impact_stats))
+        content = content.replace('{duration}', self._rng.choice(durations))
+        content = content.replace('{impact_stat}', self._rng.choice(impact_stats))
         
         return {
             'title': title,
@@ -285,9 +319,9 @@ class NewsStoryGenerator:
             'category': category,
             'author': 'Junior News Team',
             'summary': content[:150] + '...' if len(content) > 150 else content,
-            'is_breaking': random.choice([True, False]) if random.random() < 0.2 else False,
-            'is_trending': random.choice([True, False]) if random.random() < 0.3 else False,
-            'is_hot': random.choice([True, False]) if random.random() < 0.25 else False
+            'is_breaking': self._rng.choice([True, False]) if self._rng.random() < 0.2 else False,
+            'is_trending': self._rng.choice([True, False]) if self._rng.random() < 0.3 else False,
+            'is_hot': self._rng.choice([True, False]) if self._rng.random() < 0.25 else False
         }
     
     def _generate_generic_story(self, category: str, index: int) -> Dict[str, Any]:
@@ -302,7 +336,7 @@ class NewsStoryGenerator:
             'author': 'Junior News Team',
             'summary': content[:150] + '...' if len(content) > 150 else content,
             'is_breaking': False,
-            'is_trending': random.choice([True, False]) if random.random() < 0.3 else False,
+            'is_trending': self._rng.choice([True, False]) if self._rng.random() < 0.3 else False,
             'is_hot': False
         }
 
@@ -313,54 +347,45 @@ class EditorialWorkflow:
         self.db = db_manager
         self.story_generator = NewsStoryGenerator()
     
-    def generate_weekly_candidates(self, count=20):
+    def generate_weekly_candidates(self, count=20, seed: int = None):
         """Generate candidate stories for the week"""
         logger.info(f"Generating {count} candidate stories for editorial review...")
         
-        candidates = self.story_generator.generate_candidate_stories(count)
+        candidates = self.story_generator.generate_candidate_stories(count, seed=seed)
         
+        # Upsert in one transaction; editor notes and reviewed stories are kept
         conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
-        # Clear previous week's pending candidates
-        cursor.execute("DELETE FROM candidate_stories WHERE status = 'pending_review'")
-        
-        saved_count = 0
-        for candidate in candidates:
-            try:
-                cursor.execute('''
-                    INSERT INTO candidate_stories 
-                    (id, title, content, summary, category, author, generated_date, 
-                     status, priority_score, is_breaking, is_trending, is_hot)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    candidate['candidate_id'], candidate['title'], candidate['content'],
-                    candidate['summary'], candidate['category'], candidate['author'],
-                    candidate['generated_date'], candidate['status'], candidate['priority_score'],
-                    candidate['is_breaking'], candidate['is_trending'], candidate['is_hot']
-                ))
-                saved_count += 1
-            except Exception as e:
-                logger.error(f"Error saving candidate {candidate['candidate_id']}: {e}")
-        
-        conn.commit()
-        conn.close()
+        try:
+            result = upsert_candidates(conn, candidates)
+        finally:
+            conn.close()
         
-        logger.info(f"Generated and saved {saved_count} candidate stories!")
+        logger.info(f"Generated {len(candidates)} candidate stories: {result}")
         return candidates
     
-    def get_pending_candidates(self):
-        """Get all pending candidate stories"""
+    def get_pending_candidates(self, sort_by: str = 'priority', max_grade: float = None):
+        """Get all pending candidate stories, optionally sorted/filtered by reading level"""
         conn = sqlite3.connect(self.db.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
+        order_by = {
+            'priority': 'priority_score DESC, generated_date DESC',
+            'reading_level': 'reading_grade IS NULL, reading_grade ASC, priority_score DESC',
+        }.get(sort_by, 'priority_score DESC, generated_date DESC')
+        
+        query = '''
             SELECT id, title, content, summary, category, author, priority_score,
-                   is_breaking, is_trending, is_hot, editor_notes
+                   is_breaking, is_trending, is_hot, editor_notes, reading_grade, word_count
             FROM candidate_stories 
             WHERE status = 'pending_review'
-            ORDER BY priority_score DESC, generated_date DESC
-        ''')
+        '''
+        params = []
+        if max_grade is not None:
+            query += " AND reading_grade <= ?"
+            params.append(max_grade)
+        query += f" ORDER BY {order_by}"
+        
+        cursor.execute(query, tuple(params))
         
         candidates = []
         for row in cursor.fetchall():
@@ -368,7 +393,8 @@ class EditorialWorkflow:
                 'id': row[0], 'title': row[1], 'content': row[2], 'summary': row[3],
                 'category': row[4], 'author': row[5], 'priority_score': row[6],
                 'is_breaking': row[7], 'is_trending': row[8], 'is_hot': row[9],
-                'editor_notes': row[10] or ''
+                'editor_notes': row[10] or '', 'reading_grade': row[11], 'word_count': row[12],
+                'reading_level': reading_level_label(row[11])
             })
         
         conn.close()
@@ -395,6 +421,13 @@ class EditorialWorkflow:
             final_summary, editor_notes, candidate_id
         ))
         
+        # Edited copy gets re-scored so the stored reading level stays accurate
+        if final_content:
+            score = analyze_text(final_content)
+            cursor.execute('''
+                UPDATE candidate_stories SET reading_grade = ?, word_count = ? WHERE id = ?
+            ''', (score.reading_grade, score.word_count, candidate_id))
+        
         conn.commit()
         conn.close()
         logger.info(f"Approved story: {candidate_id}")
@@ -414,6 +447,33 @@ class EditorialWorkflow:
         conn.close()
         logger.info(f"Rejected story: {candidate_id}")
     
+    def get_dashboard(self, sort_by: str = 'priority', max_grade: float = None, page: int = 1) -> Dict:
+        """Status counts and one page of pending candidate cards for the portal"""
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            counts = status_counts(conn)
+            cards = candidate_cards(conn, sort_by=sort_by, max_grade=max_grade, page=page,
+                                    total=counts.get('pending_review', 0))
+        finally:
+            conn.close()
+        return {'counts': counts, 'cards': cards}
+    
+    def review_stories(self, decisions: List[Dict]) -> Dict:
+        """Approve/reject many candidate stories in a single transaction"""
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            return apply_review_decisions(conn, decisions)
+        finally:
+            conn.close()
+    
+    def preview_weekly_schedule(self, day: date = None) -> Dict:
+        """Balanced Monday/Wednesday/Friday plan for processed stories, without writing it"""
+        conn = sqlite3.connect(self.db.db_path)
+        try:
+            return schedule_week(conn, week_start(day), dry_run=True)
+        finally:
+            conn.close()
+    
     def get_approved_stories(self):
         """Get all approved stories ready for processing"""
         conn = sqlite3.connect(self.db.db_path)
@@ -441,118 +501,60 @@ class EditorialWorkflow:
         return stories
     
     def process_approved_stories(self):
-        """Process approved stories - create articles"""
-        approved_stories = self.get_approved_stories()
-        
-        if not approved_stories:
-            logger.info("No approved stories to process")
-            return
-        
-        logger.info(f"Processing {len(approved_stories)} approved stories...")
-        
-        processed_count = 0
-        for story in approved_stories:
-            try:
-                # Generate article ID
-                article_id = story['title'].lower().replace(' ', '-').replace(',', '').replace('.', '') + f"-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                
-                # Add article to main database
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO articles (id, title, headline, content, summary, category, author, 
-                                        published_date, is_breaking, is_trending, is_hot, 
-                                        views, likes, read_time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article_id, story['title'], story['title'], story['content'], 
-                    story['summary'], story['category'], story['author'],
-                    datetime.now().isoformat(), story['is_breaking'], 
-                    story['is_trending'], story['is_hot'], 0, 0,
-                    f"{max(1, len(story['content'].split()) // 200)} min read"
-                ))
-                
-                conn.commit()
-                conn.close()
-                
-                # Mark as processed
-                self._mark_story_processed(story['candidate_id'], article_id)
-                processed_count += 1
-                
-                logger.info(f"Processed: {story['title']}")
-                
-            except Exception as e:
-                logger.error(f"Error processing {story['title']}: {e}")
-        
-        logger.info(f"Successfully processed {processed_count} stories!")
-    
-    def _mark_story_processed(self, candidate_id: str, article_id: str):
-        """Mark a story as processed"""
+        """Process approved stories - create articles in a single transaction"""
         conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
+        try:
+            result = publish_approved_candidates(conn)
+        finally:
+            conn.close()
         
-        cursor.execute('''
-            UPDATE candidate_stories 
-            SET status = 'processed'
-            WHERE id = ?
-        ''', (candidate_id,))
+        if not result['processed'] and not result['conflicts']:
+            logger.info("No approved stories to process")
+            return result
         
-        conn.commit()
-        conn.close()
+        logger.info(f"Successfully processed {result['processed']} stories!")
+        if result['conflicts']:
+            logger.warning(f"{len(result['conflicts'])} approved stories were skipped due to conflicts")
+        return result
 
 class AutomationScheduler:
     """Handles automated background tasks"""
     
     def __init__(self, editorial_workflow: EditorialWorkflow):
         self.workflow = editorial_workflow
-        self.running = False
-        self.thread = None
+        # Every API worker starts a scheduler; only the lease holder runs jobs
+        self.lease = SchedulerLease(editorial_workflow.db.db_path, 'automation')
+        self.scheduler = JobScheduler(editorial_workflow.db.db_path, [
+            # Sunday at 9:00 AM: Generate candidate stories
+            WeeklyJob('generate_weekly_candidates', ('sunday',), '09:00',
+                      self.workflow.generate_weekly_candidates, (20,)),
+            # Monday, Wednesday, Friday at 8:00 AM: Process approved stories
+            WeeklyJob('process_approved_stories', ('monday', 'wednesday', 'friday'), '08:00',
+                      self.workflow.process_approved_stories),
+        ], lease=self.lease)
+    
+    @property
+    def running(self) -> bool:
+        return self.scheduler.running
+    
+    @property
+    def is_leader(self) -> bool:
+        return self.running and self.lease.is_leader
     
     def start(self):
         """Start the automation scheduler"""
         if not self.running:
-            self.running = True
-            self.thread = threading.Thread(target=self._run_scheduler, daemon=True)
-            self.thread.start()
+            self.scheduler.start()
             logger.info("Automation scheduler started")
     
     def stop(self):
         """Stop the automation scheduler"""
-        self.running = False
-        if self.thread:
-            self.thread.join()
+        self.scheduler.stop()
         logger.info("Automation scheduler stopped")
-    
-    def _run_scheduler(self):
-        """Main scheduler loop"""
-        while self.running:
-            try:
-                current_time = datetime.now()
-                
-                # Sunday at 9:00 AM: Generate candidate stories
-                if (current_time.weekday() == 6 and  # Sunday
-                    current_time.hour == 9 and 
-                    current_time.minute == 0):
-                    logger.info("Sunday 9:00 AM - Generating candidate stories")
-                    self.workflow.generate_weekly_candidates(20)
-                
-                # Monday, Wednesday, Friday at 8:00 AM: Process approved stories
-                if (current_time.weekday() in [0, 2, 4] and  # Mon, Wed, Fri
-                    current_time.hour == 8 and 
-                    current_time.minute == 0):
-                    logger.info(f"{current_time.strftime('%A')} 8:00 AM - Processing approved stories")
-                    self.workflow.process_approved_stories()
-                
-                # Sleep for 60 seconds before checking again
-                time.sleep(60)
-                
-            except Exception as e:
-                logger.error(f"Scheduler error: {e}")
-                time.sleep(60)
 
 # Initialize components
 db_manager = DatabaseManager()
+quiz_payloads = QuizPayloadCache(db_manager.db_path)
 editorial_workflow = EditorialWorkflow(db_manager)
 automation_scheduler = AutomationScheduler(editorial_workflow)
 
@@ -581,6 +583,9 @@ EDITORIAL_PORTAL_TEMPLATE = '''
         .badge.breaking { background: #FFEBEE; color: #D32F2F; }
         .badge.trending { background: #F3E5F5; color: #7B1FA2; }
         .badge.hot { background: #FFF8E1; color: #F9A825; }
+        .badge.reading { background: #E8F5E9; color: #388E3C; }
+        .filters { display: flex; gap: 10px; margin-bottom: 20px; justify-content: center; align-items: center; }
+        .filters select, .filters input { padding: 8px; border: 1px solid #ddd; border-radius: 5px; }
         .candidate-content { margin-bottom: 15px; max-height: 150px; overflow-y: auto; color: #666; }
         .editor-notes { width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 5px; margin-bottom: 15px; }
         .actions { display: flex; gap: 10px; }
@@ -592,6 +597,14 @@ EDITORIAL_PORTAL_TEMPLATE = '''
         .flash-success { background: #d4edda; color: #155724; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
         .flash-error { background: #f8d7da; color: #721c24; padding: 10px; border-radius: 5px; margin-bottom: 10px; }
         .process-section { background: white; padding: 20px; border-radius: 10px; margin-bottom: 20px; text-align: center; }
+        .search-box { display: flex; gap: 10px; margin-bottom: 20px; justify-content: center; }
+        .search-box input { width: 400px; padding: 10px; border: 1px solid #ddd; border-radius: 5px; }
+        .search-results { background: white; padding: 20px; border-radius: 10px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .search-result { padding: 10px 0; border-bottom: 1px solid #eee; }
+        .search-result mark { background: #FFF59D; }
+        .pagination { display: flex; gap: 15px; margin-top: 20px; justify-content: center; align-items: center; }
+        .bulk-actions { display: flex; gap: 10px; margin-bottom: 20px; justify-content: center; }
+        .select-candidate { float: right; transform: scale(1.4); }
     </style>
 </head>
 <body>
@@ -624,18 +637,51 @@ EDITORIAL_PORTAL_TEMPLATE = '''
             <p>Total Candidates</p>
         </div>
         <div class="stat-card">
-            <h3>{{ approved_count }}</h3>
+            <h3 id="approved-count">{{ approved_count }}</h3>
             <p>Approved</p>
         </div>
         <div class="stat-card">
-            <h3>{{ pending_count }}</h3>
+            <h3 id="pending-count">{{ pending_count }}</h3>
             <p>Pending Review</p>
         </div>
     </div>
     
-    {% if approved_count > 0 %}
-    <div class="process-section">
-        <h3>🎉 {{ approved_count }} Stories Approved!</h3>
+    <form class="search-box" action="/editorial/" method="get">
+        <input type="search" name="q" value="{{ query }}" placeholder="Search articles and candidate stories...">
+        <button type="submit" class="btn">🔍 Search</button>
+    </form>
+    
+    {% if search_results %}
+    <div class="search-results">
+        <h3>{{ search_results.total }}{% if search_results.total_capped %}+{% endif %} results for "{{ query }}"</h3>
+        {% for result in search_results.results %}
+        <div class="search-result">
+            <span class="badge category">{{ result.type }}</span>
+            <span class="badge priority">{{ result.category }}</span>
+            <strong>{{ result.title|safe }}</strong>
+            <p>{{ result.snippet|safe }}</p>
+        </div>
+        {% endfor %}
+        {% if search_results.page > 1 %}<a href="/editorial/?q={{ query|urlencode }}&search_page={{ search_results.page - 1 }}">← Previous</a>{% endif %}
+        {% if search_results.page < search_results.pages %}<a href="/editorial/?q={{ query|urlencode }}&search_page={{ search_results.page + 1 }}">Next →</a>{% endif %}
+    </div>
+    {% endif %}
+    
+    <form class="filters" action="/editorial/" method="get">
+        <label>Sort by
+            <select name="sort">
+                <option value="priority" {% if sort_by == 'priority' %}selected{% endif %}>Priority</option>
+                <option value="reading_level" {% if sort_by == 'reading_level' %}selected{% endif %}>Reading level (easiest first)</option>
+            </select>
+        </label>
+        <label>Max grade
+            <input type="number" name="max_grade" step="0.5" min="0" value="{{ max_grade if max_grade is not none else '' }}">
+        </label>
+        <button type="submit" class="btn">Apply</button>
+    </form>
+    
+    <div class="process-section" id="process-section" {% if approved_count == 0 %}style="display: none;"{% endif %}>
+        <h3>🎉 <span id="approved-banner-count">{{ approved_count }}</span> Stories Approved!</h3>
         <p>Ready to process approved stories and create articles.</p>
         <form action="/editorial/process-approved" method="post" style="display: inline;">
             <button type="submit" class="btn btn-approve" style="font-size: 16px; padding: 15px 30px;">
@@ -643,11 +689,16 @@ EDITORIAL_PORTAL_TEMPLATE = '''
             </button>
         </form>
     </div>
-    {% endif %}
+    
+    <div class="bulk-actions">
+        <button type="button" class="btn btn-approve" onclick="reviewSelected('approve')">✅ Approve Selected</button>
+        <button type="button" class="btn btn-reject" onclick="reviewSelected('reject')">❌ Reject Selected</button>
+    </div>
     
     <div class="candidates">
         {% for candidate in candidates %}
-        <div class="candidate">
+        <div class="candidate" id="candidate-{{ candidate.id }}">
+            <input type="checkbox" class="select-candidate" value="{{ candidate.id }}">
             <div class="candidate-title">{{ candidate.title }}</div>
             
             <div class="candidate-meta">
@@ -656,11 +707,12 @@ EDITORIAL_PORTAL_TEMPLATE = '''
                 {% if candidate.is_breaking %}<span class="badge breaking">🔴 Breaking</span>{% endif %}
                 {% if candidate.is_trending %}<span class="badge trending">🔥 Trending</span>{% endif %}
                 {% if candidate.is_hot %}<span class="badge hot">⚡ Hot</span>{% endif %}
+                {% if candidate.reading_grade is not none %}<span class="badge reading">📖 Grade {{ candidate.reading_grade }} · {{ candidate.reading_level }}</span>{% endif %}
             </div>
             
             <div class="candidate-content">{{ candidate.content }}</div>
             
-            <form action="/editorial/review-story" method="post">
+            <form action="/editorial/review-story" method="post" class="review-form">
                 <input type="hidden" name="candidate_id" value="{{ candidate.id }}">
                 <textarea name="editor_notes" class="editor-notes" placeholder="Editor notes (optional)...">{{ candidate.editor_notes }}</textarea>
                 <div class="actions">
@@ -671,6 +723,75 @@ EDITORIAL_PORTAL_TEMPLATE = '''
         </div>
         {% endfor %}
     </div>
+    
+    {% if cards.pages > 1 %}
+    <div class="pagination">
+        {% set filters = '&sort=' ~ sort_by ~ ('&max_grade=' ~ max_grade if max_grade is not none else '') %}
+        {% if cards.page > 1 %}<a class="btn" href="/editorial/?page={{ cards.page - 1 }}{{ filters }}">← Previous</a>{% endif %}
+        <span>Page {{ cards.page }} of {{ cards.pages }}</span>
+        {% if cards.page < cards.pages %}<a class="btn" href="/editorial/?page={{ cards.page + 1 }}{{ filters }}">Next →</a>{% endif %}
+    </div>
+    {% endif %}
+    
+    <script>
+        // Reviews go to the JSON batch endpoint; cards and counters update in place
+        async function submitReviews(decisions) {
+            const response = await fetch('/editorial/api/review', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({decisions: decisions})
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                showMessage('❌ ' + (result.error || 'Review failed'), 'error');
+                return;
+            }
+            
+            result.approved.concat(result.rejected).forEach(function(id) {
+                const card = document.getElementById('candidate-' + id);
+                if (card) card.remove();
+            });
+            document.getElementById('pending-count').textContent = result.pending_count;
+            document.getElementById('approved-count').textContent = result.approved_count;
+            document.getElementById('approved-banner-count').textContent = result.approved_count;
+            document.getElementById('process-section').style.display = result.approved_count > 0 ? '' : 'none';
+            
+            if (result.approved.length) showMessage('✅ Approved ' + result.approved.length + ' stories', 'success');
+            if (result.rejected.length) showMessage('❌ Rejected ' + result.rejected.length + ' stories', 'error');
+            result.errors.forEach(function(error) {
+                showMessage('⚠️ ' + (error.candidate_id || 'Unknown story') + ': ' + error.error, 'error');
+            });
+        }
+        
+        function showMessage(text, category) {
+            const message = document.createElement('div');
+            message.className = 'flash-' + category;
+            message.textContent = text;
+            document.querySelector('.flash-messages').appendChild(message);
+        }
+        
+        function decisionFor(form, action) {
+            return {
+                candidate_id: form.elements.candidate_id.value,
+                action: action,
+                editor_notes: form.elements.editor_notes.value
+            };
+        }
+        
+        function reviewSelected(action) {
+            const decisions = Array.from(document.querySelectorAll('.select-candidate:checked')).map(function(box) {
+                return decisionFor(box.closest('.candidate').querySelector('.review-form'), action);
+            });
+            if (decisions.length) submitReviews(decisions);
+        }
+        
+        document.querySelectorAll('.review-form').forEach(function(form) {
+            form.addEventListener('submit', function(event) {
+                event.preventDefault();
+                submitReviews([decisionFor(form, event.submitter.value)]);
+            });
+        });
+    </script>
 </body>
 </html>
 '''
@@ -684,7 +805,7 @@ def root():
         'version': '2.0.0',
         'features': ['API', 'Editorial Portal', 'Automation'],
         'endpoints': {
-            'api': ['/api/health', '/api/articles', '/api/videos'],
+            'api': ['/api/health', '/api/articles', '/api/videos', '/api/search'],
             'editorial': ['/editorial/', '/editorial/generate', '/editorial/process-approved']
         }
     })
@@ -696,7 +817,8 @@ def health_check():
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'database': 'connected',
-        'automation': 'running' if automation_scheduler.running else 'stopped'
+        'automation': 'running' if automation_scheduler.running else 'stopped',
+        'automation_leader': automation_scheduler.is_leader
     })
 
 @app.route('/api/articles', methods=['GET', 'POST'])
@@ -853,6 +975,33 @@ def handle_videos():
         logger.error(f"Error fetching videos: {e}")
         return jsonify({'success': False, 'videos': [], 'total': 0})
 
+def _search_response(doc_type: Optional[str]):
+    """Search JSON for the ``q``/``page``/``per_page`` request arguments"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Missing search query parameter: q'}), 400
+    
+    try:
+        conn = sqlite3.connect(db_manager.db_path)
+        results = search_stories(
+            conn, query,
+            doc_type=doc_type,
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 20, type=int)
+        )
+        conn.close()
+        
+        return jsonify({'success': True, 'query': query, **results})
+        
+    except Exception as e:
+        logger.error(f"Error searching content: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search_content():
+    """Full-text search over published articles"""
+    return _search_response('article')
+
 @app.route('/api/articles/<article_id>/quiz', methods=['GET', 'POST'])
 def handle_article_quiz(article_id):
     """Get or create quiz for a specific article"""
@@ -889,6 +1038,7 @@ def handle_article_quiz(article_id):
             
             conn.commit()
             conn.close()
+            quiz_payloads.forget(article_id)
             
             logger.info(f"Quiz created for article: {article_id}")
             return jsonify({'success': True, 'id': quiz_id, 'message': 'Quiz created successfully'}), 201
@@ -897,42 +1047,38 @@ def handle_article_quiz(article_id):
             logger.error(f"Error creating quiz: {e}")
             return jsonify({'error': 'Failed to create quiz'}), 500
     
-    # GET method
+    # GET method: the response body was serialized when the quiz was written
     try:
-        conn = sqlite3.connect(db_manager.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, title, questions, total_questions, created_date
-            FROM quizzes 
-            WHERE article_id = ?
-        ''', (article_id,))
+        payload = quiz_payloads.get(article_id)
+        if payload is None:
+            return Response(NOT_FOUND_PAYLOAD, status=404, mimetype='application/json')
+        return Response(payload, mimetype='application/json')
         
-        quiz_row = cursor.fetchone()
-        
-        if not quiz_row:
+    except Exception as e:
+        logger.error(f"Error fetching quiz: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/quizzes/<quiz_id>/attempts', methods=['POST'])
+def submit_quiz_attempt(quiz_id):
+    """Score a quiz submission server-side and log the attempt"""
+    data = request.get_json(silent=True) or {}
+    answers = data.get('answers')
+    if not isinstance(answers, (list, dict)) or not answers:
+        return jsonify({'success': False, 'error': 'Expected "answers" as a list or an object'}), 400
+    
+    try:
+        conn = sqlite3.connect(db_manager.db_path)
+        try:
+            result = record_attempt(conn, quiz_id, answers, user_id=data.get('user_id'))
+        finally:
             conn.close()
-            return jsonify({'success': False, 'error': 'Quiz not found'}), 404
-        
-        quiz_id, title, questions_json, total_questions, created_date = quiz_row
-        questions = json.loads(questions_json)
-        
-        conn.close()
         
-        return jsonify({
-            'success': True,
-            'quiz': {
-                'id': quiz_id,
-                'article_id': article_id,
-                'title': title,
-                'questions': questions,
-                'total_questions': total_questions,
-                'created_date': created_date
-            }
-        })
+        if result is None:
+            return jsonify({'success': False, 'error': 'Quiz not found'}), 404
+        return jsonify({'success': True, **result}), 201
         
     except Exception as e:
-        logger.error(f"Error fetching quiz: {e}")
+        logger.error(f"Error recording quiz attempt: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/generate/quiz', methods=['POST'])
@@ -986,14 +1132,29 @@ def serve_thumbnail(filename):
 @app.route('/editorial/')
 def editorial_portal():
     """Main editorial portal"""
-    candidates = editorial_workflow.get_pending_candidates()
-    approved_stories = editorial_workflow.get_approved_stories()
+    sort_by = request.args.get('sort', 'priority')
+    max_grade = request.args.get('max_grade', type=float)
+    dashboard = editorial_workflow.get_dashboard(sort_by=sort_by, max_grade=max_grade,
+                                                 page=request.args.get('page', 1, type=int))
+    counts = dashboard['counts']
+    
+    query = request.args.get('q', '').strip()
+    search_results = None
+    if query:
+        conn = sqlite3.connect(db_manager.db_path)
+        search_results = search_stories(conn, query, page=request.args.get('search_page', 1, type=int))
+        conn.close()
     
     return render_template_string(EDITORIAL_PORTAL_TEMPLATE, 
-                                candidates=candidates,
-                                total_candidates=len(candidates),
-                                approved_count=len(approved_stories),
-                                pending_count=len(candidates),
+                                candidates=dashboard['cards']['cards'],
+                                cards=dashboard['cards'],
+                                total_candidates=counts['total'],
+                                approved_count=counts.get('approved', 0),
+                                pending_count=counts.get('pending_review', 0),
+                                sort_by=sort_by,
+                                max_grade=max_grade,
+                                query=query,
+                                search_results=search_results,
                                 today_date=datetime.now().strftime('%A, %B %d, %Y'))
 
 @app.route('/editorial/generate', methods=['POST'])
@@ -1001,7 +1162,8 @@ def generate_candidates():
     """Generate new candidate stories"""
     try:
         count = int(request.form.get('count', 20))
-        editorial_workflow.generate_weekly_candidates(count)
+        seed = request.form.get('seed', type=int)
+        editorial_workflow.generate_weekly_candidates(count, seed=seed)
         flash(f'✅ Generated {count} new candidate stories!', 'success')
     except Exception as e:
         flash(f'❌ Error generating stories: {e}', 'error')
@@ -1027,12 +1189,69 @@ def review_story():
     
     return redirect(url_for('editorial_portal'))
 
+@app.route('/editorial/api/review', methods=['POST'])
+def review_stories_batch():
+    """Apply many approve/reject decisions in one transaction (JSON)"""
+    data = request.get_json(silent=True) or {}
+    decisions = data.get('decisions') if isinstance(data, dict) else None
+    if not isinstance(decisions, list) or not decisions:
+        return jsonify({'success': False, 'error': 'Expected a non-empty "decisions" list'}), 400
+    
+    try:
+        result = editorial_workflow.review_stories(decisions)
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        logger.error(f"Error reviewing stories: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/editorial/api/schedule-preview')
+def schedule_preview():
+    """Dry run of the week's balanced publishing schedule (JSON)"""
+    try:
+        day = date.fromisoformat(request.args['week']) if request.args.get('week') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'week must be YYYY-MM-DD'}), 400
+    
+    try:
+        return jsonify({'success': True, **editorial_workflow.preview_weekly_schedule(day)})
+    except Exception as e:
+        logger.error(f"Error previewing schedule: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/editorial/api/search')
+def editorial_search():
+    """Full-text search including unreviewed candidates (type=article|candidate|all)"""
+    doc_type = request.args.get('type', 'all')
+    if doc_type not in ('article', 'candidate', 'all'):
+        return jsonify({'success': False, 'error': f'Invalid type: {doc_type}'}), 400
+    return _search_response(None if doc_type == 'all' else doc_type)
+
+@app.route('/editorial/api/quiz-stats')
+def quiz_question_stats():
+    """Per-question correctness rates, weakest first, for spotting bad questions"""
+    try:
+        conn = sqlite3.connect(db_manager.db_path)
+        try:
+            stats = question_stats(conn,
+                                   min_attempts=request.args.get('min_attempts', 20, type=int),
+                                   max_rate=request.args.get('max_rate', type=float),
+                                   quiz_id=request.args.get('quiz_id'),
+                                   limit=min(request.args.get('limit', 50, type=int), 500))
+        finally:
+            conn.close()
+        return jsonify({'success': True, 'questions': stats})
+    except Exception as e:
+        logger.error(f"Error loading quiz stats: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/editorial/process-approved', methods=['POST'])
 def process_approved():
     """Process all approved stories"""
     try:
-        editorial_workflow.process_approved_stories()
-        flash('🎉 All approved stories have been processed and published!', 'success')
+        result = editorial_workflow.process_approved_stories()
+        flash(f"🎉 Published {result['processed']} approved stories!", 'success')
+        for conflict in result['conflicts']:
+            flash(f"⚠️ Skipped {conflict['candidate_id']}: {conflict['reason']}", 'error')
     except Exception as e:
         flash(f'❌ Error processing stories: {e}', 'error')
     